@@ -0,0 +1,243 @@
+import os
+import csv
+import glob
+import sqlite3
+import argparse
+from datetime import datetime
+from cronometro import FASES
+
+# -----------------------------
+# BANCO DE RESULTADOS (SQLite em modo WAL)
+# -----------------------------
+# Implementação comum a src/ensalamento e src/transporte, cujos resultados.py
+# a importam e acrescentam o que é de cada um (nomes dos CSVs, gravação).
+# FASES vem de src/comum/cronometro.py, também comum às duas.
+#
+# Cada execução é uma linha identificada por (instancia, codigo, execucao).
+# Os CSVs em solutions/ continuam sendo gravados para as tabelas e gráficos;
+# o banco é o índice usado para retomar benchmarks sem reler esses arquivos.
+# Um CSV antigo é importado uma única vez, na primeira gravação que o toca.
+CAMINHO_BANCO = "solutions/resultados.sqlite"
+
+COLUNAS_FASES = [f"tempo_{fase}" for fase in FASES]
+COLUNAS_CSV = ["status", "custo", "tempo_execucao", "codigo"] + COLUNAS_FASES
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    instancia TEXT NOT NULL,
+    codigo TEXT NOT NULL,
+    execucao INTEGER NOT NULL,
+    status TEXT,
+    custo REAL,
+    tempo_execucao REAL,
+    tempo_leitura REAL,
+    tempo_montagem REAL,
+    tempo_solver REAL,
+    tempo_extracao REAL,
+    tempo_escrita REAL,
+    registrado_em TEXT,
+    UNIQUE (instancia, codigo, execucao)
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_instancia_codigo ON resultados (instancia, codigo);
+CREATE TABLE IF NOT EXISTS csv_sincronizados (
+    caminho TEXT PRIMARY KEY,
+    linhas_importadas INTEGER NOT NULL
+);
+"""
+
+# Bancos já preparados (WAL, esquema, colunas de fases) neste processo
+_inicializados = set()
+
+def _inicializar(con):
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(ESQUEMA)
+    # Bancos criados antes das colunas de fases
+    existentes = {linha[1] for linha in con.execute("PRAGMA table_info(resultados)")}
+    for coluna in COLUNAS_FASES:
+        if coluna not in existentes:
+            con.execute(f"ALTER TABLE resultados ADD COLUMN {coluna} REAL")
+
+def conectar(caminho=CAMINHO_BANCO):
+    """
+    Conexão com o banco. O modo WAL e o esquema são persistentes no arquivo:
+    só a primeira conexão a cada caminho no processo os aplica (de novo se o
+    arquivo tiver sido apagado).
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    chave = os.path.abspath(caminho)
+    if not os.path.exists(caminho):
+        _inicializados.discard(chave)
+    con = sqlite3.connect(caminho, timeout=60, isolation_level=None)
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA busy_timeout=60000")
+    if chave not in _inicializados:
+        _inicializar(con)
+        _inicializados.add(chave)
+    return con
+
+def instancia_do_csv(caminho_csv):
+    """Nome da instância de um CSV de resultados: resultado_<nome>.csv (ensalamento) ou <nome>_resultado.csv (transporte)."""
+    nome = os.path.basename(caminho_csv)
+    if nome.startswith("resultado_"):
+        return nome[len("resultado_"):-len(".csv")]
+    return nome.replace("_resultado.csv", "")
+
+def _custo(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+def _inserir(con, linhas):
+    """
+    Insere (instancia, codigo, status, custo, tempo, fases) numerando as
+    execuções a partir da maior já registrada. fases é um dicionário
+    fase -> segundos (ou None). Deve rodar dentro de uma transação.
+    """
+    proxima = {}
+    agora = datetime.now().isoformat(timespec="seconds")
+    registros = []
+    for instancia, codigo, status, custo, tempo, fases in linhas:
+        chave = (instancia, codigo)
+        if chave not in proxima:
+            atual = con.execute("SELECT MAX(execucao) FROM resultados WHERE instancia = ? AND codigo = ?",
+                                chave).fetchone()[0]
+            proxima[chave] = (atual or 0) + 1
+        fases = fases or {}
+        registros.append((instancia, codigo, proxima[chave], status, _custo(custo), _custo(tempo),
+                          *(_custo(fases.get(fase)) for fase in FASES), agora))
+        proxima[chave] += 1
+    colunas = ", ".join(COLUNAS_FASES)
+    marcadores = ", ".join("?" * (len(FASES) + 7))
+    con.executemany(f"INSERT INTO resultados (instancia, codigo, execucao, status, custo, tempo_execucao, {colunas}, "
+                    f"registrado_em) VALUES ({marcadores})", registros)
+    return len(registros)
+
+def _sincronizar(con, caminho_csv, instancia):
+    caminho = os.path.abspath(caminho_csv)
+    if con.execute("SELECT 1 FROM csv_sincronizados WHERE caminho = ?", (caminho,)).fetchone():
+        return 0
+
+    linhas = []
+    if os.path.exists(caminho_csv):
+        with open(caminho_csv, newline="") as f:
+            for row in csv.DictReader(f):
+                fases = {fase: row.get(f"tempo_{fase}") for fase in FASES}
+                linhas.append((instancia, row["codigo"], row["status"], row["custo"], row["tempo_execucao"], fases))
+
+    n = _inserir(con, linhas)
+    con.execute("INSERT INTO csv_sincronizados (caminho, linhas_importadas) VALUES (?, ?)", (caminho, n))
+    return n
+
+def sincronizar_csv(caminho_csv, instancia=None, caminho=CAMINHO_BANCO):
+    """
+    Importa um CSV de resultados antigo para o banco, uma única vez.
+    Retorna o número de linhas importadas (0 se já estava sincronizado).
+    """
+    instancia = instancia or instancia_do_csv(caminho_csv)
+    con = conectar(caminho)
+    try:
+        if con.execute("SELECT 1 FROM csv_sincronizados WHERE caminho = ?",
+                       (os.path.abspath(caminho_csv),)).fetchone():
+            return 0
+        con.execute("BEGIN IMMEDIATE")
+        n = _sincronizar(con, caminho_csv, instancia)
+        con.execute("COMMIT")
+        return n
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
+
+def registrar_resultados(linhas, caminho_csv=None, caminho=CAMINHO_BANCO):
+    """
+    Grava um lote de execuções (instancia, codigo, status, custo, tempo, fases) numa
+    única transação. Se caminho_csv for dado, o CSV é sincronizado antes, para
+    que as linhas antigas não se percam quando ele passar a ser só espelho.
+    """
+    linhas = list(linhas)
+    con = conectar(caminho)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        if caminho_csv is not None and linhas:
+            _sincronizar(con, caminho_csv, linhas[0][0])
+        n = _inserir(con, linhas)
+        con.execute("COMMIT")
+        return n
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
+
+def registrar_resultado(instancia, codigo, status, custo, tempo, caminho_csv=None, fases=None, caminho=CAMINHO_BANCO):
+    return registrar_resultados([(instancia, codigo, status, custo, tempo, fases)], caminho_csv, caminho)
+
+def anexar_csv(caminho_csv, status, custo, tempo, codigo, fases=None, casas=None):
+    """
+    Acrescenta uma execução ao CSV. CSVs antigos, sem as colunas de fases,
+    continuam recebendo só as quatro colunas originais. casas: casas decimais
+    do tempo de execução (None grava o valor como veio).
+    """
+    cabecalho = None
+    if os.path.exists(caminho_csv):
+        with open(caminho_csv, newline="") as f:
+            cabecalho = next(csv.reader(f), None)
+
+    fases = fases or {}
+    with open(caminho_csv, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not cabecalho:
+            cabecalho = COLUNAS_CSV
+            writer.writerow(cabecalho)
+        linha = [status, custo, tempo if casas is None else f"{tempo:.{casas}f}", codigo]
+        if len(cabecalho) > 4:
+            linha += ["" if fases.get(fase) is None else f"{fases[fase]:.6f}" for fase in FASES]
+        writer.writerow(linha)
+
+def contar_execucoes(instancia, codigo, caminho=CAMINHO_BANCO):
+    con = conectar(caminho)
+    try:
+        return con.execute("SELECT COUNT(*) FROM resultados WHERE instancia = ? AND codigo = ?",
+                           (instancia, codigo)).fetchone()[0]
+    finally:
+        con.close()
+
+def ler_tempos_custos(instancia, codigo, max_repeticoes, caminho=CAMINHO_BANCO):
+    """
+    Amostra aleatória de até max_repeticoes execuções do código na instância.
+    Retorna listas: tempos, custos
+    """
+    con = conectar(caminho)
+    try:
+        linhas = con.execute("SELECT tempo_execucao, custo FROM resultados WHERE instancia = ? AND codigo = ? "
+                             "ORDER BY RANDOM() LIMIT ?", (instancia, codigo, max_repeticoes)).fetchall()
+    finally:
+        con.close()
+    return [t for t, _ in linhas], [c for _, c in linhas]
+
+def melhor_custo(instancia, prefixo_codigo, caminho=CAMINHO_BANCO):
+    """Menor custo registrado na instância entre os códigos com o prefixo dado."""
+    con = conectar(caminho)
+    try:
+        return con.execute("SELECT MIN(custo) FROM resultados WHERE instancia = ? AND codigo LIKE ?",
+                           (instancia, prefixo_codigo + "%")).fetchone()[0]
+    finally:
+        con.close()
+
+def main(padrao_csv):
+    """Importa para o banco os CSVs de resultados (padrao_csv: glob dos nomes) de uma pasta."""
+    parser = argparse.ArgumentParser(description="Importa os CSVs de resultados para o banco SQLite.")
+    parser.add_argument("--pasta", type=str, default="solutions", help="Pasta dos CSVs de resultados (padrão: solutions)")
+    parser.add_argument("--banco", type=str, default=CAMINHO_BANCO, help=f"Arquivo do banco (padrão: {CAMINHO_BANCO})")
+    args = parser.parse_args()
+
+    total = 0
+    for caminho_csv in sorted(glob.glob(os.path.join(args.pasta, padrao_csv))):
+        n = sincronizar_csv(caminho_csv, caminho=args.banco)
+        if n:
+            print(f"[INFO] {caminho_csv}: {n} linhas importadas")
+        total += n
+    print(f"{total} linhas importadas para {args.banco}")
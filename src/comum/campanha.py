@@ -0,0 +1,150 @@
+import os
+import csv
+import random
+import multiprocessing as mp
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from banco_resultados import COLUNAS_CSV
+
+# -----------------------------
+# EXECUTOR DE CAMPANHAS
+# -----------------------------
+# Comum às duas pastas (benchmarks do transporte e ensalamento/solve_instances).
+# Cada tarefa de uma campanha (instância, método ou solver, repetição) é
+# independente: o trabalhador resolve, ou dispara o script do solver, e grava o
+# próprio resultado no banco (SQLite em WAL). Subprocessos herdam o núcleo e o
+# limite de threads.
+# Para que os tempos continuem comparáveis com as execuções seriais, cada
+# processo do pool fica fixo em um núcleo e as bibliotecas numéricas/solvers
+# usam um número limitado de threads. As variáveis de threads são lidas uma
+# única vez, quando a biblioteca é carregada: por isso são definidas no
+# processo principal antes de criar o pool (ver threads_limitadas), e não no
+# inicializador do trabalhador, que roda depois de o módulo principal (e com
+# ele numpy/scipy) ser reimportado.
+VARIAVEIS_THREADS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                     "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"]
+
+# Nome da opção de threads de cada solver AMPL (passada em <solver>_options)
+OPCAO_THREADS_AMPL = {
+    "highs": "threads",
+    "cbc": "threads",
+    "gurobi": "threads",
+    "xpress": "threads",
+    "cplex": "threads",
+    "mosek": "threads",
+    "copt": "threads",
+    "scip": "parallel:maxnthreads",
+    "gcg": "parallel:maxnthreads",
+}
+
+# Nome da opção de tempo limite, em segundos, de cada solver AMPL
+OPCAO_TEMPO_AMPL = {
+    "highs": "lim:time",
+    "cbc": "sec",
+    "gurobi": "lim:time",
+    "xpress": "lim:time",
+    "cplex": "lim:time",
+    "mosek": "lim:time",
+    "copt": "lim:time",
+    "scip": "lim:time",
+}
+
+def nucleos_disponiveis():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def limitar_threads(threads):
+    for var in VARIAVEIS_THREADS:
+        os.environ[var] = str(threads)
+
+@contextmanager
+def threads_limitadas(threads):
+    """
+    Limita as threads no ambiente deste processo enquanto o bloco executa.
+    Trabalhadores spawn e os subprocessos que eles disparam (solvers AMPL)
+    herdam esse ambiente ao iniciar, antes de carregar qualquer biblioteca.
+    O ambiente anterior é restaurado ao final.
+    """
+    anteriores = {var: os.environ.get(var) for var in VARIAVEIS_THREADS}
+    limitar_threads(threads)
+    try:
+        yield
+    finally:
+        for var, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = valor
+
+def opcoes_solver_ampl(ampl, solver, threads=None, tempo_limite=None):
+    """Limita as threads e o tempo do solver AMPL, nas opções que ele conhece."""
+    opcoes = []
+    if threads is not None and solver in OPCAO_THREADS_AMPL:
+        opcoes.append(f"{OPCAO_THREADS_AMPL[solver]}={threads}")
+    if tempo_limite is not None and solver in OPCAO_TEMPO_AMPL:
+        opcoes.append(f"{OPCAO_TEMPO_AMPL[solver]}={tempo_limite:g}")
+    if opcoes:
+        ampl.option[f"{solver}_options"] = " ".join(opcoes)
+
+def _inicializar_trabalhador(fila_nucleos):
+    nucleo = fila_nucleos.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {nucleo})
+
+def preparar_csv(caminho_csv):
+    """
+    Cria o CSV de resultados com cabeçalho antes do disparo, para que
+    trabalhadores concorrentes só acrescentem linhas.
+    """
+    os.makedirs(os.path.dirname(caminho_csv) or ".", exist_ok=True)
+    if not os.path.exists(caminho_csv):
+        with open(caminho_csv, "w", newline="") as f:
+            csv.writer(f).writerow(COLUNAS_CSV)
+
+def executar_campanha(tarefas, funcao, concorrencia=None, threads_solver=1, embaralhar=True):
+    """
+    Executa funcao(*tarefa) para cada tarefa num pool de processos, um por núcleo.
+
+    Parâmetros:
+    - tarefas: lista de tuplas de argumentos (apenas as execuções pendentes)
+    - funcao: função de módulo (precisa ser serializável)
+    - concorrencia: número de processos (padrão: núcleos disponíveis)
+    - threads_solver: threads permitidas por processo
+    - embaralhar: intercala métodos e tamanhos, como nas execuções seriais
+
+    Retorna lista de (tarefa, resultado, erro), na ordem de conclusão.
+    """
+    tarefas = list(tarefas)
+    if embaralhar:
+        random.shuffle(tarefas)
+    if not tarefas:
+        return []
+
+    nucleos = nucleos_disponiveis()
+    concorrencia = min(concorrencia or len(nucleos), len(nucleos), len(tarefas))
+    print(f"[INFO] {len(tarefas)} execuções em {concorrencia} processo(s), {threads_solver} thread(s) cada")
+
+    # spawn: o trabalhador é um interpretador novo, que herda o ambiente com o
+    # limite de threads já definido e só então importa numpy/solvers
+    ctx = mp.get_context("spawn")
+    fila_nucleos = ctx.Queue()
+    for nucleo in nucleos[:concorrencia]:
+        fila_nucleos.put(nucleo)
+
+    concluidas = []
+    with threads_limitadas(threads_solver), \
+            ProcessPoolExecutor(max_workers=concorrencia, mp_context=ctx,
+                                initializer=_inicializar_trabalhador,
+                                initargs=(fila_nucleos,)) as pool:
+        futuros = {pool.submit(funcao, *tarefa): tarefa for tarefa in tarefas}
+        for k, futuro in enumerate(as_completed(futuros), start=1):
+            tarefa = futuros[futuro]
+            try:
+                concluidas.append((tarefa, futuro.result(), None))
+                print(f"  [{k}/{len(tarefas)}] {tarefa}")
+            except Exception as e:
+                concluidas.append((tarefa, None, e))
+                print(f"  [{k}/{len(tarefas)}] [ERRO] {tarefa}: {e}")
+
+    return concluidas
@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+
+# -----------------------------
+# FASES DE UMA EXECUÇÃO
+# -----------------------------
+# Comum a src/ensalamento e src/transporte: os scripts o importam depois de
+# helpf/resultados, cujo resultados.py põe src/comum em sys.path.
+# leitura:  carga da instância (arquivo, cache ou CSV do ensalamento)
+# montagem: construção do modelo/estruturas antes do método
+# solver:   chamada do solver ou laço principal da heurística
+# extracao: leitura da solução e cálculo do custo
+# escrita:  arquivos gerados pelo método (ex.: .dat do AMPL)
+FASES = ("leitura", "montagem", "solver", "extracao", "escrita")
+
+class Cronometro:
+    """
+    Acumula, com perf_counter_ns, o tempo de cada fase nomeada de uma
+    execução. Fases não medidas ficam ausentes (gravadas como vazias).
+    """
+
+    def __init__(self):
+        self.ns = {}
+
+    @contextmanager
+    def fase(self, nome):
+        if nome not in FASES:
+            raise ValueError(f"Fase desconhecida: {nome}")
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.ns[nome] = self.ns.get(nome, 0) + time.perf_counter_ns() - inicio
+
+    def segundos(self, *nomes):
+        """Soma, em segundos, das fases dadas (todas, se nenhuma for dada)."""
+        nomes = nomes or tuple(self.ns)
+        return sum(self.ns.get(nome, 0) for nome in nomes) / 1e9
+
+    def fases(self):
+        """Dicionário fase -> segundos, só com as fases medidas."""
+        return {nome: self.ns[nome] / 1e9 for nome in FASES if nome in self.ns}
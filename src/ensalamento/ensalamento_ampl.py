@@ -1,32 +1,73 @@
 import os
 import argparse
 from amplpy import AMPL
-import time
-from helpf import ler_instancia_csv, escrever_modelo, escrever_dados, salvar_resultado
+import numpy as np
+from helpf import (ler_instancia_csv, escrever_modelo, escrever_modelo_pares, escrever_dados, pares_viaveis,
+                   salvar_resultado, solucao_inteira)
+from campanha import opcoes_solver_ampl
+from cronometro import Cronometro
 
-def resolver_com_ampl(solver, caminho_csv, nome_instancia):
-    disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
-    escrever_modelo()
-    escrever_dados(disciplinas, salas, N, C, D, nome_instancia)
+def resolver_com_ampl(solver, caminho_csv, nome_instancia, modo="mip", threads=None, presolve=False):
+    """
+    presolve: descarta em Python os pares que excedem a capacidade e usa o
+    modelo só com os pares viáveis (ampl/modelo_pares.mod), sem as
+    restrições Capacidade_Salas.
+    """
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
 
-    ampl = AMPL()
-    ampl.read("ampl/modelo.mod")
-    ampl.readData(f"ampl/dados_{nome_instancia}.dat")
-    ampl.option["solver"] = solver
+    pares = None
+    if presolve:
+        with cronometro.fase("montagem"):
+            pares = pares_viaveis(N, C)
+        total = len(disciplinas) * len(salas)
+        print(f"[INFO] Pré-processamento: {pares[0].size} de {total} pares viáveis "
+              f"({100 * (1 - pares[0].size / max(total, 1)):.1f}% das variáveis removidas)")
 
-    inicio = time.time()
-    ampl.solve()
-    fim = time.time()
+    with cronometro.fase("escrita"):
+        if presolve:
+            escrever_modelo_pares()
+            caminho_mod = "ampl/modelo_pares.mod"
+        else:
+            escrever_modelo()
+            caminho_mod = "ampl/modelo.mod"
+        caminho_dat = escrever_dados(disciplinas, salas, N, C, np.asarray(D), nome_instancia, pares=pares)
 
-    tempo_execucao = fim - inicio
-    status = ampl.get_value("solve_result")
-    objetivo = ampl.get_objective("Total_Deslocamento").value()
+    with cronometro.fase("montagem"):
+        ampl = AMPL()
+        ampl.read(caminho_mod)
+        ampl.readData(caminho_dat)
+        ampl.option["solver"] = solver
+        opcoes_solver_ampl(ampl, solver, threads)
+
+    with cronometro.fase("solver"):
+        if modo == "lp-relaxation":
+            # Restrições de atribuição são totalmente unimodulares: LP já é binário
+            ampl.option["relax_integrality"] = 1
+            ampl.solve()
+            valores = [linha[-1] for linha in ampl.get_variable("x").get_values().to_list()]
+            if ampl.get_value("solve_result") == "solved" and not solucao_inteira(valores):
+                print("[INFO] Relaxação linear não inteira; resolvendo como MIP.")
+                ampl.option["relax_integrality"] = 0
+                ampl.solve()
+        else:
+            ampl.solve()
+
+    tempo_execucao = cronometro.segundos("solver")
+    with cronometro.fase("extracao"):
+        status = ampl.get_value("solve_result")
+        objetivo = ampl.get_objective("Total_Deslocamento").value()
 
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
     codigo = codigo + f"_{solver}"
-    salvar_resultado(status, objetivo, tempo_execucao, codigo, nome_instancia)
+    if modo == "lp-relaxation":
+        codigo = codigo + "_lp"
+    if presolve:
+        codigo = codigo + "_presolve"
+    salvar_resultado(status, objetivo, tempo_execucao, codigo, nome_instancia, fases=cronometro.fases())
 
     print("\nStatus:", status)
     print("Deslocamento total ótimo:", objetivo)
@@ -45,6 +86,11 @@ def main():
     parser.add_argument("--seed", type=int, default=42, help="Seed usada na geração da instância")
     parser.add_argument("--folder", type=str, default="instancias", help="Pasta onde estão as instâncias")
     parser.add_argument("--solver", type=str, default="highs", help="Solver AMPL (ex: highs, cbc, gurobi)")
+    parser.add_argument("--modo", type=str, default="mip", choices=["mip", "lp-relaxation"],
+                        help="Resolver como MIP ou pela relaxação linear com verificação de integralidade")
+    parser.add_argument("--threads", type=int, default=None, help="Limite de threads do solver (padrão: do solver)")
+    parser.add_argument("--presolve", action="store_true",
+                        help="Gera o modelo só com os pares disciplina-sala viáveis, sem restrições de capacidade")
 
     args = parser.parse_args()
 
@@ -62,7 +108,8 @@ def main():
                      f"[{args.min_cap},{args.max_cap}]_"\
                      f"[{args.min_d},{args.max_d}]_seed{args.seed}"
 
-    resolver_com_ampl(args.solver, caminho_csv, nome_instancia)
+    resolver_com_ampl(args.solver, caminho_csv, nome_instancia, modo=args.modo, threads=args.threads,
+                      presolve=args.presolve)
 
 
 if __name__ == "__main__":
@@ -15,7 +15,7 @@ min_d = 1
 max_d = 10
 seed = 42
 
-solvers = ["hungaro", "gulosa"]
+solvers = ["hungaro", "gulosa", "gulosa_busca_local", "leilao"]
 solver_otimo = "ensalamento_ampl_gurobi"
 
 resultados_tempo = {solver: [] for solver in solvers + [solver_otimo]}
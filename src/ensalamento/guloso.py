@@ -1,21 +1,31 @@
 import os
 import argparse
-import time
 import numpy as np
 from helpf import ler_instancia_csv, salvar_resultado
-from heuristica import heuristica_gulosa_ensalamento, verificar_solucao_valida
+from cronometro import Cronometro
+from heuristica import heuristica_gulosa_ensalamento, busca_local_ensalamento, verificar_solucao_valida
 
-def resolver_com_gulosa(caminho_csv, nome_instancia):
+def resolver_com_gulosa(caminho_csv, nome_instancia, busca_local=False, tempo_limite=None):
+    """
+    Resolve com a heurística gulosa (código "gulosa"). Com busca_local, a
+    solução gulosa é depois melhorada por movimentos e trocas de salas e
+    registrada também como "gulosa_busca_local", com o tempo do guloso
+    somado ao da busca (limitada a tempo_limite segundos).
+    """
+    cronometro = Cronometro()
     # Lê os dados da instância
-    disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
+    with cronometro.fase("leitura"):
+        disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
 
-    inicio = time.time()
-    alocacao, custo = heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D)
-    fim = time.time()
+    with cronometro.fase("solver"):
+        alocacao, custo = heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D)
 
-    tempo_execucao = fim - inicio
+    tempo_execucao = cronometro.segundos("solver")
 
-    if alocacao is not None and verificar_solucao_valida(alocacao, disciplinas, salas, N, C):
+    with cronometro.fase("extracao"):
+        valida = alocacao is not None and verificar_solucao_valida(alocacao, disciplinas, salas, N, C)
+
+    if valida:
         status = "aproximada"
         print("[INFO] Solução viável encontrada.")
     else:
@@ -24,12 +34,32 @@ def resolver_com_gulosa(caminho_csv, nome_instancia):
         print("[ERRO] Solução inválida retornada pela heurística gulosa.")
 
     codigo = "gulosa"
-    salvar_resultado(status, custo, tempo_execucao, codigo, nome_instancia)
+    salvar_resultado(status, custo, tempo_execucao, codigo, nome_instancia, fases=cronometro.fases())
 
     print("\nStatus:", status)
     print("Deslocamento total:", custo if custo != -1 else "N/A")
     print("Tempo de execução:", tempo_execucao)
 
+    if not (busca_local and valida):
+        return
+
+    with cronometro.fase("solver"):
+        alocacao, custo = busca_local_ensalamento(disciplinas, salas, N, C, D, alocacao, tempo_limite)
+    tempo_execucao = cronometro.segundos("solver")
+
+    with cronometro.fase("extracao"):
+        valida = verificar_solucao_valida(alocacao, disciplinas, salas, N, C)
+    status = "aproximada" if valida else "falha"
+    if not valida:
+        custo = -1
+        print("[ERRO] Solução inválida retornada pela busca local.")
+
+    salvar_resultado(status, custo, tempo_execucao, "gulosa_busca_local", nome_instancia, fases=cronometro.fases())
+
+    print("\nStatus (busca local):", status)
+    print("Deslocamento total:", custo if custo != -1 else "N/A")
+    print("Tempo de execução (guloso + busca local):", tempo_execucao)
+
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de ensalamento com heurística gulosa.")
     parser.add_argument("-i", type=int, help="Número de disciplinas")
@@ -42,6 +72,10 @@ def main():
     parser.add_argument("--max_d", type=int, default=10)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--folder", type=str, default="instancias")
+    parser.add_argument("--busca_local", action="store_true",
+                        help="Melhora a solução gulosa com movimentos e trocas de salas (código gulosa_busca_local)")
+    parser.add_argument("--tempo_limite", type=float, default=None,
+                        help="Tempo máximo da busca local em segundos (padrão: sem limite)")
 
     args = parser.parse_args()
 
@@ -57,7 +91,7 @@ def main():
     nome_instancia = f"D{args.i}_S{args.j}_[{args.min_alunos},{args.max_alunos}]_"
     nome_instancia += f"[{args.min_cap},{args.max_cap}]_[{args.min_d},{args.max_d}]_seed{args.seed}"
 
-    resolver_com_gulosa(caminho_csv, nome_instancia)
+    resolver_com_gulosa(caminho_csv, nome_instancia, args.busca_local, args.tempo_limite)
 
 if __name__ == "__main__":
     main()
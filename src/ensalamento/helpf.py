@@ -1,26 +1,19 @@
-import numpy as np
-import pandas as pd
+import io
 import csv
+import gzip
+import hashlib
+import numpy as np
 import os
+from resultados import registrar_resultado, anexar_csv
 
-def salvar_resultado(status, objetivo, tempo_execucao, codigo, nome_instancia):
+def salvar_resultado(status, objetivo, tempo_execucao, codigo, nome_instancia, fases=None):
     output_path = f"solutions/resultado_{nome_instancia}.csv"
     os.makedirs("solutions", exist_ok=True)
 
-    nova_linha = pd.DataFrame([{
-        "status": status,
-        "custo": objetivo,
-        "tempo_execucao": tempo_execucao,
-        "codigo": codigo
-    }])
-
-    if os.path.exists(output_path):
-        df_existente = pd.read_csv(output_path)
-        df_final = pd.concat([df_existente, nova_linha], ignore_index=True)
-    else:
-        df_final = nova_linha
+    registrar_resultado(nome_instancia, codigo, status, objetivo, tempo_execucao, caminho_csv=output_path, fases=fases)
 
-    df_final.to_csv(output_path, index=False)
+    # Apenas acrescenta a linha: o CSV não é mais relido a cada execução
+    anexar_csv(output_path, status, objetivo, tempo_execucao, codigo, fases)
 
 def salvar_instancia_csv(filepath, disciplinas, salas, N, C, D):
     with open(filepath, 'w', newline='') as f:
@@ -45,7 +38,8 @@ def ler_instancia_csv(filepath):
 
 def escrever_modelo(path="ampl/modelo.mod"):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with open(temporario, "w") as f:
         f.write(r"""
 set DISCIPLINAS;
 set SALAS;
@@ -68,36 +62,165 @@ subject to Uma_Disciplina_Por_Sala {j in SALAS}:
 subject to Capacidade_Salas {i in DISCIPLINAS, j in SALAS}:
     N[i] * x[i,j] <= C[j];
 """)
+    os.replace(temporario, path)
+
+def escrever_modelo_pares(path="ampl/modelo_pares.mod"):
+    """
+    Variante pré-resolvida do modelo: x só existe nos pares viáveis
+    (N[i] <= C[j]), calculados em Python (pares_viaveis), e as restrições
+    de capacidade desaparecem.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with open(temporario, "w") as f:
+        f.write(r"""
+set DISCIPLINAS;
+set SALAS;
+set PARES within DISCIPLINAS cross SALAS;
 
-import os
+param N {DISCIPLINAS};
+param D {PARES};
+
+var x {PARES} binary;
+
+minimize Total_Deslocamento:
+    sum {(i,j) in PARES} N[i] * D[i,j] * x[i,j];
+
+subject to Alocar_Uma_Sala {i in DISCIPLINAS}:
+    sum {(i,j) in PARES} x[i,j] = 1;
 
-def escrever_dados(disciplinas, salas, N, C, D, nome_instancia):
-    path = f"ampl/dados_{nome_instancia}.dat"
-    
-    # Se os dados já existem, não salva novamente
-    if os.path.exists(path):
-        print(f"[INFO] Dados para a instância '{nome_instancia}' já existem. Pulando escrita.")
+subject to Uma_Disciplina_Por_Sala {j in SALAS}:
+    sum {(i,j) in PARES} x[i,j] <= 1;
+""")
+    os.replace(temporario, path)
+
+def pares_viaveis(N, C, tam_bloco=1024):
+    """
+    Índices (linhas, colunas) dos pares disciplina-sala com N[i] <= C[j],
+    em ordem linha a linha, calculados em blocos de disciplinas.
+    """
+    N = np.asarray(N)
+    C = np.asarray(C)
+    linhas, colunas = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for ini in range(0, len(N), tam_bloco):
+        li, co = np.nonzero(N[ini:ini + tam_bloco, None] <= C[None, :])
+        linhas.append(li + ini)
+        colunas.append(co)
+    return np.concatenate(linhas), np.concatenate(colunas)
+
+# Inteiros com faixa até este tamanho são convertidos por tabela valor -> texto
+LIMITE_TABELA_TEXTO = 1 << 20
+
+def escrever_matriz_dat(f, rotulos, matriz, tam_bloco=1024):
+    """
+    Escreve "rotulo v1 v2 ... vn" por linha da matriz (ou vetor), um write por
+    bloco de linhas. Distâncias e capacidades inteiras usam uma tabela
+    valor -> texto; outros tipos são formatados por np.savetxt.
+    """
+    matriz = np.asarray(matriz)
+    if matriz.ndim == 1:
+        matriz = matriz[:, None]
+    if matriz.size == 0:
         return
-    
+
+    tabela = None
+    if np.issubdtype(matriz.dtype, np.integer):
+        menor, maior = int(matriz.min()), int(matriz.max())
+        if maior - menor < LIMITE_TABELA_TEXTO:
+            tabela = np.array([str(v) for v in range(menor, maior + 1)], dtype=object)
+
+    for ini in range(0, matriz.shape[0], tam_bloco):
+        bloco = matriz[ini:ini + tam_bloco]
+        if tabela is not None:
+            linhas = [" ".join(tabela[linha - menor].tolist()) for linha in bloco]
+        else:
+            buffer = io.StringIO()
+            np.savetxt(buffer, bloco, fmt="%s", delimiter=" ")
+            linhas = buffer.getvalue().splitlines()
+        f.write("".join(f"{r} {l}\n" for r, l in zip(rotulos[ini:ini + tam_bloco], linhas)))
+
+def escrever_pares_dat(f, disciplinas, salas, linhas, colunas, valores, tam_bloco=1 << 16):
+    """Escreve "disciplina sala valor" por par, um write por bloco de pares."""
+    rot_disciplinas = np.array(disciplinas, dtype=object)
+    rot_salas = np.array(salas, dtype=object)
+    valores = np.asarray(valores)
+    for ini in range(0, len(linhas), tam_bloco):
+        fim = ini + tam_bloco
+        f.write("".join(f"{d} {s} {v}\n" for d, s, v in zip(rot_disciplinas[linhas[ini:fim]].tolist(),
+                                                           rot_salas[colunas[ini:fim]].tolist(),
+                                                           valores[ini:fim].tolist())))
+
+def hash_instancia(disciplinas, salas, N, C, D):
+    h = hashlib.sha1()
+    h.update("\0".join(disciplinas).encode())
+    h.update(b"\1" + "\0".join(salas).encode())
+    for x in (N, C, D):
+        x = np.ascontiguousarray(x)
+        h.update(f"{x.shape}{x.dtype.str}".encode())
+        h.update(memoryview(x).cast("B"))
+    return h.hexdigest()
+
+def escrever_dados(disciplinas, salas, N, C, D, nome_instancia, comprimir=False, pares=None):
+    """
+    Grava ampl/dados_<nome_instancia>.dat (ou .dat.gz com comprimir; o AMPL lê
+    só o .dat). O arquivo é reaproveitado enquanto o hash do conteúdo, guardado
+    em <arquivo>.sha1, não mudar. Retorna o caminho gravado.
+
+    Com pares=(linhas, colunas) (ver pares_viaveis) grava os dados do modelo
+    pré-resolvido em ampl/dados_pares_<nome_instancia>.dat: o conjunto PARES
+    junto com D, só nos pares dados, e sem C.
+    """
+    prefixo = "dados" if pares is None else "dados_pares"
+    path = f"ampl/{prefixo}_{nome_instancia}.dat" + (".gz" if comprimir else "")
+    caminho_hash = path + ".sha1"
+    N, C, D = np.asarray(N), np.asarray(C), np.asarray(D)
+    # Os pares dependem só de N e C, que já entram no hash
+    assinatura = hash_instancia(disciplinas, salas, N, C, D)
+
+    # Se os dados já existem com o mesmo conteúdo, não salva novamente
+    if os.path.exists(path) and os.path.exists(caminho_hash):
+        with open(caminho_hash) as f:
+            if f.read().strip() == assinatura:
+                print(f"[INFO] Dados para a instância '{nome_instancia}' já existem. Pulando escrita.")
+                return path
+
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    
-    with open(path, "w") as f:
+
+    # Temporário + rename: execuções paralelas da mesma instância não leem o .dat incompleto
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with (gzip.open(temporario, "wt", compresslevel=1) if comprimir else open(temporario, "w")) as f:
         f.write("set DISCIPLINAS := " + " ".join(disciplinas) + ";\n")
         f.write("set SALAS := " + " ".join(salas) + ";\n\n")
 
         f.write("param N :=\n")
-        for d, n in zip(disciplinas, N):
-            f.write(f"{d} {n}\n")
+        escrever_matriz_dat(f, disciplinas, N)
         f.write(";\n\n")
 
-        f.write("param C :=\n")
-        for s, c in zip(salas, C):
-            f.write(f"{s} {c}\n")
-        f.write(";\n\n")
+        if pares is not None:
+            linhas, colunas = pares
+            f.write("param: PARES: D :=\n")
+            escrever_pares_dat(f, disciplinas, salas, linhas, colunas, D[linhas, colunas])
+            f.write(";\n")
+        else:
+            f.write("param C :=\n")
+            escrever_matriz_dat(f, salas, C)
+            f.write(";\n\n")
+
+            f.write("param D : " + " ".join(salas) + " :=\n")
+            escrever_matriz_dat(f, disciplinas, D)
+            f.write(";\n")
+    os.replace(temporario, path)
 
-        f.write("param D : " + " ".join(salas) + " :=\n")
-        for i, d in enumerate(disciplinas):
-            f.write(d + " " + " ".join(str(D[i][j]) for j in range(len(salas))) + "\n")
-        f.write(";\n")
+    with open(caminho_hash, "w") as f:
+        f.write(assinatura)
 
     print(f"[INFO] Dados salvos em: {path}")
+    return path
+
+def solucao_inteira(valores, tol=1e-6):
+    """
+    Verifica se os valores de x retornados pelo solver são inteiros (a menos
+    de tol), isto é, se a relaxação linear do ensalamento já é binária.
+    """
+    valores = np.asarray(valores, dtype=float)
+    return bool(np.all(np.abs(valores - np.round(valores)) <= tol))
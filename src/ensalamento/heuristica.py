@@ -1,44 +1,206 @@
+import time
+import numpy as np
+
+# Faixas de distância até este tamanho são percorridas valor a valor (baldes)
+LIMITE_BALDES = 1 << 16
+
+def heuristica_gulosa_indices(N, C, D, ordem_disciplinas=None, ordem_salas=None, tam_bloco=1024):
+    """
+    Núcleo da heurística gulosa sobre índices.
+
+    Percorre os pares (i, j) em ordem crescente de D[i, j]; empates seguem
+    ordem_disciplinas e depois ordem_salas (padrão: ordem dos índices). Cada
+    disciplina fica com o primeiro par cuja sala ainda tem capacidade
+    disponível para N[i] (uma sala pode receber mais de uma disciplina).
+
+    As distâncias são inteiros pequenos, então a ordenação é uma ordenação
+    por baldes: um balde por valor de D, e dentro dele as disciplinas ainda
+    não alocadas, em blocos de linhas, com as colunas já na ordem das salas.
+    Pares de disciplinas alocadas ou de salas sem capacidade são descartados
+    com NumPy; só os candidatos restantes passam pelo laço em Python.
+
+    Retorna:
+    - sala_de: vetor (n_disciplinas) com o índice da sala de cada disciplina (-1 se não alocada)
+    - ordem_alocacao: índices das disciplinas na ordem em que foram alocadas
+    """
+    N = np.asarray(N)
+    D = np.asarray(D)
+    n_disciplinas, n_salas = len(N), len(C)
+    capacidade = np.array(C).copy()
+
+    ordem_disciplinas = np.arange(n_disciplinas) if ordem_disciplinas is None else np.asarray(ordem_disciplinas)
+    ordem_salas = np.arange(n_salas) if ordem_salas is None else np.asarray(ordem_salas)
+
+    sala_de = np.full(n_disciplinas, -1, dtype=np.int64)
+    ordem_alocacao = []
+    if n_disciplinas == 0 or n_salas == 0:
+        return sala_de, np.zeros(0, dtype=np.int64)
+
+    menor, maior = D.min(), D.max()
+    if np.issubdtype(D.dtype, np.integer) and maior - menor < LIMITE_BALDES:
+        baldes = range(int(menor), int(maior) + 1)
+    else:
+        baldes = np.unique(D)
+
+    for valor in baldes:
+        pendentes = ordem_disciplinas[sala_de[ordem_disciplinas] < 0]
+        if pendentes.size == 0:
+            break
+
+        for ini in range(0, pendentes.size, tam_bloco):
+            bloco = pendentes[ini:ini + tam_bloco]
+            # Capacidade só diminui: um par sem capacidade agora nunca volta a ser viável
+            candidatos = ((D[np.ix_(bloco, ordem_salas)] == valor)
+                          & (capacidade[ordem_salas][None, :] >= N[bloco][:, None]))
+            linhas, colunas = np.nonzero(candidatos)
+            if linhas.size == 0:
+                continue
+            inicios = np.searchsorted(linhas, np.arange(bloco.size + 1)).tolist()
+            colunas = ordem_salas[colunas].tolist()
+
+            for k, i in enumerate(bloco.tolist()):
+                demanda = N[i]
+                for j in colunas[inicios[k]:inicios[k + 1]]:
+                    if capacidade[j] >= demanda:
+                        sala_de[i] = j
+                        capacidade[j] -= demanda
+                        ordem_alocacao.append(i)
+                        break
+
+    return sala_de, np.array(ordem_alocacao, dtype=np.int64)
+
 def heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D):
-    n_disciplinas = len(disciplinas)
-    n_salas = len(salas)
+    # Os empates de distância seguem a ordem dos nomes (como na ordenação das
+    # tuplas (distância, disciplina, sala) da versão original)
+    ordem_disciplinas = sorted(range(len(disciplinas)), key=disciplinas.__getitem__)
+    ordem_salas = sorted(range(len(salas)), key=salas.__getitem__)
 
-    capacidade_disponivel = {sala: capacidade for sala, capacidade in zip(salas, C)}
-    alocacao = {}  # disciplina -> sala
-    disciplinas_alocadas = set()
+    D = np.asarray(D)
+    N_arr = np.asarray(N, dtype=np.int64)
+    sala_de, ordem_alocacao = heuristica_gulosa_indices(N_arr, C, D, ordem_disciplinas, ordem_salas)
 
-    # Lista com (distância, disciplina, sala)
-    combinacoes = []
-    for i, d in enumerate(disciplinas):
-        for j, s in enumerate(salas):
-            combinacoes.append((D[i][j], d, s))
+    # Verifica se a solução é viável
+    if ordem_alocacao.size < len(disciplinas):
+        print("[ERRO] Não foi possível alocar todas as disciplinas com a heurística gulosa.")
+        return None, None
 
-    # Ordenar por menor distância
-    combinacoes.sort()
+    alocacao = {disciplinas[i]: salas[sala_sel] for i, sala_sel in
+                zip(ordem_alocacao.tolist(), sala_de[ordem_alocacao].tolist())}
 
-    # Tentar alocar as melhores combinações viáveis
-    for dist, d, s in combinacoes:
-        i = disciplinas.index(d)
-        demanda = N[i]
+    # Custo real: distância ponderada pelo número de alunos
+    indices = np.arange(len(disciplinas))
+    custo_total = np.sum(D[indices, sala_de] * N_arr)
 
-        if d not in alocacao and capacidade_disponivel[s] >= demanda:
-            alocacao[d] = s
-            capacidade_disponivel[s] -= demanda
-            disciplinas_alocadas.add(d)
+    return alocacao, custo_total
 
-        if len(disciplinas_alocadas) == n_disciplinas:
+def _aplicar_sem_conflito(candidatos, sala_de, folga, N, troca):
+    """
+    Aplica os candidatos (variação, i, k) em ordem de ganho, pulando os que
+    envolvem uma sala já alterada na passada: a variação de cada candidato
+    só depende das salas envolvidas, então continua exata para os demais.
+    """
+    alteradas = set()
+    aplicados = 0
+    for _, i, k in sorted(candidatos):
+        a = sala_de[i]
+        b = sala_de[k] if troca else k
+        if a in alteradas or b in alteradas:
+            continue
+        if troca:
+            sala_de[i], sala_de[k] = b, a
+            folga[a] += N[i] - N[k]
+            folga[b] += N[k] - N[i]
+        else:
+            sala_de[i] = b
+            folga[a] += N[i]
+            folga[b] -= N[i]
+        alteradas.update((a, b))
+        aplicados += 1
+    return aplicados
+
+def busca_local_indices(N, C, D, sala_de, tempo_limite=None, tam_bloco=512):
+    """
+    Melhora uma alocação viável (sala_de) com dois tipos de movimento:
+    - mover a disciplina i para uma sala j com folga de capacidade >= N[i];
+    - trocar as salas de i e k, se as duas salas comportam a troca.
+
+    A cada passada, as variações de custo de todos os movimentos (matriz
+    n x m) e de todas as trocas (matriz n x n) são calculadas com NumPy, em
+    blocos de tam_bloco linhas. O melhor movimento de cada disciplina é
+    aplicado em ordem de ganho, sem repetir salas na mesma passada; depois,
+    o mesmo para as trocas. Termina quando uma passada não melhora nada ou
+    quando tempo_limite (segundos) se esgota.
+
+    Retorna:
+    - sala_de: nova alocação (cópia)
+    - passadas: número de passadas feitas
+    - aplicados: número de movimentos e trocas aplicados
+    """
+    N = np.asarray(N, dtype=np.int64)
+    D = np.asarray(D, dtype=np.int64)
+    sala_de = np.array(sala_de, dtype=np.int64)
+    n_disciplinas, n_salas = D.shape
+    folga = np.asarray(C, dtype=np.int64) - np.bincount(sala_de, weights=N, minlength=n_salas).astype(np.int64)
+    fim = None if tempo_limite is None else time.perf_counter() + tempo_limite
+
+    def esgotado():
+        return fim is not None and time.perf_counter() >= fim
+
+    passadas = aplicados = 0
+    while not esgotado():
+        passadas += 1
+        aplicados_passada = 0
+
+        # Movimentos para salas com folga
+        candidatos = []
+        atual = N * D[np.arange(n_disciplinas), sala_de]
+        for ini in range(0, n_disciplinas, tam_bloco):
+            bloco = np.arange(ini, min(ini + tam_bloco, n_disciplinas))
+            variacao = N[bloco][:, None] * D[bloco] - atual[bloco][:, None]
+            variacao[folga[None, :] < N[bloco][:, None]] = 0
+            melhor = variacao.argmin(axis=1)
+            ganho = variacao[np.arange(bloco.size), melhor]
+            candidatos += zip(ganho[ganho < 0].tolist(), bloco[ganho < 0].tolist(), melhor[ganho < 0].tolist())
+        aplicados_passada += _aplicar_sem_conflito(candidatos, sala_de, folga, N, troca=False)
+
+        # Trocas: variacao[i, k] = N[i] D[i, sala(k)] + N[k] D[k, sala(i)] - atual[i] - atual[k]
+        candidatos = []
+        atual = N * D[np.arange(n_disciplinas), sala_de]
+        folga_sala = folga[sala_de]
+        for ini in range(0, n_disciplinas, tam_bloco):
+            if esgotado():
+                break
+            bloco = np.arange(ini, min(ini + tam_bloco, n_disciplinas))
+            Nb, sb = N[bloco][:, None], sala_de[bloco]
+            variacao = (Nb * D[bloco][:, sala_de] + N[None, :] * D[:, sb].T
+                        - atual[bloco][:, None] - atual[None, :])
+            inviavel = ((folga_sala[None, :] + N[None, :] < Nb)
+                        | (folga_sala[bloco][:, None] + Nb < N[None, :])
+                        | (sb[:, None] == sala_de[None, :]))
+            variacao[inviavel] = 0
+            melhor = variacao.argmin(axis=1)
+            ganho = variacao[np.arange(bloco.size), melhor]
+            candidatos += zip(ganho[ganho < 0].tolist(), bloco[ganho < 0].tolist(), melhor[ganho < 0].tolist())
+        aplicados_passada += _aplicar_sem_conflito(candidatos, sala_de, folga, N, troca=True)
+
+        aplicados += aplicados_passada
+        if aplicados_passada == 0:
             break
 
-    # Verifica se a solução é viável
-    if len(alocacao) < n_disciplinas:
-        print("[ERRO] Não foi possível alocar todas as disciplinas com a heurística gulosa.")
-        return None, None
+    return sala_de, passadas, aplicados
 
-    # Custo real: distância ponderada pelo número de alunos
-    custo_total = sum(
-        D[disciplinas.index(d)][salas.index(s)] * N[disciplinas.index(d)]
-        for d, s in alocacao.items()
-    )
+def busca_local_ensalamento(disciplinas, salas, N, C, D, alocacao, tempo_limite=None):
+    """Aplica busca_local_indices a uma alocação {disciplina: sala} (ex.: a da heurística gulosa)."""
+    indice_sala = {s: j for j, s in enumerate(salas)}
+    sala_de = np.array([indice_sala[alocacao[d]] for d in disciplinas], dtype=np.int64)
 
+    D = np.asarray(D)
+    N_arr = np.asarray(N, dtype=np.int64)
+    sala_de, passadas, aplicados = busca_local_indices(N_arr, C, D, sala_de, tempo_limite)
+    print(f"[INFO] Busca local: {aplicados} movimentos/trocas em {passadas} passadas.")
+
+    alocacao = {d: salas[j] for d, j in zip(disciplinas, sala_de.tolist())}
+    custo_total = np.sum(D[np.arange(len(disciplinas)), sala_de] * N_arr)
     return alocacao, custo_total
 
 def verificar_solucao_valida(alocacao, disciplinas, salas, N, C):
@@ -50,25 +212,30 @@ def verificar_solucao_valida(alocacao, disciplinas, salas, N, C):
         print("[ERRO] Nem todas as disciplinas foram alocadas.")
         return False
 
-    # Inicializa consumo de capacidade por sala
-    uso_por_sala = {sala: 0 for sala in salas}
+    indice_disciplina = {d: i for i, d in enumerate(disciplinas)}
+    indice_sala = {s: j for j, s in enumerate(salas)}
 
     for d, s in alocacao.items():
-        if s not in salas:
+        if s not in indice_sala:
             print(f"[ERRO] Sala '{s}' inválida.")
             return False
 
-        if d not in disciplinas:
+        if d not in indice_disciplina:
             print(f"[ERRO] Disciplina '{d}' inválida.")
             return False
 
-        idx = disciplinas.index(d)
-        uso_por_sala[s] += N[idx]
+    idx_disciplinas = np.fromiter((indice_disciplina[d] for d in alocacao), dtype=np.int64, count=len(alocacao))
+    idx_salas = np.fromiter((indice_sala[s] for s in alocacao.values()), dtype=np.int64, count=len(alocacao))
+
+    # Consumo de capacidade por sala
+    C = np.asarray(C)
+    uso_por_sala = np.bincount(idx_salas, weights=np.asarray(N)[idx_disciplinas], minlength=len(salas))
 
     # Verifica se alguma sala excede sua capacidade
-    for s in salas:
-        if uso_por_sala[s] > C[salas.index(s)]:
-            print(f"[ERRO] Sala '{s}' excedeu a capacidade: usado {uso_por_sala[s]}, capacidade {C[salas.index(s)]}")
-            return False
+    excedidas = np.flatnonzero(uso_por_sala > C)
+    if excedidas.size:
+        j = excedidas[0]
+        print(f"[ERRO] Sala '{salas[j]}' excedeu a capacidade: usado {int(uso_por_sala[j])}, capacidade {C[j]}")
+        return False
 
-    return True
\ No newline at end of file
+    return True
@@ -1,51 +1,142 @@
 import os
 import argparse
-import time
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
 from helpf import ler_instancia_csv, salvar_resultado
-
-def resolver_com_hungaro(caminho_csv, nome_instancia):
+from cronometro import Cronometro
+
+def arestas_viaveis(N, C, D, tam_bloco=1024):
+    """
+    Matriz de biadjacência esparsa (disciplinas x salas) só com os pares
+    viáveis (N[i] <= C[j]), de peso N[i] * D[i, j] + 1. O +1 soma a mesma
+    constante a todo emparelhamento completo (não muda o ótimo) e impede que
+    um peso zero seja lido como aresta ausente.
+    """
+    N = np.asarray(N, dtype=np.int64)
+    C = np.asarray(C, dtype=np.int64)
+    D = np.asarray(D)
+    n_disciplinas, n_salas = D.shape
+    if n_disciplinas == 0:
+        return sp.csr_matrix((n_disciplinas, n_salas), dtype=np.int64)
+
+    indices, pesos, contagens = [], [], []
+    for ini in range(0, n_disciplinas, tam_bloco):
+        Nb = N[ini:ini + tam_bloco]
+        linhas, colunas = np.nonzero(Nb[:, None] <= C[None, :])
+        indices.append(colunas.astype(np.int32))
+        pesos.append(D[ini + linhas, colunas] * Nb[linhas] + 1)
+        contagens.append(np.bincount(linhas, minlength=Nb.size))
+
+    indptr = np.concatenate([[0], np.cumsum(np.concatenate(contagens))])
+    return sp.csr_matrix((np.concatenate(pesos), np.concatenate(indices), indptr), shape=(n_disciplinas, n_salas))
+
+def emparelhar_esparso(grafo):
+    """
+    Emparelhamento de custo mínimo que cobre todas as disciplinas, só nas
+    arestas de grafo (ver arestas_viaveis). Retorna a sala de cada
+    disciplina, ou None se não existe alocação completa (inclusive quando há
+    mais disciplinas do que salas).
+    """
+    n_disciplinas, n_salas = grafo.shape
+    if n_disciplinas > n_salas:
+        return None
+    try:
+        row_ind, col_ind = min_weight_full_bipartite_matching(grafo)
+    except ValueError:
+        return None
+    if len(col_ind) != n_disciplinas:
+        return None
+    sala_de = np.empty(n_disciplinas, dtype=np.int64)
+    sala_de[row_ind] = col_ind
+    return sala_de
+
+def resolver_com_hungaro(caminho_csv, nome_instancia, modo="denso"):
+    """
+    modo="denso": matriz n x n com penalidade 10**6 nos pares que excedem a
+    capacidade (linear_sum_assignment).
+    modo="esparso": só as arestas viáveis (emparelhar_esparso); se não houver
+    alocação viável o status é "infeasible".
+    """
+    if modo == "esparso":
+        return resolver_com_hungaro_esparso(caminho_csv, nome_instancia)
+    if modo != "denso":
+        raise ValueError(f"Modo desconhecido: {modo}")
+
+    cronometro = Cronometro()
     # Lê os dados da instância
-    disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
+    with cronometro.fase("leitura"):
+        disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
 
     n = len(disciplinas)
 
-    # Converte dados para np.array
-    N = np.array(N)
-    C = np.array(C)
-    D = np.array(D)
+    with cronometro.fase("montagem"):
+        # Converte dados para np.array
+        N = np.array(N)
+        C = np.array(C)
+        D = np.array(D)
 
-    origem = [i for i in range(0, n)]
+        origem = [i for i in range(0, n)]
 
-    inicio = time.time()
-    # Calcula matriz de custo penalizada
-    Cp = np.zeros((n, n), dtype=int)
-    for i in range(n):
-        for j in range(n):
-            if N[i] <= C[j]:
-                Cp[i, j] = D[origem[i], j] * N[i]
-            else:
-                Cp[i, j] = 10**6  # penalização alta
+        # Calcula matriz de custo penalizada
+        Cp = np.zeros((n, n), dtype=int)
+        for i in range(n):
+            for j in range(n):
+                if N[i] <= C[j]:
+                    Cp[i, j] = D[origem[i], j] * N[i]
+                else:
+                    Cp[i, j] = 10**6  # penalização alta
 
     # Resolve com método húngaro
-    inicio = time.time()
-    row_ind, col_ind = linear_sum_assignment(Cp)
-    fim = time.time()
+    with cronometro.fase("solver"):
+        row_ind, col_ind = linear_sum_assignment(Cp)
 
-    tempo_execucao = fim - inicio
-    real_cost = sum(D[origem[i], col_ind[idx]] * N[i] for idx, i in enumerate(row_ind))
+    # tempo_execucao mantém a janela histórica (só o solver); a montagem de Cp fica em tempo_montagem
+    tempo_execucao = cronometro.segundos("solver")
+    with cronometro.fase("extracao"):
+        real_cost = sum(D[origem[i], col_ind[idx]] * N[i] for idx, i in enumerate(row_ind))
 
     status = "solved"
     codigo = f"hungaro"
 
-    salvar_resultado(status, real_cost, tempo_execucao, codigo, nome_instancia)
+    salvar_resultado(status, real_cost, tempo_execucao, codigo, nome_instancia, fases=cronometro.fases())
 
     print("\nStatus:", status)
     print("Deslocamento total:", real_cost)
     print("Tempo de execução:", tempo_execucao)
 
+def resolver_com_hungaro_esparso(caminho_csv, nome_instancia):
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
+
+    with cronometro.fase("montagem"):
+        N = np.array(N)
+        C = np.array(C)
+        D = np.array(D)
+        grafo = arestas_viaveis(N, C, D)
+
+    with cronometro.fase("solver"):
+        col_ind = emparelhar_esparso(grafo)
+
+    tempo_execucao = cronometro.segundos("solver")
+    with cronometro.fase("extracao"):
+        if col_ind is None:
+            status, real_cost = "infeasible", -1
+            print("[ERRO] Não existe alocação que respeite as capacidades das salas.")
+        else:
+            status = "solved"
+            real_cost = int(np.sum(D[np.arange(len(disciplinas)), col_ind] * N))
+
+    salvar_resultado(status, real_cost, tempo_execucao, "hungaro_esparso", nome_instancia, fases=cronometro.fases())
+
+    print("\nStatus:", status)
+    print("Deslocamento total:", real_cost if real_cost != -1 else "N/A")
+    print("Arestas viáveis:", grafo.nnz)
+    print("Tempo de execução:", tempo_execucao)
+
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de ensalamento com algoritmo de Kuhn-Munkres (Hungarian method).")
     parser.add_argument("-i", type=int, help="Número de disciplinas")
@@ -58,6 +149,8 @@ def main():
     parser.add_argument("--max_d", type=int, default=10)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--folder", type=str, default="instancias")
+    parser.add_argument("--modo", type=str, default="denso", choices=["denso", "esparso"],
+                        help="Matriz densa penalizada ou só as arestas viáveis (padrão: denso)")
 
     args = parser.parse_args()
 
@@ -73,7 +166,7 @@ def main():
     nome_instancia = f"D{args.i}_S{args.j}_[{args.min_alunos},{args.max_alunos}]_"
     nome_instancia += f"[{args.min_cap},{args.max_cap}]_[{args.min_d},{args.max_d}]_seed{args.seed}"
 
-    resolver_com_hungaro(caminho_csv, nome_instancia)
+    resolver_com_hungaro(caminho_csv, nome_instancia, modo=args.modo)
 
 if __name__ == "__main__":
     main()
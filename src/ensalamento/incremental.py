@@ -0,0 +1,401 @@
+import os
+import json
+import argparse
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from helpf import ler_instancia_csv, salvar_resultado
+from cronometro import Cronometro
+
+# -----------------------------
+# ESTADO QUENTE (ALOCAÇÃO + DUAIS)
+# -----------------------------
+# O problema é mantido quadrado: além das disciplinas reais (linhas
+# 0..nd-1) há ns - nd disciplinas fictícias, de custo zero em todas as
+# salas, que ocupam as salas vazias. O estado guarda a sala de cada linha,
+# o dono de cada sala e potenciais u (linhas) e v (salas) com
+#   c[i, j] - u[i] - v[j] >= 0 em todo par e = 0 nos pares alocados,
+# o que certifica a otimalidade. Cada alteração deixa no máximo uma linha e
+# uma sala livres, e um caminho aumentante mínimo (Dijkstra nos custos
+# reduzidos) restaura o ótimo.
+#
+# Pares que excedem a capacidade custam PENALIDADE (como no modo denso do
+# hungaro.py), maior que qualquer deslocamento total: o grafo é completo, um
+# estado intermediário nunca fica sem caminho, e a instância é inviável
+# exatamente quando o ótimo usa algum par penalizado.
+
+PENALIDADE = 10**9
+
+def caminho_estado(nome_instancia):
+    return f"solutions/estado_{nome_instancia}.npz"
+
+def custos_linha(estado, i):
+    """Custos N[i] * D[i, :] da linha i (PENALIDADE nas salas sem capacidade; zero se fictícia)."""
+    if i >= len(estado["N"]):
+        return np.zeros(len(estado["C"]))
+    N_i = estado["N"][i]
+    return np.where(N_i <= estado["C"], N_i * estado["D"][i], PENALIDADE)
+
+def _aumentar(estado, origem):
+    """
+    Caminho aumentante mínimo a partir da linha livre origem até a sala
+    livre, seguido do ajuste dos potenciais (as salas visitadas descem
+    δ - dist, as linhas da árvore sobem δ - dist).
+    """
+    sala_de, dono, u, v = estado["sala_de"], estado["dono"], estado["u"], estado["v"]
+    n = v.size
+    dist = np.full(n, np.inf)
+    anterior = np.full(n, -1, dtype=np.int64)
+    visitada = np.zeros(n, dtype=bool)
+    arvore = [(origem, 0.0)]
+
+    linha, d_linha = origem, 0.0
+    while True:
+        reduzidos = d_linha + custos_linha(estado, linha) - u[linha] - v
+        melhora = ~visitada & (reduzidos < dist)
+        dist[melhora] = reduzidos[melhora]
+        anterior[melhora] = linha
+
+        j = int(np.argmin(np.where(visitada, np.inf, dist)))
+        visitada[j] = True
+        if dono[j] < 0:
+            break
+        linha, d_linha = int(dono[j]), dist[j]
+        arvore.append((linha, d_linha))
+
+    delta = dist[j]
+    visitadas = np.flatnonzero(visitada)
+    v[visitadas] -= delta - dist[visitadas]
+    for k, d_k in arvore:
+        u[k] += delta - d_k
+
+    while True:
+        k = anterior[j]
+        proxima = sala_de[k]
+        sala_de[k] = j
+        dono[j] = k
+        if k == origem:
+            return
+        j = proxima
+
+def _custos_bloco(estado, ini, fim):
+    """Custos das linhas reais ini..fim-1 (PENALIDADE nas salas sem capacidade)."""
+    N = estado["N"][ini:fim, None]
+    return np.where(N <= estado["C"][None, :], N * estado["D"][ini:fim], PENALIDADE).astype(float)
+
+def recuperar_duais(estado, tam_bloco=1024):
+    """
+    Potenciais de uma alocação ótima já conhecida (sala_de/dono completos).
+    Com u[i] = c[i, sala_de[i]] - v[sala_de[i]], as condições viram
+    restrições de diferença entre salas,
+        v[j] <= v[sala_de[i]] + c[i, j] - c[i, sala_de[i]],
+    e v <= 0; v é o caminho mínimo a partir de uma origem ligada a todas as
+    salas com custo zero (Bellman-Ford por linhas em blocos, até estabilizar;
+    a otimalidade garante que não há ciclo negativo).
+    """
+    nd = len(estado["disciplinas"])
+    sala_de = estado["sala_de"]
+    v = np.zeros(len(estado["salas"]))
+    while True:
+        novo = v.copy()
+        for ini in range(0, nd, tam_bloco):
+            fim = min(ini + tam_bloco, nd)
+            custos = _custos_bloco(estado, ini, fim)
+            proprio = custos[np.arange(fim - ini), sala_de[ini:fim]]
+            np.minimum(novo, ((v[sala_de[ini:fim]] - proprio)[:, None] + custos).min(axis=0), out=novo)
+        # Fictícias: custo zero em todas as salas
+        if sala_de.size > nd:
+            np.minimum(novo, v[sala_de[nd:]].min(), out=novo)
+        if np.array_equal(novo, v):
+            break
+        v = novo
+
+    u = np.empty(sala_de.size)
+    for ini in range(0, nd, tam_bloco):
+        fim = min(ini + tam_bloco, nd)
+        u[ini:fim] = _custos_bloco(estado, ini, fim)[np.arange(fim - ini), sala_de[ini:fim]] - v[sala_de[ini:fim]]
+    u[nd:] = -v[sala_de[nd:]]
+    estado["u"], estado["v"] = u, v
+
+def estado_inicial(disciplinas, salas, N, C, D, tam_bloco=1024):
+    """
+    Resolve do zero: a alocação vem do linear_sum_assignment na matriz
+    penalizada, as salas que sobram vão para as fictícias e os potenciais são
+    recuperados por recuperar_duais. Retorna o estado, ou None se há mais
+    disciplinas que salas (a viabilidade das capacidades é dada por viavel).
+    """
+    nd, ns = len(disciplinas), len(salas)
+    if nd > ns:
+        return None
+    estado = {
+        "disciplinas": list(disciplinas),
+        "salas": list(salas),
+        "N": np.asarray(N, dtype=np.int64),
+        "C": np.asarray(C, dtype=np.int64),
+        "D": np.asarray(D, dtype=np.int64).reshape(nd, ns),
+    }
+    custos = np.vstack([_custos_bloco(estado, ini, min(ini + tam_bloco, nd)) for ini in range(0, nd, tam_bloco)]
+                       or [np.zeros((0, ns))])
+    _, salas_reais = linear_sum_assignment(custos)
+    del custos
+
+    sala_de = np.empty(ns, dtype=np.int64)
+    sala_de[:nd] = salas_reais
+    livres = np.ones(ns, dtype=bool)
+    livres[salas_reais] = False
+    sala_de[nd:] = np.flatnonzero(livres)
+    dono = np.empty(ns, dtype=np.int64)
+    dono[sala_de] = np.arange(ns)
+
+    estado["sala_de"], estado["dono"] = sala_de, dono
+    recuperar_duais(estado, tam_bloco)
+    return estado
+
+def viavel(estado):
+    """Toda disciplina está numa sala com capacidade suficiente."""
+    nd = len(estado["disciplinas"])
+    return bool(np.all(estado["N"] <= estado["C"][estado["sala_de"][:nd]]))
+
+def custo_estado(estado):
+    nd = len(estado["disciplinas"])
+    return int(np.sum(estado["N"] * estado["D"][np.arange(nd), estado["sala_de"][:nd]]))
+
+def alocacao_estado(estado):
+    nd = len(estado["disciplinas"])
+    return {estado["disciplinas"][i]: estado["salas"][j] for i, j in enumerate(estado["sala_de"][:nd].tolist())}
+
+# -----------------------------
+# ALTERAÇÕES
+# -----------------------------
+def _realocar_linha(estado, i):
+    """Refaz u[i] com os custos atuais da linha, libera sua sala e a realoca."""
+    estado["u"][i] = np.min(custos_linha(estado, i) - estado["v"])
+    j = estado["sala_de"][i]
+    if j >= 0:
+        estado["dono"][j] = -1
+        estado["sala_de"][i] = -1
+    _aumentar(estado, i)
+
+def _remover_linha(estado, i):
+    """Remove a linha fictícia i (livre ou não), liberando sua sala."""
+    j = estado["sala_de"][i]
+    if j >= 0:
+        estado["dono"][j] = -1
+    for chave in ("sala_de", "u"):
+        estado[chave] = np.delete(estado[chave], i)
+    dono = estado["dono"]
+    dono[dono > i] -= 1
+
+def remover_sala(estado, nome):
+    """
+    Remove a sala; uma linha fictícia sai junto. Se a sala era de uma
+    disciplina real, ela herda a sala da fictícia removida por um caminho
+    aumentante. Retorna False se não sobram salas para todas as disciplinas.
+    """
+    j = estado["salas"].index(nome)
+    nd = len(estado["disciplinas"])
+    if len(estado["salas"]) - 1 < nd:
+        return False
+
+    k = int(estado["dono"][j])
+    estado["salas"].pop(j)
+    estado["C"] = np.delete(estado["C"], j)
+    estado["D"] = np.delete(estado["D"], j, axis=1)
+    for chave in ("dono", "v"):
+        estado[chave] = np.delete(estado[chave], j)
+    sala_de = estado["sala_de"]
+    sala_de[sala_de == j] = -1
+    sala_de[sala_de > j] -= 1
+
+    if k >= nd:
+        _remover_linha(estado, k)
+    else:
+        _remover_linha(estado, len(estado["salas"]))
+        _aumentar(estado, k)
+    return True
+
+def adicionar_sala(estado, nome, capacidade, distancias):
+    """
+    Acrescenta uma sala (capacidade e distância de cada disciplina) e uma
+    linha fictícia livre. v da sala nova é o maior valor que mantém os custos
+    reduzidos não negativos; a fictícia é então alocada por um caminho
+    aumentante (e, se alguma disciplina preferir a sala nova, é ela quem muda).
+    """
+    nd = len(estado["disciplinas"])
+    distancias = np.asarray(distancias, dtype=np.int64)
+    estado["salas"].append(nome)
+    estado["C"] = np.append(estado["C"], capacidade)
+    estado["D"] = np.hstack([estado["D"], distancias.reshape(nd, 1)])
+
+    linhas = np.arange(estado["u"].size)
+    reais = linhas < nd
+    coluna = np.zeros(linhas.size)
+    coluna[reais] = np.where(estado["N"] <= capacidade, estado["N"] * distancias, PENALIDADE)
+    v_nova = np.min(coluna - estado["u"], initial=0.0)
+
+    estado["v"] = np.append(estado["v"], v_nova)
+    estado["dono"] = np.append(estado["dono"], -1)
+    estado["sala_de"] = np.append(estado["sala_de"], -1)
+    estado["u"] = np.append(estado["u"], -estado["v"].max())
+    _aumentar(estado, linhas.size)
+
+def reotimizar(estado, delta):
+    """
+    Aplica ao estado (que é alterado) as mudanças de delta e restaura o ótimo
+    com um caminho aumentante por mudança. delta é um dicionário com as
+    chaves opcionais:
+    - "N": {disciplina: novo número de alunos}
+    - "D": {disciplina: nova linha de distâncias (na ordem atual das salas)}
+    - "remover_salas": [sala, ...]
+    - "adicionar_salas": {sala: [capacidade, [distância de cada disciplina]]}
+    As salas novas entram antes das remoções, para que uma troca de sala
+    numa instância quadrada continue viável. Retorna o número de reparos,
+    ou None se restam menos salas que disciplinas (o estado fica
+    inutilizável); a viabilidade das capacidades é dada por viavel.
+    """
+    indice = {d: i for i, d in enumerate(estado["disciplinas"])}
+    novos_N = {indice[d]: valor for d, valor in delta.get("N", {}).items()}
+    novas_D = {indice[d]: linha for d, linha in delta.get("D", {}).items()}
+
+    # Uma linha por vez: as outras linhas precisam estar com custos e
+    # potenciais coerentes quando o caminho aumentante passa por elas
+    reparos = 0
+    for i in sorted(novos_N.keys() | novas_D.keys()):
+        if i in novos_N:
+            estado["N"][i] = novos_N[i]
+        if i in novas_D:
+            estado["D"][i] = novas_D[i]
+        _realocar_linha(estado, i)
+        reparos += 1
+    for nome, (capacidade, distancias) in delta.get("adicionar_salas", {}).items():
+        adicionar_sala(estado, nome, capacidade, distancias)
+        reparos += 1
+    for nome in delta.get("remover_salas", []):
+        if not remover_sala(estado, nome):
+            return None
+        reparos += 1
+    return reparos
+
+# -----------------------------
+# PERSISTÊNCIA
+# -----------------------------
+def salvar_estado(estado, nome_instancia):
+    """Grava o estado em solutions/estado_<nome>.npz (escrita atômica)."""
+    caminho = caminho_estado(nome_instancia)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(temporario, disciplinas=np.array(estado["disciplinas"]), salas=np.array(estado["salas"]),
+                        **{chave: estado[chave] for chave in ("N", "C", "D", "sala_de", "dono", "u", "v")})
+    os.replace(temporario, caminho)
+    return caminho
+
+def carregar_estado(nome_instancia):
+    caminho = caminho_estado(nome_instancia)
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho) as dados:
+        estado = {chave: dados[chave] for chave in ("N", "C", "D", "sala_de", "dono", "u", "v")}
+        estado["disciplinas"] = dados["disciplinas"].tolist()
+        estado["salas"] = dados["salas"].tolist()
+    return estado
+
+def resolver_do_zero(caminho_csv, nome_instancia):
+    """Resolve a instância do zero (código "incremental_inicial") e grava o estado quente."""
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        disciplinas, salas, N, C, D = ler_instancia_csv(caminho_csv)
+
+    with cronometro.fase("solver"):
+        estado = estado_inicial(disciplinas, salas, N, C, D)
+
+    return _registrar(estado, cronometro, "incremental_inicial", nome_instancia)
+
+def resolver_com_delta(caminho_csv, nome_instancia, caminho_delta, nome_saida=None):
+    """
+    Parte do estado gravado da instância (resolvida do zero, e gravada, se
+    ainda não houver estado), aplica o delta (JSON no formato de reotimizar)
+    e registra a instância alterada como nome_saida (código "incremental"),
+    gravando também o seu estado.
+    """
+    nome_saida = nome_saida or f"{nome_instancia}_delta"
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        estado = carregar_estado(nome_instancia)
+        with open(caminho_delta) as f:
+            delta = json.load(f)
+
+    if estado is None:
+        print(f"[INFO] Sem estado gravado para {nome_instancia}; resolvendo do zero.")
+        with cronometro.fase("montagem"):
+            estado = estado_inicial(*ler_instancia_csv(caminho_csv))
+            if estado is not None:
+                salvar_estado(estado, nome_instancia)
+
+    reparos = None
+    with cronometro.fase("solver"):
+        if estado is not None:
+            reparos = reotimizar(estado, delta)
+    if reparos is None:
+        estado = None
+    else:
+        print("Reparos:", reparos)
+
+    return _registrar(estado, cronometro, "incremental", nome_saida)
+
+def _registrar(estado, cronometro, codigo, nome_instancia):
+    tempo_execucao = cronometro.segundos("solver")
+    with cronometro.fase("extracao"):
+        if estado is None or not viavel(estado):
+            status, real_cost = "infeasible", -1
+            print("[ERRO] Não existe alocação que respeite as capacidades das salas.")
+        else:
+            status, real_cost = "solved", custo_estado(estado)
+    # Mesmo inviável, o estado (com pares penalizados) é um ponto de partida válido
+    if estado is not None:
+        with cronometro.fase("escrita"):
+            salvar_estado(estado, nome_instancia)
+
+    salvar_resultado(status, real_cost, tempo_execucao, codigo, nome_instancia, fases=cronometro.fases())
+
+    print("\nStatus:", status)
+    print("Deslocamento total:", real_cost if real_cost != -1 else "N/A")
+    print("Tempo de execução:", tempo_execucao)
+    return estado
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve o ensalamento guardando alocação e duais, e reotimiza a partir deles após mudanças.")
+    parser.add_argument("-i", type=int, help="Número de disciplinas")
+    parser.add_argument("-j", type=int, help="Número de salas")
+    parser.add_argument("--min_alunos", type=int, default=10)
+    parser.add_argument("--max_alunos", type=int, default=90)
+    parser.add_argument("--min_cap", type=int, default=30)
+    parser.add_argument("--max_cap", type=int, default=90)
+    parser.add_argument("--min_d", type=int, default=1)
+    parser.add_argument("--max_d", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--folder", type=str, default="instancias")
+    parser.add_argument("--delta", type=str, default=None,
+                        help="JSON com as mudanças (N, D, remover_salas, adicionar_salas); sem ele, resolve do zero")
+    parser.add_argument("--nome_saida", type=str, default=None,
+                        help="Nome da instância alterada nos resultados (padrão: <instância>_delta)")
+
+    args = parser.parse_args()
+
+    nome_arquivo = f"ensalamento_D{args.i}_S{args.j}_[{args.min_alunos},{args.max_alunos}]_"
+    nome_arquivo += f"[{args.min_cap},{args.max_cap}]_[{args.min_d},{args.max_d}]_seed{args.seed}.csv"
+
+    caminho_csv = os.path.join(args.folder, nome_arquivo)
+
+    if not os.path.exists(caminho_csv):
+        print(f"Arquivo {caminho_csv} não encontrado.")
+        return
+
+    nome_instancia = f"D{args.i}_S{args.j}_[{args.min_alunos},{args.max_alunos}]_"
+    nome_instancia += f"[{args.min_cap},{args.max_cap}]_[{args.min_d},{args.max_d}]_seed{args.seed}"
+
+    if args.delta is None:
+        resolver_do_zero(caminho_csv, nome_instancia)
+    else:
+        resolver_com_delta(caminho_csv, nome_instancia, args.delta, args.nome_saida)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import os
+import sys
+
+# -----------------------------
+# RESULTADOS DO ENSALAMENTO
+# -----------------------------
+# O banco (SQLite) é o de src/comum/banco_resultados.py, comum às duas pastas,
+# com instancia = nome_instancia (ex.: D101_S101_[10,90]_[30,90]_[1,10]_seed42).
+# Os CSVs solutions/resultado_*.csv continuam sendo gravados (helpf.salvar_resultado)
+# para tabelas_heu, graficos_heu e tabela_solvers.
+COMUM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "comum")
+if COMUM not in sys.path:
+    sys.path.append(COMUM)
+
+from banco_resultados import (CAMINHO_BANCO, COLUNAS_FASES, COLUNAS_CSV, conectar, instancia_do_csv,
+                              sincronizar_csv, registrar_resultados, registrar_resultado, anexar_csv,
+                              contar_execucoes, ler_tempos_custos, melhor_custo, main as importar_csvs)
+
+if __name__ == "__main__":
+    importar_csvs("resultado_*.csv")
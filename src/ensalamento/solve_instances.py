@@ -1,8 +1,8 @@
-import os
 import sys
+import argparse
 import subprocess
-import random
-import pandas as pd
+from resultados import sincronizar_csv, contar_execucoes
+from campanha import executar_campanha, preparar_csv
 
 # Parâmetros fixos
 python_exec = sys.executable
@@ -20,25 +20,23 @@ min_d = 1
 max_d = 10
 seed = 42
 
-def contar_execucoes_existentes(nome_instancia, solver):
+def contar_execucoes_existentes(nome_instancia, solver, presolve=False):
     path_csv = f"solutions/resultado_{nome_instancia}.csv"
     print(path_csv)
-    if not os.path.exists(path_csv):
-        return 0
-    try:
-        df = pd.read_csv(path_csv)
-        return len(df[df["codigo"] == f"ensalamento_ampl_{solver}"])
-    except Exception as e:
-        print(f"[ERRO] ao ler {path_csv}: {e}")
-        return 0
+    sincronizar_csv(path_csv, nome_instancia)
+    codigo = f"ensalamento_ampl_{solver}" + ("_presolve" if presolve else "")
+    return contar_execucoes(nome_instancia, codigo)
 
-def rodar_execucao(tam, solver):
+def rodar_execucao(tam, solver, threads=1, presolve=False):
     cmd = [
         python_exec, "ensalamento_ampl.py",
         "-i", str(tam),
         "-j", str(tam),
-        "--solver", solver
+        "--solver", solver,
+        "--threads", str(threads)
     ]
+    if presolve:
+        cmd.append("--presolve")
     subprocess.run(cmd, check=True)
 
 def executar(tam, solver):
@@ -51,33 +49,32 @@ def executar(tam, solver):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Executa a campanha de solvers AMPL nas instâncias de ensalamento.")
+    parser.add_argument("--concorrencia", type=int, default=1, help="Execuções simultâneas, uma por núcleo (padrão: 1)")
+    parser.add_argument("--threads", type=int, default=1, help="Threads por solver (padrão: 1)")
+    parser.add_argument("--presolve", action="store_true", help="Usa o modelo só com os pares viáveis")
+    args = parser.parse_args()
+
+    # Construir fila de execuções necessárias
+    fila_execucao = []
     for tam in tamanhos:
         nome_instancia = f"D{tam}_S{tam}_[{min_alunos},{max_alunos}]_[{min_cap},{max_cap}]_[{min_d},{max_d}]_seed{seed}"
         print(f"\n>> Verificando instância: {nome_instancia}")
+        preparar_csv(f"solutions/resultado_{nome_instancia}.csv")
 
-        # Construir fila de execuções necessárias
-        fila_execucao = []
+        pendentes = 0
         for solver in solvers:
-            existentes = contar_execucoes_existentes(nome_instancia, solver)
+            existentes = contar_execucoes_existentes(nome_instancia, solver, args.presolve)
             faltam = K - existentes
             if faltam > 0:
-                fila_execucao.extend([solver] * faltam)
+                fila_execucao.extend([(tam, solver, args.threads, args.presolve)] * faltam)
+                pendentes += faltam
 
-        if not fila_execucao:
+        if not pendentes:
             print(f"[OK] Já há {K} execuções para todos os solvers em {nome_instancia}")
-            continue
 
-        # Embaralhar solvers e executar
-        random.shuffle(fila_execucao)
-        print(f"[INFO] Rodando {len(fila_execucao)} execuções pendentes...")
-        
-        for solver in fila_execucao:
-            try:
-                print(f"  -> Executando {solver} para {nome_instancia}")
-                rodar_execucao(tam, solver)
-                #executar(tam, solver)
-            except subprocess.CalledProcessError as e:
-                print(f"[ERRO] na execução com {solver} para {nome_instancia}")
+    # Embaralha e executa; falhas de um solver são relatadas sem interromper a campanha
+    executar_campanha(fila_execucao, rodar_execucao, concorrencia=args.concorrencia, threads_solver=args.threads)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -14,7 +14,7 @@ min_d = 1
 max_d = 10
 seed = 42
 
-solvers = ["hungaro", "gulosa"]
+solvers = ["hungaro", "gulosa", "gulosa_busca_local", "leilao"]
 solver_otimo = "ensalamento_ampl_gurobi"
 
 os.makedirs("tabelas", exist_ok=True)
@@ -0,0 +1,18 @@
+set I;
+set J;
+set ARCOS within {I, J};
+
+param O {i in I};
+param D {j in J};
+param C {(i,j) in ARCOS};
+
+var x {(i,j) in ARCOS} >= 0, integer;
+
+minimize Total_Cost:
+    sum {(i,j) in ARCOS} C[i,j] * x[i,j];
+
+subject to Oferta {i in I}:
+    sum {(i,j) in ARCOS} x[i,j] <= O[i];
+
+subject to Demanda {j in J}:
+    sum {(i,j) in ARCOS} x[i,j] >= D[j];
@@ -1,28 +1,33 @@
 import os
-import csv
-import random
+import argparse
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from tClassico_ampl import ler_instancia_csv, resolver_ampl
+from tClassico_ampl import resolver_ampl, codigo_ampl
+from helpf import instancia_existe, carregar_instancia
+from cronometro import Cronometro
+from resultados import sincronizar_csv, ler_tempos_custos, instancia_do_csv
+from campanha import executar_campanha, preparar_csv
 
 
 def ler_tempos_existentes(filepath_csv, codigo, max_repeticoes):
-    if not os.path.exists(filepath_csv):
-        return []
+    sincronizar_csv(filepath_csv)
+    tempos, _ = ler_tempos_custos(instancia_do_csv(filepath_csv), codigo, max_repeticoes)
+    return tempos
 
-    try:
-        df = pd.read_csv(filepath_csv)
-        df_filtrado = df[df["codigo"] == codigo]
-        df_amostra = df_filtrado.sample(n=min(max_repeticoes, len(df_filtrado)), random_state=None)
-        tempos = df_amostra["tempo_execucao"].astype(float).tolist()
-        return tempos
-    except Exception as e:
-        print(f"Erro ao ler {filepath_csv}: {e}")
-        return []
 
+def executar_solver(nome_arquivo, solver, threads, entrada="arquivo"):
+    """
+    Uma execução da campanha, dentro de um processo do pool. Com
+    entrada="memoria" a sessão AMPL do processo é reaproveitada entre tarefas.
+    """
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        (Oi, Dj, Cost), _ = carregar_instancia(nome_arquivo)
+    i, j = Cost.shape
+    resolver_ampl(i, j, Oi, Dj, Cost, solver, nome_arquivo, threads=threads, cronometro=cronometro, entrada=entrada)
 
-def benchmark_ampl_solvers():
+
+def benchmark_ampl_solvers(concorrencia=1, threads_solver=1, entrada="arquivo"):
     tamanhos = [11, 101, 201, 301, 401, 501, 601, 701, 801, 901, 1001, 2001]
     min_val = 1
     max_val = 100
@@ -32,33 +37,34 @@ def benchmark_ampl_solvers():
 
     tempos_por_solver = {solver: [] for solver in solvers}
 
+    # Fila de execuções pendentes de toda a campanha (retoma o que já está no banco)
+    arquivos = {}
+    tarefas = []
     for n in tamanhos:
-        print(f"\nTamanho: {n}x{n}")
         nome_arquivo = f"instancias/problema_{n}x{n}_[{min_val},{max_val}]_seed{seed}"
-        if not os.path.exists(nome_arquivo):
+        if not instancia_existe(nome_arquivo):
             print(f"Arquivo não encontrado: {nome_arquivo}")
             continue
 
         caminho_csv = nome_arquivo.replace("instancias/", "solutions/") + "_resultado.csv"
-        i, j, Oi, Dj, Cost = ler_instancia_csv(nome_arquivo)
-
-        # Define ordem intercalada
-        execucoes = solvers * rep
-        random.shuffle(execucoes)
-
-        tempos_solver_local = {solver: ler_tempos_existentes(caminho_csv, f"tClassico_ampl_{solver}", rep) for solver in solvers}
+        arquivos[n] = (nome_arquivo, caminho_csv)
+        preparar_csv(caminho_csv)
+        for solver in solvers:
+            feitas = len(ler_tempos_existentes(caminho_csv, codigo_ampl(solver, entrada=entrada), rep))
+            tarefas.extend([(nome_arquivo, solver, threads_solver, entrada)] * (rep - feitas))
 
-        for solver in execucoes:
-            if len(tempos_solver_local[solver]) >= rep:
-                continue
-            print(f"  {solver} - Resolvendo ({len(tempos_solver_local[solver])+1}/{rep})")
-            resolver_ampl(i, j, Oi, Dj, Cost, solver, nome_arquivo)
+    executar_campanha(tarefas, executar_solver, concorrencia=concorrencia, threads_solver=threads_solver)
 
-            # Releitura após adicionar resultado
-            tempos_solver_local[solver] = ler_tempos_existentes(caminho_csv, f"tClassico_ampl_{solver}", rep)
+    for n in tamanhos:
+        print(f"\nTamanho: {n}x{n}")
+        if n not in arquivos:
+            for solver in solvers:
+                tempos_por_solver[solver].append(np.nan)
+            continue
 
+        _, caminho_csv = arquivos[n]
         for solver in solvers:
-            media_tempo = np.mean(tempos_solver_local[solver])
+            media_tempo = np.mean(ler_tempos_existentes(caminho_csv, codigo_ampl(solver, entrada=entrada), rep))
             tempos_por_solver[solver].append(media_tempo)
             print(f"Tempo médio {solver}: {media_tempo:.4f}s")
 
@@ -79,4 +85,10 @@ def benchmark_ampl_solvers():
 
 
 if __name__ == "__main__":
-    benchmark_ampl_solvers()
+    parser = argparse.ArgumentParser(description="Compara os solvers AMPL nas instâncias de transporte.")
+    parser.add_argument("--concorrencia", type=int, default=1, help="Execuções simultâneas, uma por núcleo (padrão: 1)")
+    parser.add_argument("--threads", type=int, default=1, help="Threads por solver (padrão: 1)")
+    parser.add_argument("--entrada", type=str, default="arquivo", choices=["arquivo", "memoria"],
+                        help="Dados via arquivo .dat ou sessão AMPL persistente por processo (padrão: arquivo)")
+    args = parser.parse_args()
+    benchmark_ampl_solvers(concorrencia=args.concorrencia, threads_solver=args.threads, entrada=args.entrada)
@@ -1,28 +1,14 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import os
-import csv
-from tClassico import solve_transport_problem, salvar_resultado as salvar_classico
-from tRestrito import solve_flow_problem, salvar_resultado as salvar_fluxo
+from metodos import executar_metodo
+from helpf import instancia_existe, carregar_instancia
+from resultados import sincronizar_csv, ler_tempos_custos, instancia_do_csv
 
 def ler_tempos_existentes(filepath_csv, codigo, max_repeticoes):
-    if not os.path.exists(filepath_csv):
-        return []
-
-    try:
-        df = pd.read_csv(filepath_csv)
-
-        df_filtrado = df[df["codigo"] == codigo]
-
-        df_amostra = df_filtrado.sample(n=min(max_repeticoes, len(df_filtrado)), random_state=None)
-
-        tempos = df_amostra["tempo_execucao"].astype(float).tolist()
-        return tempos
-
-    except Exception as e:
-        print(f"Erro ao ler {filepath_csv}: {e}")
-        return []
+    sincronizar_csv(filepath_csv)
+    tempos, _ = ler_tempos_custos(instancia_do_csv(filepath_csv), codigo, max_repeticoes)
+    return tempos
 
 def benchmark_transport():
     tamanhos = [11, 101, 201, 301, 401, 501, 601, 701, 801, 901, 1001, 2001]
@@ -38,11 +24,13 @@ def benchmark_transport():
         print(f"\nTamanho: {n}x{n}")
 
         nome_arquivo = f"instancias/problema_{n}x{n}_[{min_val},{max_val}]_seed{seed}"
-        if not os.path.exists(nome_arquivo):
+        if not instancia_existe(nome_arquivo):
             print(f"Arquivo não encontrado: {nome_arquivo}")
             continue
 
         caminho_csv = nome_arquivo.replace("instancias/", "solutions/") + "_resultado.csv"
+        _, tempo_leitura = carregar_instancia(nome_arquivo)
+        print(f"  Instância carregada em {tempo_leitura:.4f}s")
 
         # ----- Clássico -----
         t_classico = ler_tempos_existentes(caminho_csv, "tClassico", rep)
@@ -52,8 +40,7 @@ def benchmark_transport():
         else:
             for r in range(len(t_classico), rep):
                 print(f"  Clássico - Resolvendo repetição {r+1}/{rep}")
-                status_c, custo_c, tempo_c = solve_transport_problem(nome_arquivo)
-                salvar_classico(nome_arquivo, status_c, custo_c, tempo_c)
+                status_c, custo_c, tempo_c = executar_metodo("tClassico", nome_arquivo)
                 t_classico.append(tempo_c)
 
         # ----- Fluxo -----
@@ -63,8 +50,7 @@ def benchmark_transport():
         else:
             for r in range(len(t_fluxo), rep):
                 print(f"  Fluxo - Resolvendo repetição {r+1}/{rep}")
-                status_f, custo_f, tempo_f = solve_flow_problem(nome_arquivo)
-                salvar_fluxo(nome_arquivo, status_f, custo_f, tempo_f)
+                status_f, custo_f, tempo_f = executar_metodo("tRestrito", nome_arquivo)
                 t_fluxo.append(tempo_f)
 
         # Média dos tempos
@@ -0,0 +1,36 @@
+import os
+import glob
+import argparse
+import time
+from helpf import ler_instancia_csv, salvar_instancia_binaria, caminho_binario, arquivo_instancia, EXTENSAO_ESPARSA
+
+def converter_instancia(filepath, sobrescrever=False):
+    destino = caminho_binario(filepath)
+    # Um binário mais antigo que o CSV está desatualizado e é regravado
+    if arquivo_instancia(filepath) == destino and not sobrescrever:
+        print(f"[INFO] {destino} já existe. Pulando.")
+        return destino
+
+    supply, demand, costs = ler_instancia_csv(filepath)
+    salvar_instancia_binaria(filepath, supply, demand, costs)
+    print(f"[INFO] {filepath} -> {destino}")
+    return destino
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte as instâncias CSV de transporte para o formato binário.")
+    parser.add_argument("--folder", type=str, default="instancias", help="Pasta das instâncias (padrão: instancias)")
+    parser.add_argument("--sobrescrever", action="store_true", help="Regrava arquivos binários já existentes")
+    args = parser.parse_args()
+
+    arquivos = sorted(f for f in glob.glob(os.path.join(args.folder, "problema_*")) if not f.endswith((".bin", EXTENSAO_ESPARSA)))
+    if not arquivos:
+        print(f"Nenhuma instância encontrada em {args.folder}.")
+        return
+
+    start = time.time()
+    for filepath in arquivos:
+        converter_instancia(filepath, args.sobrescrever)
+    print(f"{len(arquivos)} instâncias processadas em {time.time() - start:.2f} segundos")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
+import os
 import numpy as np
 import pandas as pd
+import argparse
+from helpf import (ASSINATURA_BINARIA, TAMANHO_CABECALHO, caminho_binario,
+                   montar_custos_esparsos, salvar_instancia_esparsa, nome_instancia_esparsa, nome_instancia_stream)
+
+def remover_se_existe(path):
+    # Um .bin ou CSV de uma geração anterior com o mesmo nome não pode sobreviver à nova
+    if os.path.exists(path):
+        os.remove(path)
 
 def gen_transport_problem(oferta, demanda, seed=None, min_val=1, max_val=100):
     if seed is not None:
@@ -36,10 +45,118 @@ def save_transport_problem_to_csv(filename, oferta, demanda, seed=None, min_val=
 
     df = pd.DataFrame(rows)
     df.to_csv(filename, index=False, header=False)
+    remover_se_existe(caminho_binario(filename))
+
+
+def save_transport_problem_streaming(filename, oferta, demanda, seed=None, min_val=1, max_val=100,
+                                     tam_bloco=1024, formatos=("csv", "bin")):
+    """
+    Gera e grava a instância em blocos de tam_bloco linhas da matriz de
+    custos, sem nunca materializá-la inteira: a memória fica limitada a um
+    bloco, independente do tamanho da instância.
+
+    Usa np.random.Generator(seed); para a mesma seed e o mesmo tam_bloco a
+    saída é idêntica bit a bit (mas difere da gerada por
+    save_transport_problem_to_csv, que usa o gerador global legado).
+    O CSV segue o layout preenchido de sempre e o binário o formato de
+    helpf.ler_instancia_binaria (filename + ".bin"); o formato que não for
+    gravado é removido, se existir. main() grava com nome_instancia_stream,
+    para não se confundir com as instâncias do gerador legado.
+    """
+    rng = np.random.default_rng(seed)
+
+    A = rng.integers(min_val, max_val + 1, size=oferta)
+    raw_B = rng.random(demanda)
+    B = (raw_B / raw_B.sum()) * (A.sum() * rng.uniform(0.5, 1.0))
+    B = np.floor(B).astype(np.int64)
+
+    largura = max(oferta, demanda, 2)
+    preenchimento = "," * (largura - demanda)
+
+    if "csv" not in formatos:
+        remover_se_existe(filename)
+    if "bin" not in formatos:
+        remover_se_existe(caminho_binario(filename))
+
+    arq_csv = open(filename, "w", newline="") if "csv" in formatos else None
+    arq_bin = open(caminho_binario(filename), "wb") if "bin" in formatos else None
+    try:
+        if arq_csv is not None:
+            arq_csv.write(f"{oferta},{demanda}" + "," * (largura - 2) + "\n")
+            arq_csv.write(",".join(map(str, A)) + "," * (largura - oferta) + "\n")
+            arq_csv.write(",".join(map(str, B)) + preenchimento + "\n")
+        if arq_bin is not None:
+            cabecalho = bytearray(TAMANHO_CABECALHO)
+            cabecalho[0:8] = ASSINATURA_BINARIA
+            cabecalho[8:24] = np.array([oferta, demanda], dtype="<i8").tobytes()
+            cabecalho[24:32] = b"<i4".ljust(8)
+            arq_bin.write(cabecalho)
+            arq_bin.write(A.astype("<i8").tobytes())
+            arq_bin.write(B.astype("<i8").tobytes())
+
+        for inicio in range(0, oferta, tam_bloco):
+            linhas = min(tam_bloco, oferta - inicio)
+            bloco = rng.integers(min_val, max_val + 1, size=(linhas, demanda), dtype=np.int32)
+            if arq_csv is not None:
+                np.savetxt(arq_csv, bloco, fmt="%d", delimiter=",", newline=preenchimento + "\n")
+            if arq_bin is not None:
+                arq_bin.write(bloco.astype("<i4", copy=False).tobytes())
+    finally:
+        if arq_csv is not None:
+            arq_csv.close()
+        if arq_bin is not None:
+            arq_bin.close()
 
+    return A, B
 
+def gen_transport_problem_esparso(oferta, demanda, densidade, seed=None, min_val=1, max_val=100):
+    """
+    Gera uma instância em que só uma fração densidade dos pares
+    origem-destino são rotas permitidas, sem nunca criar a matriz m x n.
+
+    Cada destino recebe um arco "de suporte" a partir de uma origem sorteada e
+    a demanda dos destinos de uma origem é uma fração (50% a 100%, como em
+    gen_transport_problem) da oferta dessa origem; assim a instância é
+    sempre viável. Os demais arcos são sorteados linha a linha.
+    Retorna A, B e os custos em CSR (ver helpf.montar_custos_esparsos).
+    """
+    rng = np.random.default_rng(seed)
+
+    A = rng.integers(min_val, max_val + 1, size=oferta)
+
+    suporte = rng.integers(0, oferta, size=demanda)
+    pesos = rng.random(demanda)
+    soma_pesos = np.bincount(suporte, weights=pesos, minlength=oferta)
+    fator = rng.uniform(0.5, 1.0)
+    B = np.floor(A[suporte] * fator * pesos / soma_pesos[suporte]).astype(np.int64)
+
+    linhas = [suporte]
+    colunas = [np.arange(demanda)]
+    por_linha = rng.binomial(demanda, densidade, size=oferta)
+    for i in np.flatnonzero(por_linha):
+        linhas.append(np.full(por_linha[i], i))
+        colunas.append(rng.choice(demanda, size=por_linha[i], replace=False))
+    chaves = np.unique(np.concatenate(linhas).astype(np.int64) * demanda + np.concatenate(colunas))
+
+    custos = rng.integers(min_val, max_val + 1, size=chaves.size)
+    return A, B, montar_custos_esparsos(oferta, demanda, chaves // demanda, chaves % demanda, custos)
+
+def save_transport_problem_esparso(filename, oferta, demanda, densidade, seed=None, min_val=1, max_val=100):
+    A, B, custos = gen_transport_problem_esparso(oferta, demanda, densidade, seed, min_val, max_val)
+    salvar_instancia_esparsa(filename, A, B, custos)
+    return A, B, custos
 
 def main():
+    parser = argparse.ArgumentParser(description="Gera instâncias do problema de transporte.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Gera em blocos de linhas com np.random.Generator (memória limitada a um bloco)")
+    parser.add_argument("--tam_bloco", type=int, default=1024, help="Linhas de custo por bloco no modo streaming")
+    parser.add_argument("--formatos", type=str, nargs="+", default=["csv", "bin"], choices=["csv", "bin"],
+                        help="Formatos de saída no modo streaming (padrão: csv bin)")
+    parser.add_argument("--densidade", type=float, default=None,
+                        help="Gera instâncias esparsas (.arcos) com esta fração de rotas permitidas")
+    args = parser.parse_args()
+
     m, n = 1, 1
     max_m, max_n = 10000, 10000
     seed = 42
@@ -47,8 +164,24 @@ def main():
     max_val=100
     for i in range(m, max_m+1, 1000):
         for j in range(n, max_n+1, 1000):
+            if args.densidade is not None:
+                nome = nome_instancia_esparsa(i, j, args.densidade, min_val, max_val, seed)
+                print(nome)
+                save_transport_problem_esparso(nome, oferta=i, demanda=j, densidade=args.densidade,
+                                               seed=seed, min_val=min_val, max_val=max_val)
+                continue
+            if args.streaming:
+                nome = nome_instancia_stream(i, j, min_val, max_val, seed)
+                print(nome)
+                save_transport_problem_streaming(nome,
+                oferta=i, demanda=j, seed=seed,
+                min_val=min_val, max_val=max_val,
+                tam_bloco=args.tam_bloco, formatos=args.formatos)
+                continue
             print(f"instancias/problema_{i}x{j}_[{min_val},{max_val}]_seed{seed}")
             save_transport_problem_to_csv(f"instancias/problema_{i}x{j}_[{min_val},{max_val}]_seed{seed}", 
             oferta=i, demanda=j, seed=seed, 
             min_val=min_val, max_val=max_val)
-main()
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
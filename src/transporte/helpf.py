@@ -1,30 +1,120 @@
-def salvar_dados_ampl_transport(Oi, Dj, Cost, filename="dados.dat"):
+import io
+import os
+import gzip
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from collections import OrderedDict
+
+# Inteiros com faixa até este tamanho são convertidos por tabela valor -> texto
+LIMITE_TABELA_TEXTO = 1 << 20
+
+def escrever_matriz_dat(f, rotulos, matriz, tam_bloco=1024):
+    """
+    Escreve "rotulo v1 v2 ... vn" para cada linha da matriz, gravando cada
+    bloco de linhas num único write. Inteiros de faixa limitada (custos,
+    ofertas) viram texto por uma tabela indexada pela própria matriz, sem um
+    str() por célula; os demais são formatados em bloco por np.savetxt.
+    """
+    matriz = np.asarray(matriz)
+    if matriz.ndim == 1:
+        matriz = matriz[:, None]
+    if matriz.size == 0:
+        return
+
+    tabela = None
+    if np.issubdtype(matriz.dtype, np.integer):
+        menor, maior = int(matriz.min()), int(matriz.max())
+        if maior - menor < LIMITE_TABELA_TEXTO:
+            tabela = np.array([str(v) for v in range(menor, maior + 1)], dtype=object)
+
+    for ini in range(0, matriz.shape[0], tam_bloco):
+        bloco = matriz[ini:ini + tam_bloco]
+        if tabela is not None:
+            linhas = [" ".join(tabela[linha - menor].tolist()) for linha in bloco]
+        else:
+            buffer = io.StringIO()
+            np.savetxt(buffer, bloco, fmt="%s", delimiter=" ")
+            linhas = buffer.getvalue().splitlines()
+        f.write("".join(f"{r} {l}\n" for r, l in zip(rotulos[ini:ini + tam_bloco], linhas)))
+
+def hash_conteudo(*arrays):
+    """Hash SHA-1 do conteúdo (forma, dtype e bytes) dos arrays."""
+    h = hashlib.sha1()
+    for x in arrays:
+        x = np.ascontiguousarray(x)
+        h.update(f"{x.shape}{x.dtype.str}".encode())
+        h.update(memoryview(x).cast("B"))
+    return h.hexdigest()
+
+def salvar_dados_ampl_transport(Oi, Dj, Cost, filename="dados.dat", comprimir=False, usar_cache=True):
+    """
+    Grava o .dat do modelo de transporte (conjuntos I, J e parâmetros O, D, C).
+    Com custos em CSR (instância esparsa) grava o conjunto ARCOS junto com C,
+    para o modelo transportModEsparso.mod.
+
+    - comprimir: grava <filename>.gz (para arquivar/transferir; o AMPL lê o .dat sem compressão)
+    - usar_cache: o arquivo só é regenerado se o hash de (O, D, C) mudou; o hash
+      fica em <arquivo>.sha1
+
+    Retorna o caminho do arquivo gravado.
+    """
+    esparsa = sp.issparse(Cost)
+    Oi, Dj = np.asarray(Oi), np.asarray(Dj)
+    if not esparsa:
+        Cost = np.asarray(Cost)
     m = len(Oi)
     n = len(Dj)
-    
-    with open(filename, "w") as f:
+
+    caminho = filename + ".gz" if comprimir else filename
+    caminho_hash = caminho + ".sha1"
+    if esparsa:
+        assinatura = hash_conteudo(Oi, Dj, Cost.data, Cost.indices, Cost.indptr)
+    else:
+        assinatura = hash_conteudo(Oi, Dj, Cost)
+    if usar_cache and os.path.exists(caminho) and os.path.exists(caminho_hash):
+        with open(caminho_hash) as f:
+            if f.read().strip() == assinatura:
+                return caminho
+
+    rotulos_i = [f"i{i}" for i in range(m)]
+    rotulos_j = [f"j{j}" for j in range(n)]
+
+    # Escreve num temporário e renomeia: processos concorrentes da mesma
+    # instância nunca leem um .dat pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with (gzip.open(temporario, "wt", compresslevel=1) if comprimir else open(temporario, "w")) as f:
         # Conjuntos
-        f.write("set I := " + " ".join(f"i{i}" for i in range(m)) + ";\n")
-        f.write("set J := " + " ".join(f"j{j}" for j in range(n)) + ";\n\n")
-        
+        f.write("set I := " + " ".join(rotulos_i) + ";\n")
+        f.write("set J := " + " ".join(rotulos_j) + ";\n\n")
+
         # Parâmetro O
         f.write("param O :=\n")
-        for i in range(m):
-            f.write(f"i{i} {Oi[i]}\n")
+        escrever_matriz_dat(f, rotulos_i, Oi)
         f.write(";\n\n")
 
         # Parâmetro D
         f.write("param D :=\n")
-        for j in range(n):
-            f.write(f"j{j} {Dj[j]}\n")
+        escrever_matriz_dat(f, rotulos_j, Dj)
         f.write(";\n\n")
 
         # Parâmetro C
-        f.write("param C : " + " ".join(f"j{j}" for j in range(n)) + " :=\n")
-        for i in range(m):
-            row = " ".join(str(Cost[i][j]) for j in range(n))
-            f.write(f"i{i} {row}\n")
+        if esparsa:
+            linhas, colunas, valores = arcos(Cost)
+            f.write("param: ARCOS: C :=\n")
+            rotulos_arcos = [f"i{i} j{j}" for i, j in zip(linhas.tolist(), colunas.tolist())]
+            escrever_matriz_dat(f, rotulos_arcos, valores)
+        else:
+            f.write("param C : " + " ".join(rotulos_j) + " :=\n")
+            escrever_matriz_dat(f, rotulos_i, Cost)
         f.write(";\n")
+    os.replace(temporario, caminho)
+
+    with open(caminho_hash, "w") as f:
+        f.write(assinatura)
+    return caminho
 
 import numpy as np
 
@@ -118,4 +208,267 @@ def calcular_custo_total(allocation, costs):
     for i in range(len(allocation)):
         for j in range(len(allocation[0])):
             total += allocation[i][j] * costs[i][j]
-    return total
\ No newline at end of file
+    return total
+
+def solucao_inteira(valores, tol=1e-6):
+    """
+    Verifica se todos os valores de uma solução são inteiros (a menos de tol).
+    Usado para confirmar que a relaxação linear devolveu um vértice inteiro.
+    """
+    valores = np.asarray(valores, dtype=float)
+    return bool(np.all(np.abs(valores - np.round(valores)) <= tol))
+
+# -----------------------------
+# LEITURA DE INSTÂNCIAS (CSV E BINÁRIO)
+# -----------------------------
+# Formato binário (mapeável com np.memmap), little-endian:
+#   [0:8)   assinatura b"TRNSPRT1"
+#   [8:16)  m (int64)    [16:24) n (int64)
+#   [24:32) dtype da matriz de custos em ASCII (ex.: b"<i4"), completado com espaços
+#   [32:64) reservado
+#   oferta (m x int64), demanda (n x int64), custos (m x n no dtype do cabeçalho)
+ASSINATURA_BINARIA = b"TRNSPRT1"
+TAMANHO_CABECALHO = 64
+EXTENSAO_BINARIA = ".bin"
+
+def caminho_binario(filepath):
+    return filepath if filepath.endswith(EXTENSAO_BINARIA) else filepath + EXTENSAO_BINARIA
+
+def instancia_existe(filepath):
+    return (os.path.exists(filepath) or os.path.exists(caminho_binario(filepath))
+            or os.path.exists(caminho_esparso(filepath)))
+
+def ler_instancia_csv(filepath):
+    df = pd.read_csv(filepath, header=None)
+
+    num_ofertas = int(df.iloc[0, 0])
+    num_demandas = int(df.iloc[0, 1])
+
+    supply = df.iloc[1, :num_ofertas].to_numpy(dtype=int)
+    demand = df.iloc[2, :num_demandas].to_numpy(dtype=int)
+    costs = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy(dtype=int)
+
+    assert costs.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
+
+    return supply, demand, costs
+
+def salvar_instancia_binaria(filepath, supply, demand, costs):
+    """
+    Grava a instância no formato binário. Custos inteiros que cabem em int32
+    são gravados como int32 para reduzir o arquivo pela metade.
+    """
+    supply = np.asarray(supply, dtype="<i8")
+    demand = np.asarray(demand, dtype="<i8")
+    costs = np.asarray(costs)
+    if np.issubdtype(costs.dtype, np.integer):
+        info = np.iinfo(np.int32)
+        dtype = "<i4" if costs.size == 0 or (costs.min() >= info.min and costs.max() <= info.max) else "<i8"
+    else:
+        dtype = "<f8"
+    m, n = costs.shape
+
+    cabecalho = bytearray(TAMANHO_CABECALHO)
+    cabecalho[0:8] = ASSINATURA_BINARIA
+    cabecalho[8:24] = np.array([m, n], dtype="<i8").tobytes()
+    cabecalho[24:32] = dtype.encode("ascii").ljust(8)
+
+    with open(caminho_binario(filepath), "wb") as f:
+        f.write(cabecalho)
+        f.write(supply.tobytes())
+        f.write(demand.tobytes())
+        f.write(np.ascontiguousarray(costs, dtype=dtype).tobytes())
+
+def ler_instancia_binaria(filepath):
+    """
+    Mapeia a instância binária em memória sem cópia nem parsing.
+    Os vetores retornados são somente leitura.
+    """
+    path = caminho_binario(filepath)
+    with open(path, "rb") as f:
+        cabecalho = f.read(TAMANHO_CABECALHO)
+    if cabecalho[0:8] != ASSINATURA_BINARIA:
+        raise ValueError(f"Arquivo {path} não é uma instância binária de transporte.")
+    m, n = (int(x) for x in np.frombuffer(cabecalho[8:24], dtype="<i8"))
+    dtype = cabecalho[24:32].decode("ascii").strip()
+
+    offset = TAMANHO_CABECALHO
+    supply = np.memmap(path, dtype="<i8", mode="r", offset=offset, shape=(m,))
+    offset += 8 * m
+    demand = np.memmap(path, dtype="<i8", mode="r", offset=offset, shape=(n,))
+    offset += 8 * n
+    costs = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(m, n))
+
+    return np.asarray(supply), np.asarray(demand), np.asarray(costs)
+
+# -----------------------------
+# INSTÂNCIAS ESPARSAS (ROTAS PROIBIDAS)
+# -----------------------------
+# Só os arcos permitidos existem: os custos ficam numa scipy.sparse.csr_matrix
+# (m x n) cujas entradas armazenadas são os arcos, com índices ordenados em
+# cada linha. Um arco ausente é uma rota proibida; custo zero armazenado é um
+# arco permitido. Em matrizes densas a rota proibida é marcada com
+# ROTA_PROIBIDA.
+#
+# Arquivo filepath + ".arcos" (texto):
+#   m,n,número de arcos
+#   oferta (m valores)
+#   demanda (n valores)
+#   i,j,custo   (uma linha por arco)
+ROTA_PROIBIDA = -1
+EXTENSAO_ESPARSA = ".arcos"
+
+def caminho_esparso(filepath):
+    return filepath if filepath.endswith(EXTENSAO_ESPARSA) else filepath + EXTENSAO_ESPARSA
+
+def nome_instancia_esparsa(i, j, densidade, min_val=1, max_val=100, seed=42):
+    return f"instancias/problema_esparso_{i}x{j}_d{densidade:g}_[{min_val},{max_val}]_seed{seed}"
+
+def nome_instancia_stream(i, j, min_val=1, max_val=100, seed=42):
+    # Gerada por gerador.save_transport_problem_streaming: outro gerador aleatório, outro conteúdo
+    return f"instancias/problema_{i}x{j}_[{min_val},{max_val}]_seed{seed}_stream"
+
+def montar_custos_esparsos(m, n, linhas, colunas, valores):
+    """CSR (m x n) dos arcos (linhas[k], colunas[k]) com custo valores[k], sem arcos repetidos."""
+    linhas = np.asarray(linhas, dtype=np.int64)
+    colunas = np.asarray(colunas, dtype=np.int64)
+    valores = np.asarray(valores)
+    ordem = np.lexsort((colunas, linhas))
+    linhas, colunas, valores = linhas[ordem], colunas[ordem], valores[ordem]
+    if np.any((linhas[1:] == linhas[:-1]) & (colunas[1:] == colunas[:-1])):
+        raise ValueError("Arco repetido na instância esparsa.")
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(linhas, minlength=m))])
+    return sp.csr_matrix((valores, colunas, indptr), shape=(m, n))
+
+def custos_esparsos(costs):
+    """Converte uma matriz densa (rotas proibidas = ROTA_PROIBIDA) para CSR."""
+    costs = np.asarray(costs)
+    linhas, colunas = np.nonzero(costs != ROTA_PROIBIDA)
+    return montar_custos_esparsos(*costs.shape, linhas, colunas, costs[linhas, colunas])
+
+def arcos(custos):
+    """Linha, coluna e custo de cada arco, na ordem de armazenamento do CSR."""
+    m = custos.shape[0]
+    linhas = np.repeat(np.arange(m), np.diff(custos.indptr))
+    return linhas, custos.indices, custos.data
+
+def salvar_instancia_esparsa(filepath, supply, demand, custos):
+    linhas, colunas, valores = arcos(custos)
+    m, n = custos.shape
+    with open(caminho_esparso(filepath), "w", newline="") as f:
+        f.write(f"{m},{n},{custos.nnz}\n")
+        f.write(",".join(map(str, np.asarray(supply).tolist())) + "\n")
+        f.write(",".join(map(str, np.asarray(demand).tolist())) + "\n")
+        np.savetxt(f, np.column_stack([linhas, colunas, valores]), fmt="%d" if
+                   np.issubdtype(valores.dtype, np.integer) else ["%d", "%d", "%.17g"], delimiter=",")
+
+def ler_instancia_esparsa(filepath):
+    """Retorna supply, demand e a CSR de custos da instância esparsa."""
+    with open(caminho_esparso(filepath)) as f:
+        m, n, nnz = (int(x) for x in f.readline().split(","))
+        supply = np.array(f.readline().split(","), dtype=np.int64) if m else np.zeros(0, dtype=np.int64)
+        demand = np.array(f.readline().split(","), dtype=np.int64) if n else np.zeros(0, dtype=np.int64)
+        arestas = pd.read_csv(f, header=None, names=["i", "j", "c"]) if nnz else None
+
+    if arestas is None:
+        return supply, demand, sp.csr_matrix((m, n), dtype=np.int64)
+    assert len(arestas) == nnz, "Erro no número de arcos da instância esparsa"
+    return supply, demand, montar_custos_esparsos(m, n, arestas["i"].to_numpy(), arestas["j"].to_numpy(),
+                                                  arestas["c"].to_numpy())
+
+def arquivo_instancia(filepath):
+    """
+    Arquivo efetivamente lido para a instância: a versão binária
+    (filepath + ".bin"), depois a esparsa (filepath + ".arcos"), desde que
+    não sejam mais antigas que o CSV; um CSV regravado depois delas tem
+    precedência. Sem CSV, vale a que existir.
+    """
+    mtime_csv = os.stat(filepath).st_mtime_ns if os.path.exists(filepath) else None
+    for path in (caminho_binario(filepath), caminho_esparso(filepath)):
+        if os.path.exists(path) and (mtime_csv is None or os.stat(path).st_mtime_ns >= mtime_csv):
+            return path
+    return filepath
+
+def ler_instancia(filepath):
+    """
+    Leitor único das instâncias de transporte: lê o arquivo escolhido por
+    arquivo_instancia (binário, esparso com custos em CSR, ou CSV).
+    Retorna supply, demand, costs.
+    """
+    path = arquivo_instancia(filepath)
+    if path == caminho_binario(filepath):
+        return ler_instancia_binaria(filepath)
+    if path == caminho_esparso(filepath):
+        return ler_instancia_esparsa(filepath)
+    return ler_instancia_csv(filepath)
+
+# -----------------------------
+# CACHE DE INSTÂNCIAS CARREGADAS
+# -----------------------------
+# Chave: (caminho absoluto, mtime, tamanho) do arquivo efetivamente lido, de
+# modo que um arquivo regravado invalida a entrada. Evicção LRU por bytes.
+LIMITE_CACHE_BYTES = 2 * 1024 ** 3
+_cache_instancias = OrderedDict()
+_bytes_em_cache = 0
+
+def _vetores(instancia):
+    for x in instancia:
+        if sp.issparse(x):
+            yield from (x.data, x.indices, x.indptr)
+        else:
+            yield x
+
+def _chave_instancia(filepath):
+    path = arquivo_instancia(filepath)
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+def carregar_instancia(filepath):
+    """
+    Lê a instância através do cache em memória.
+    Retorna (supply, demand, costs) e o tempo gasto na leitura (quase zero
+    quando a instância já está no cache). Os vetores são somente leitura.
+    """
+    global _bytes_em_cache
+
+    start = time.perf_counter()
+    chave = _chave_instancia(filepath)
+    if chave in _cache_instancias:
+        _cache_instancias.move_to_end(chave)
+        return _cache_instancias[chave], time.perf_counter() - start
+
+    instancia = ler_instancia(filepath)
+    for vetor in _vetores(instancia):
+        vetor.flags.writeable = False
+    tempo_leitura = time.perf_counter() - start
+
+    # Descarta versões antigas do mesmo arquivo
+    for antiga in [c for c in _cache_instancias if c[0] == chave[0]]:
+        _bytes_em_cache -= sum(vetor.nbytes for vetor in _vetores(_cache_instancias.pop(antiga)))
+
+    tamanho = sum(vetor.nbytes for vetor in _vetores(instancia))
+    _cache_instancias[chave] = instancia
+    _bytes_em_cache += tamanho
+    while _bytes_em_cache > LIMITE_CACHE_BYTES and len(_cache_instancias) > 1:
+        _, removida = _cache_instancias.popitem(last=False)
+        _bytes_em_cache -= sum(vetor.nbytes for vetor in _vetores(removida))
+
+    return instancia, tempo_leitura
+
+def obter_instancia(instancia, cronometro=None):
+    """
+    Aceita um caminho de instância ou uma instância já carregada
+    (supply, demand, costs) e devolve a instância carregada. Com cronometro,
+    só a carga de um caminho entra na fase "leitura": quem passa a instância
+    já carregada (metodos.executar_metodo) mediu a leitura uma vez.
+    """
+    if not isinstance(instancia, (str, os.PathLike)):
+        return instancia
+    if cronometro is None:
+        return carregar_instancia(instancia)[0]
+    with cronometro.fase("leitura"):
+        return carregar_instancia(instancia)[0]
+
+def limpar_cache_instancias():
+    global _bytes_em_cache
+    _cache_instancias.clear()
+    _bytes_em_cache = 0
@@ -0,0 +1,85 @@
+import os
+import glob
+import argparse
+import time
+from helpf import EXTENSAO_BINARIA, EXTENSAO_ESPARSA, limpar_cache_instancias
+from resultados import sincronizar_csv, contar_execucoes, caminho_resultado_csv
+from metodos import METODOS, executar_metodo
+
+# -----------------------------
+# EXECUÇÃO EM LOTE
+# -----------------------------
+# Passa todas as instâncias de uma pasta pelos métodos escolhidos num único
+# processo: imports, sessões AMPL e a carga de cada instância acontecem uma
+# vez por campanha. As instâncias são processadas uma a uma e descartadas do
+# cache ao final, para a memória ficar limitada à instância corrente.
+
+def listar_instancias(pasta, padrao="problema_*"):
+    """Nomes das instâncias (sem extensão) da pasta, em CSV, binário ou esparsas."""
+    nomes = set()
+    for arquivo in glob.glob(os.path.join(pasta, padrao)):
+        for extensao in (EXTENSAO_BINARIA, EXTENSAO_ESPARSA):
+            if arquivo.endswith(extensao):
+                arquivo = arquivo[:-len(extensao)]
+        nomes.add(arquivo)
+    return sorted(nomes)
+
+def executar_lote(instancias, metodos, repeticoes=1, tempo_limite=None):
+    """
+    Executa cada método nas instâncias até completar `repeticoes` execuções
+    registradas (retoma o que já está no banco). Uma falha é relatada e não
+    interrompe o lote.
+
+    Retorna lista de (instância, método, status, custo, tempo, erro).
+    """
+    desconhecidos = [codigo for codigo in metodos if codigo not in METODOS]
+    if desconhecidos:
+        raise ValueError(f"Métodos desconhecidos: {', '.join(desconhecidos)}")
+
+    concluidas = []
+    for nome_arquivo in instancias:
+        sincronizar_csv(caminho_resultado_csv(nome_arquivo))
+        print(f"\n{nome_arquivo}")
+        for codigo in metodos:
+            feitas = contar_execucoes(os.path.basename(nome_arquivo), codigo)
+            for r in range(feitas, repeticoes):
+                try:
+                    status, custo, tempo = executar_metodo(codigo, nome_arquivo, tempo_limite)
+                    concluidas.append((nome_arquivo, codigo, status, custo, tempo, None))
+                    print(f"  {codigo} [{r + 1}/{repeticoes}]: {status}, custo {custo}, {tempo:.6f} s")
+                except Exception as e:
+                    concluidas.append((nome_arquivo, codigo, None, None, None, e))
+                    print(f"  {codigo} [{r + 1}/{repeticoes}] [ERRO] {e}")
+                    break
+        limpar_cache_instancias()
+    return concluidas
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve todas as instâncias de uma pasta com os métodos de transporte escolhidos.")
+    parser.add_argument("--folder", type=str, default="instancias", help="Pasta das instâncias (padrão: instancias)")
+    parser.add_argument("--padrao", type=str, default="problema_*", help="Padrão glob dos arquivos (padrão: problema_*)")
+    parser.add_argument("--metodos", type=str, nargs="+", default=["tVogel", "tGuloso"],
+                        help="Códigos dos métodos (ver --listar)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções por instância e método (padrão: 1)")
+    parser.add_argument("--tempo_limite", type=float, default=None,
+                        help="Tempo limite por execução, em segundos, para os solvers que o aceitam")
+    parser.add_argument("--listar", action="store_true", help="Lista os métodos registrados e sai")
+    args = parser.parse_args()
+
+    if args.listar:
+        print("\n".join(METODOS))
+        return
+
+    instancias = listar_instancias(args.folder, args.padrao)
+    if not instancias:
+        print(f"Nenhuma instância encontrada em {args.folder}.")
+        return
+
+    start = time.time()
+    concluidas = executar_lote(instancias, args.metodos, args.repeticoes, args.tempo_limite)
+    erros = sum(1 for *_, erro in concluidas if erro is not None)
+    print(f"\n{len(concluidas)} execuções ({erros} com erro) em {len(instancias)} instâncias, "
+          f"{time.time() - start:.2f} segundos")
+
+if __name__ == "__main__":
+    main()
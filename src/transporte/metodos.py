@@ -0,0 +1,103 @@
+from functools import partial
+from helpf import carregar_instancia, obter_instancia
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from campanha import OPCAO_THREADS_AMPL
+
+# -----------------------------
+# REGISTRO DE MÉTODOS DE TRANSPORTE
+# -----------------------------
+# Todo método é um plugin com o mesmo contrato:
+#   solve(instancia, tempo_limite=None, cronometro=None) -> status, custo, tempo
+# instancia é um caminho (instancias/<nome>) ou uma instância já carregada
+# (supply, demand, costs). tempo_limite (segundos) vai para os solvers que o
+# aceitam (CBC, HiGHS, solvers AMPL); heurísticas construtivas, genético e
+# simplex próprios o ignoram. A chave do registro é o código gravado nos
+# resultados, o mesmo que o script do método usa, de modo que lote.py e os
+# scripts individuais retomam as mesmas execuções. Os módulos dos métodos só
+# são importados na primeira chamada: a falta de um pacote opcional (amplpy,
+# deap) só afeta os métodos que dependem dele.
+METODOS = {}
+
+def registrar_metodo(codigo, solve):
+    if codigo in METODOS:
+        raise ValueError(f"Método já registrado: {codigo}")
+    METODOS[codigo] = solve
+    return solve
+
+def _canto_noroeste(instancia, tempo_limite=None, cronometro=None):
+    from tCantoNoroeste import solve_transport_nw
+    return solve_transport_nw(instancia, cronometro=cronometro)
+
+def _vogel(instancia, tempo_limite=None, cronometro=None, engine="referencia"):
+    from tVogel import solve_transport_vogel
+    return solve_transport_vogel(instancia, engine=engine, cronometro=cronometro)
+
+def _guloso(instancia, tempo_limite=None, cronometro=None):
+    from tGuloso import solve_transport_greedy
+    return solve_transport_greedy(instancia, cronometro=cronometro)
+
+def _genetico(instancia, tempo_limite=None, cronometro=None, codificacao="densa", populacao=10, geracoes=5):
+    from tGenetico import executar_ga
+    cronometro = cronometro or Cronometro()
+    supply, demand, costs = obter_instancia(instancia, cronometro)
+    return executar_ga(supply, demand, costs, pop_size=populacao, ngen=geracoes, cronometro=cronometro,
+                       codificacao=codificacao)
+
+def _simplex(instancia, tempo_limite=None, cronometro=None, inicial="vogel"):
+    from tSimplex import solve_transport_simplex
+    return solve_transport_simplex(instancia, inicial=inicial, cronometro=cronometro)
+
+def _classico(instancia, tempo_limite=None, cronometro=None, backend="pulp", modo="mip"):
+    from tClassico import solve_transport_problem
+    return solve_transport_problem(instancia, backend=backend, modo=modo, cronometro=cronometro,
+                                   tempo_limite=tempo_limite)
+
+def _restrito(instancia, tempo_limite=None, cronometro=None, backend="pulp"):
+    from tRestrito import solve_flow_problem
+    return solve_flow_problem(instancia, backend=backend, cronometro=cronometro, tempo_limite=tempo_limite)
+
+def _ampl(instancia, tempo_limite=None, cronometro=None, solver="highs", modo="mip"):
+    # Sessão AMPL persistente (entrada="memoria"): o modelo é lido uma vez por processo
+    from tClassico_ampl import resolver_ampl
+    cronometro = cronometro or Cronometro()
+    Oi, Dj, Cost = obter_instancia(instancia, cronometro)
+    i, j = Cost.shape
+    # Sem .dat, sem base salva e sem registro: o nome da instância não é usado
+    return resolver_ampl(i, j, Oi, Dj, Cost, solver, None, modo=modo, cronometro=cronometro, entrada="memoria",
+                         tempo_limite=tempo_limite, registrar=False)
+
+registrar_metodo("tCantoNoroeste", _canto_noroeste)
+registrar_metodo("tVogel", _vogel)
+registrar_metodo("tVogel_incremental", partial(_vogel, engine="incremental"))
+registrar_metodo("tGuloso", _guloso)
+registrar_metodo("tGenetico", _genetico)
+registrar_metodo("tGenetico_prioridade", partial(_genetico, codificacao="prioridade"))
+for _inicial in ("noroeste", "vogel", "guloso"):
+    registrar_metodo(f"tSimplex_{_inicial}", partial(_simplex, inicial=_inicial))
+registrar_metodo("tClassico", _classico)
+registrar_metodo("tClassico_lp", partial(_classico, modo="lp-relaxation"))
+registrar_metodo("tClassico_milp", partial(_classico, backend="milp"))
+registrar_metodo("tClassico_milp_lp", partial(_classico, backend="milp", modo="lp-relaxation"))
+registrar_metodo("tRestrito", _restrito)
+registrar_metodo("tRestrito_netsimplex", partial(_restrito, backend="netsimplex"))
+for _solver in OPCAO_THREADS_AMPL:
+    registrar_metodo(f"tClassico_ampl_{_solver}_memoria", partial(_ampl, solver=_solver))
+    registrar_metodo(f"tClassico_ampl_{_solver}_lp_memoria", partial(_ampl, solver=_solver, modo="lp-relaxation"))
+
+def executar_metodo(codigo, nome_arquivo, tempo_limite=None):
+    """
+    Uma execução do método na instância, registrada com o código do método.
+    A leitura passa pelo cache de instâncias: só a primeira execução de cada
+    instância no processo paga a carga do arquivo. A fase "leitura" é medida
+    só aqui: o método recebe a instância carregada, e obter_instancia não
+    abre outra janela para ela.
+    """
+    if codigo not in METODOS:
+        raise ValueError(f"Método desconhecido: {codigo}")
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        instancia, _ = carregar_instancia(nome_arquivo)
+    status, custo, tempo = METODOS[codigo](instancia, tempo_limite=tempo_limite, cronometro=cronometro)
+    gravar_resultado(nome_arquivo, codigo, status, custo, tempo, cronometro.fases())
+    return status, custo, tempo
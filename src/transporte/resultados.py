@@ -0,0 +1,31 @@
+import os
+import sys
+
+# -----------------------------
+# RESULTADOS DO TRANSPORTE
+# -----------------------------
+# O banco (SQLite) é o de src/comum/banco_resultados.py, comum às duas pastas.
+# Aqui ficam os CSVs espelho: instancias/<nome> -> solutions/<nome>_resultado.csv.
+COMUM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "comum")
+if COMUM not in sys.path:
+    sys.path.append(COMUM)
+
+from banco_resultados import (CAMINHO_BANCO, COLUNAS_FASES, COLUNAS_CSV, conectar, instancia_do_csv,
+                              sincronizar_csv, registrar_resultados, registrar_resultado, anexar_csv,
+                              contar_execucoes, ler_tempos_custos, melhor_custo, main as importar_csvs)
+
+def caminho_resultado_csv(filepath):
+    """CSV espelho da instância: <pasta>/<nome> -> solutions/<nome>_resultado.csv, qualquer que seja a pasta."""
+    return os.path.join("solutions", os.path.basename(filepath) + "_resultado.csv")
+
+def gravar_resultado(filepath, codigo, status, custo, tempo, fases=None):
+    """
+    Registra a execução no banco e no CSV espelho (ver caminho_resultado_csv).
+    """
+    os.makedirs("solutions", exist_ok=True)
+    csv_path = caminho_resultado_csv(filepath)
+    registrar_resultado(os.path.basename(filepath), codigo, status, custo, tempo, caminho_csv=csv_path, fases=fases)
+    anexar_csv(csv_path, status, custo, tempo, codigo, fases, casas=6)
+
+if __name__ == "__main__":
+    importar_csvs("*_resultado.csv")
@@ -1,9 +1,9 @@
 import numpy as np
-import pandas as pd
 import argparse
-import time
 import os
-import csv
+from helpf import obter_instancia, instancia_existe
+from resultados import gravar_resultado
+from cronometro import Cronometro
 
 def canto_noroeste(supply, demand, costs):
     n_rows = len(supply)
@@ -42,44 +42,26 @@ def canto_noroeste(supply, demand, costs):
 def calcular_custo_total(allocation, costs):
     return int(np.sum(allocation * costs))
 
-def solve_transport_nw(filepath):
-    df = pd.read_csv(filepath, header=None)
+def solve_transport_nw(instancia, cronometro=None):
+    cronometro = cronometro or Cronometro()
+    supply, demand, costs = obter_instancia(instancia, cronometro)
 
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
-
-    supply = df.iloc[1, :num_ofertas].to_numpy(dtype=int)
-    demand = df.iloc[2, :num_demandas].to_numpy(dtype=int)
-    costs = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy(dtype=int)
-
-    assert costs.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
-
-    start = time.time()
-    allocation = canto_noroeste(supply, demand, costs)
-    total_cost = calcular_custo_total(allocation, costs)
-    end = time.time()
+    with cronometro.fase("solver"):
+        allocation = canto_noroeste(supply, demand, costs)
+    with cronometro.fase("extracao"):
+        total_cost = calcular_custo_total(allocation, costs)
 
     status = "aproximada"
-    tempo_exec = end - start
+    tempo_exec = cronometro.segundos("solver", "extracao")
 
     return status, total_cost, tempo_exec
 
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, fases=None):
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
 
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/")
-    csv_path = csv_path + f"_resultado.csv"
-
-    escrever_cabecalho = not os.path.exists(csv_path)
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de transporte pelo método do Canto Noroeste.")
@@ -91,12 +73,13 @@ def main():
     args = parser.parse_args()
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    status, custo, tempo = solve_transport_nw(nome_arquivo)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    status, custo, tempo = solve_transport_nw(nome_arquivo, cronometro=cronometro)
+    salvar_resultado(nome_arquivo, status, custo, tempo, fases=cronometro.fases())
 
     print("Problema resolvido.")
     print(f"Status: {status}")
@@ -1,66 +1,177 @@
 import numpy as np
-import pandas as pd
 import pulp
 import argparse
-import time
 import os
-import csv
-
-def solve_transport_problem(filepath):
-    df = pd.read_csv(filepath, header=None)
-
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
-
-    Oi = df.iloc[1, :num_ofertas].to_numpy()
-    Dj = df.iloc[2, :num_demandas].to_numpy()
-    Cost = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy()
-
-    assert Cost.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
-
-    prob = pulp.LpProblem("Problema_Transporte", pulp.LpMinimize)
-
-    x = [[pulp.LpVariable(f"x_{i}_{j}", lowBound=0, cat=pulp.LpInteger)
-          for j in range(num_demandas)] for i in range(num_ofertas)]
-
-    prob += pulp.lpSum(x[i][j] * Cost[i][j]
-                       for i in range(num_ofertas)
-                       for j in range(num_demandas)), "Custo_Total"
-
-    for i in range(num_ofertas):
-        prob += pulp.lpSum(x[i][j] for j in range(num_demandas)) <= Oi[i], f"Oferta_{i}"
-
-    for j in range(num_demandas):
-        prob += pulp.lpSum(x[i][j] for i in range(num_ofertas)) >= Dj[j], f"Demanda_{j}"
-
-    start = time.time()
-    prob.solve()
-    end = time.time()
-
-    status = pulp.LpStatus[prob.status]
-    custo_total = pulp.value(prob.objective)
-    tempo_exec = end - start
+import scipy.sparse as sp
+from scipy.optimize import milp, LinearConstraint, Bounds
+from helpf import solucao_inteira, obter_instancia, instancia_existe, nome_instancia_esparsa, arcos
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from tReotimizacao import salvar_base_otima
+
+# Códigos de retorno de scipy.optimize.milp -> nomes de status do PuLP
+STATUS_MILP = {0: "Optimal", 1: "Not Solved", 2: "Infeasible", 3: "Unbounded", 4: "Undefined"}
+
+def montar_matriz_transporte(num_ofertas, num_demandas):
+    """
+    Matriz de restrições do transporte em CSR, com x achatado linha a linha
+    (x[i, j] -> i*n + j): as m primeiras linhas são a incidência das ofertas
+    e as n seguintes a das demandas. Tem exatamente 2*m*n não-nulos.
+    """
+    m, n = num_ofertas, num_demandas
+    indptr = np.concatenate([np.arange(0, m * n + 1, n), m * n + m * np.arange(1, n + 1)])
+    indices = np.concatenate([np.arange(m * n), (n * np.arange(m)[None, :] + np.arange(n)[:, None]).ravel()])
+    dados = np.ones(2 * m * n)
+    return sp.csr_matrix((dados, indices, indptr), shape=(m + n, m * n))
+
+def montar_matriz_transporte_esparsa(custos):
+    """
+    Mesma matriz de montar_matriz_transporte, mas com uma coluna por arco
+    permitido (na ordem de armazenamento da CSR custos): 2*nnz não-nulos.
+    """
+    m, n = custos.shape
+    linhas, colunas, _ = arcos(custos)
+    k = np.arange(custos.nnz)
+    return sp.csr_matrix((np.ones(2 * custos.nnz), (np.concatenate([linhas, m + colunas]), np.concatenate([k, k]))),
+                         shape=(m + n, custos.nnz))
+
+def solve_transport_milp(Oi, Dj, Cost, modo="mip", cronometro=None, arquivo_base=None, tempo_limite=None):
+    """
+    Resolve o modelo clássico montado diretamente na forma matricial e
+    entregue ao HiGHS via scipy.optimize.milp, sem objetos do PuLP.
+
+    Com modo="lp-relaxation" resolve primeiro sem integralidade (a matriz de
+    transporte é totalmente unimodular) e só recorre ao MIP se o vértice
+    retornado não for inteiro. Com Cost em CSR (instância esparsa) há uma
+    variável por arco permitido.
+
+    Com arquivo_base (caminho da instância), grava a base ótima para o
+    tReotimizacao. tempo_limite (segundos) é repassado ao HiGHS.
+
+    Retorna status, custo total, tempo de montagem e tempo do solver.
+    """
+    num_ofertas, num_demandas = Cost.shape
+    cronometro = cronometro or Cronometro()
+
+    with cronometro.fase("montagem"):
+        if sp.issparse(Cost):
+            A = montar_matriz_transporte_esparsa(Cost)
+            c = np.asarray(Cost.data, dtype=float)
+        else:
+            A = montar_matriz_transporte(num_ofertas, num_demandas)
+            c = np.asarray(Cost, dtype=float).ravel()
+        lb = np.concatenate([np.full(num_ofertas, -np.inf), np.asarray(Dj, dtype=float)])
+        ub = np.concatenate([np.asarray(Oi, dtype=float), np.full(num_demandas, np.inf)])
+        restricoes = LinearConstraint(A, lb, ub)
+        integralidade = np.ones(c.size, dtype=np.uint8)
+        opcoes = {} if tempo_limite is None else {"time_limit": tempo_limite}
+
+    with cronometro.fase("solver"):
+        res = None
+        if modo == "lp-relaxation":
+            res = milp(c, constraints=restricoes, bounds=Bounds(0, np.inf), options=opcoes)
+            if res.status == 0 and not solucao_inteira(res.x):
+                print("Relaxação linear não inteira; resolvendo como MIP.")
+                res = None
+        if res is None:
+            res = milp(c, constraints=restricoes, integrality=integralidade, bounds=Bounds(0, np.inf),
+                       options=opcoes)
+
+    with cronometro.fase("extracao"):
+        status = STATUS_MILP.get(res.status, "Undefined")
+        custo_total = res.fun if res.status == 0 else None
+
+    if arquivo_base is not None and res.status == 0:
+        with cronometro.fase("escrita"):
+            alocacao = None if sp.issparse(Cost) else res.x.reshape(num_ofertas, num_demandas)
+            salvar_base_otima(arquivo_base, Oi, Dj, Cost, alocacao)
+
+    return status, custo_total, cronometro.segundos("montagem"), cronometro.segundos("solver")
+
+def solve_transport_problem(instancia, backend="pulp", modo="mip", cronometro=None, salvar_base=False,
+                            tempo_limite=None):
+    cronometro = cronometro or Cronometro()
+    Oi, Dj, Cost = obter_instancia(instancia, cronometro)
+    num_ofertas, num_demandas = Cost.shape
+
+    if backend == "milp":
+        status, custo_total, tempo_montagem, tempo_exec = solve_transport_milp(Oi, Dj, Cost, modo=modo,
+                                                                               cronometro=cronometro,
+                                                                               arquivo_base=instancia if salvar_base else None,
+                                                                               tempo_limite=tempo_limite)
+        print(f"Tempo de montagem do modelo: {tempo_montagem:.6f} segundos")
+        return status, custo_total, tempo_exec
+    if backend != "pulp":
+        raise ValueError(f"Backend desconhecido: {backend}")
+
+    with cronometro.fase("montagem"):
+        prob = pulp.LpProblem("Problema_Transporte", pulp.LpMinimize)
+
+        categoria = pulp.LpContinuous if modo == "lp-relaxation" else pulp.LpInteger
+        if sp.issparse(Cost):
+            # Variáveis só nos arcos permitidos
+            linhas, colunas, valores = (v.tolist() for v in arcos(Cost))
+            x = [pulp.LpVariable(f"x_{i}_{j}", lowBound=0, cat=categoria) for i, j in zip(linhas, colunas)]
+            prob += pulp.lpSum(xk * ck for xk, ck in zip(x, valores)), "Custo_Total"
+
+            por_oferta = [[] for _ in range(num_ofertas)]
+            por_demanda = [[] for _ in range(num_demandas)]
+            for xk, i, j in zip(x, linhas, colunas):
+                por_oferta[i].append(xk)
+                por_demanda[j].append(xk)
+            for i in range(num_ofertas):
+                prob += pulp.lpSum(por_oferta[i]) <= Oi[i], f"Oferta_{i}"
+            for j in range(num_demandas):
+                prob += pulp.lpSum(por_demanda[j]) >= Dj[j], f"Demanda_{j}"
+        else:
+            x = [[pulp.LpVariable(f"x_{i}_{j}", lowBound=0, cat=categoria)
+                  for j in range(num_demandas)] for i in range(num_ofertas)]
+
+            prob += pulp.lpSum(x[i][j] * Cost[i][j]
+                               for i in range(num_ofertas)
+                               for j in range(num_demandas)), "Custo_Total"
+
+            for i in range(num_ofertas):
+                prob += pulp.lpSum(x[i][j] for j in range(num_demandas)) <= Oi[i], f"Oferta_{i}"
+
+            for j in range(num_demandas):
+                prob += pulp.lpSum(x[i][j] for i in range(num_ofertas)) >= Dj[j], f"Demanda_{j}"
+
+    with cronometro.fase("solver"):
+        cbc = pulp.PULP_CBC_CMD(timeLimit=tempo_limite)
+        prob.solve(cbc)
+        if modo == "lp-relaxation" and prob.status == pulp.LpStatusOptimal:
+            if not solucao_inteira([v.varValue for v in prob.variables()]):
+                print("Relaxação linear não inteira; resolvendo como MIP.")
+                for v in prob.variables():
+                    v.cat = pulp.LpInteger
+                prob.solve(cbc)
+
+    with cronometro.fase("extracao"):
+        status = pulp.LpStatus[prob.status]
+        custo_total = pulp.value(prob.objective)
+    tempo_exec = cronometro.segundos("solver")
+
+    if salvar_base and status == "Optimal":
+        with cronometro.fase("escrita"):
+            alocacao = None if sp.issparse(Cost) else np.array([[xij.varValue for xij in linha] for linha in x],
+                                                                dtype=float)
+            salvar_base_otima(instancia, Oi, Dj, Cost, alocacao)
 
     return status, custo_total, tempo_exec
 
 
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, backend="pulp", modo="mip", fases=None):
 
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
+    if backend != "pulp":
+        codigo = f"{codigo}_{backend}"
+    if modo == "lp-relaxation":
+        codigo = f"{codigo}_lp"
 
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/")
-    csv_path = csv_path + f"_resultado.csv"
-
-    escrever_cabecalho = not os.path.exists(csv_path)
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de transporte dado por parâmetros.")
@@ -69,15 +180,28 @@ def main():
     parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo dos custos/ofertas (padrão: 0)")
     parser.add_argument("--max_val", type=int, default=100, help="Valor máximo dos custos/ofertas (padrão: 100)")
     parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--backend", type=str, default="pulp", choices=["pulp", "milp"],
+                        help="Montagem/solver do modelo: PuLP+CBC ou matriz CSR+HiGHS (padrão: pulp)")
+    parser.add_argument("--modo", type=str, default="mip", choices=["mip", "lp-relaxation"],
+                        help="Resolver como MIP ou pela relaxação linear com verificação de integralidade (padrão: mip)")
+    parser.add_argument("--densidade", type=float, default=None,
+                        help="Usa a instância esparsa (rotas proibidas) com esta densidade")
+    parser.add_argument("--tempo_limite", type=float, default=None, help="Tempo limite do solver em segundos")
+    parser.add_argument("--salvar_base", action="store_true",
+                        help="Grava a base ótima (solutions/<instância>_base.npz) para o tReotimizacao")
     args = parser.parse_args()
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if args.densidade is not None:
+        nome_arquivo = nome_instancia_esparsa(args.i, args.j, args.densidade, args.min_val, args.max_val, args.seed)
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    status, custo, tempo = solve_transport_problem(nome_arquivo)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    status, custo, tempo = solve_transport_problem(nome_arquivo, backend=args.backend, modo=args.modo, cronometro=cronometro,
+                                                   salvar_base=args.salvar_base, tempo_limite=args.tempo_limite)
+    salvar_resultado(nome_arquivo, status, custo, tempo, backend=args.backend, modo=args.modo, fases=cronometro.fases())
 
     print("Problema resolvido.")
     print(f"Status: {status}")
@@ -1,62 +1,141 @@
 import argparse
-import pandas as pd
 import numpy as np
-import time
 import os
-from amplpy import AMPL
-from helpf import salvar_dados_ampl_transport
+import scipy.sparse as sp
+from amplpy import AMPL, DataFrame
+from helpf import (salvar_dados_ampl_transport, solucao_inteira, obter_instancia, instancia_existe,
+                   nome_instancia_esparsa, arcos)
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from tReotimizacao import salvar_base_otima
+from campanha import opcoes_solver_ampl
 
 def ler_instancia_csv(caminho_csv):
-    df = pd.read_csv(caminho_csv, header=None)
-    i, j = int(df.iloc[0, 0]), int(df.iloc[0, 1])
-    Oi = df.iloc[1, :i].to_numpy()
-    Dj = df.iloc[2, :j].to_numpy()
-    Cost = df.iloc[3:3+i, :j].to_numpy()
-    assert Cost.shape == (i, j), "Dimensão da matriz de custos inválida"
+    Oi, Dj, Cost = obter_instancia(caminho_csv)
+    i, j = Cost.shape
     return i, j, Oi, Dj, Cost
 
-def resolver_ampl(i, j, Oi, Dj, Cost, solver, nome_arquivo_csv):
+# -----------------------------
+# SESSÃO AMPL PERSISTENTE (entrada="memoria")
+# -----------------------------
+# Uma sessão por processo: o modelo é lido uma única vez e, a cada chamada,
+# os dados são substituídos ("reset data") e enviados direto dos arrays NumPy,
+# sem gerar o .dat. Assim a inicialização do AMPL e a E/S de arquivos saem do
+# laço medido dos benchmarks. Instâncias esparsas (custos em CSR) usam o
+# modelo transportModEsparso.mod, com variáveis só nos arcos permitidos.
+_sessoes = {}
+
+def modelo_ampl(Cost, ampl_dir="ampl"):
+    return os.path.join(ampl_dir, "transportModEsparso.mod" if sp.issparse(Cost) else "transportMod.mod")
+
+def obter_sessao(mod_path=os.path.join("ampl", "transportMod.mod")):
+    if mod_path not in _sessoes:
+        _sessoes[mod_path] = AMPL()
+        _sessoes[mod_path].read(mod_path)
+    return _sessoes[mod_path]
+
+def enviar_dados_sessao(ampl, Oi, Dj, Cost):
+    """Substitui I, J, O, D e C (e ARCOS, se esparsa) da sessão pelos dados da instância."""
+    m, n = Cost.shape
+    linhas, colunas = np.arange(m), np.arange(n)
+    ampl.eval("reset data;")
+    ampl.set_data(DataFrame(index=[("I", linhas.tolist())], columns=[("O", np.asarray(Oi).tolist())]), "I")
+    ampl.set_data(DataFrame(index=[("J", colunas.tolist())], columns=[("D", np.asarray(Dj).tolist())]), "J")
+    if sp.issparse(Cost):
+        linhas_arco, colunas_arco, valores = arcos(Cost)
+        ampl.set_data(DataFrame(index=[("I", linhas_arco.tolist()), ("J", colunas_arco.tolist())],
+                                columns=[("C", valores.tolist())]), "ARCOS")
+        return
+    ampl.set_data(DataFrame(index=[("I", np.repeat(linhas, n).tolist()), ("J", np.tile(colunas, m).tolist())],
+                            columns=[("C", np.asarray(Cost).ravel().tolist())]))
+
+def resolver_ampl(i, j, Oi, Dj, Cost, solver, nome_arquivo_csv, modo="mip", threads=None, cronometro=None,
+                  entrada="arquivo", salvar_base=False, tempo_limite=None, registrar=True):
+    """
+    Resolve a instância com o solver AMPL dado e retorna status, custo total
+    e tempo do solver. Com registrar=False o resultado não é gravado (quem
+    chama registra, como o lote.py).
+    """
+    cronometro = cronometro or Cronometro()
     ampl_dir = "ampl"
     solutions_dir = "solutions"
     os.makedirs(ampl_dir, exist_ok=True)
     os.makedirs(solutions_dir, exist_ok=True)
 
-    dat_path = os.path.join(ampl_dir, f"transportDat_{i}x{j}_{os.path.basename(nome_arquivo_csv)}.dat")
-    salvar_dados_ampl_transport(Oi, Dj, Cost, filename=dat_path)
+    if entrada == "memoria":
+        ampl = obter_sessao(modelo_ampl(Cost, ampl_dir))
+        with cronometro.fase("montagem"):
+            enviar_dados_sessao(ampl, Oi, Dj, Cost)
+        print(f"Transferência de dados: {cronometro.segundos('montagem'):.6f} s")
+    elif entrada == "arquivo":
+        dat_path = os.path.join(ampl_dir, f"transportDat_{i}x{j}_{os.path.basename(nome_arquivo_csv)}.dat")
+        with cronometro.fase("escrita"):
+            dat_path = salvar_dados_ampl_transport(Oi, Dj, Cost, filename=dat_path)
+
+        with cronometro.fase("montagem"):
+            ampl = AMPL()
+            ampl.read(modelo_ampl(Cost, ampl_dir))
+            ampl.read_data(dat_path)
+    else:
+        raise ValueError(f"Entrada desconhecida: {entrada}")
 
-    ampl = AMPL()
     ampl.option["solver"] = solver
     ampl.option["show_stats"] = 1
-
-    mod_path = os.path.join(ampl_dir, "transportMod.mod")
-    ampl.read(mod_path)
-    ampl.read_data(dat_path)
-
-    start = time.time()
-    ampl.solve()
-    elapsed = time.time() - start
-
-    status = ampl.get_value("solve_result")
-    custo_total = ampl.get_objective("Total_Cost").value()
-
-    script_path = __file__
-    script_name = os.path.basename(script_path)
-    codigo = f"{os.path.splitext(script_name)[0]}_{solver}"
-
-    resultado_csv = nome_arquivo_csv.replace("instancias/", "solutions/") + "_resultado.csv"
-    escrever_cabecalho = not os.path.exists(resultado_csv)
-
-    with open(resultado_csv, "a", newline="") as f:
-        import csv
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo_total, f"{elapsed:.6f}", codigo])
+    ampl.option["relax_integrality"] = 0
+    opcoes_solver_ampl(ampl, solver, threads, tempo_limite)
+
+    with cronometro.fase("solver"):
+        if modo == "lp-relaxation":
+            # Matriz de transporte totalmente unimodular: o LP já deve ser inteiro
+            ampl.option["relax_integrality"] = 1
+            ampl.solve()
+            valores = [linha[-1] for linha in ampl.get_variable("x").get_values().to_list()]
+            if ampl.get_value("solve_result") == "solved" and not solucao_inteira(valores):
+                print("Relaxação linear não inteira; resolvendo como MIP.")
+                ampl.option["relax_integrality"] = 0
+                ampl.solve()
+        else:
+            ampl.solve()
+    elapsed = cronometro.segundos("solver")
+
+    with cronometro.fase("extracao"):
+        status = ampl.get_value("solve_result")
+        custo_total = ampl.get_objective("Total_Cost").value()
+
+    if salvar_base and status == "solved":
+        with cronometro.fase("escrita"):
+            salvar_base_otima(nome_arquivo_csv, Oi, Dj, Cost, alocacao_ampl(ampl, Cost))
+
+    if registrar:
+        gravar_resultado(nome_arquivo_csv, codigo_ampl(solver, modo, entrada), status, custo_total, elapsed,
+                         cronometro.fases())
 
     print("Problema resolvido via AMPL.")
     print(f"Status: {status}")
     print(f"Custo total: {custo_total}")
     print(f"Tempo: {elapsed:.6f} s")
+    return status, custo_total, elapsed
+
+def alocacao_ampl(ampl, Cost):
+    """Valores de x como matriz (m x n), na ordem dos rótulos de I e J da sessão."""
+    if sp.issparse(Cost):
+        return None
+    posicao_i = {rotulo: k for k, rotulo in enumerate(ampl.get_set("I").get_values().to_list())}
+    posicao_j = {rotulo: k for k, rotulo in enumerate(ampl.get_set("J").get_values().to_list())}
+    alocacao = np.zeros(Cost.shape)
+    for i, j, valor in ampl.get_variable("x").get_values().to_list():
+        alocacao[posicao_i[i], posicao_j[j]] = valor
+    return alocacao
+
+def codigo_ampl(solver, modo="mip", entrada="arquivo"):
+    script_path = __file__
+    script_name = os.path.basename(script_path)
+    codigo = f"{os.path.splitext(script_name)[0]}_{solver}"
+    if modo == "lp-relaxation":
+        codigo = f"{codigo}_lp"
+    if entrada == "memoria":
+        codigo = f"{codigo}_memoria"
+    return codigo
 
 
 def main():
@@ -67,15 +146,31 @@ def main():
     parser.add_argument("--max_val", type=int, default=100)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--solver", type=str, default="highs", help="Solver AMPL (ex: highs, cbc, gurobi)")
+    parser.add_argument("--modo", type=str, default="mip", choices=["mip", "lp-relaxation"],
+                        help="Resolver como MIP ou pela relaxação linear com verificação de integralidade")
+    parser.add_argument("--threads", type=int, default=None, help="Limite de threads do solver (padrão: do solver)")
+    parser.add_argument("--entrada", type=str, default="arquivo", choices=["arquivo", "memoria"],
+                        help="Dados via arquivo .dat ou enviados direto à sessão AMPL (padrão: arquivo)")
+    parser.add_argument("--densidade", type=float, default=None,
+                        help="Usa a instância esparsa (rotas proibidas) com esta densidade")
+    parser.add_argument("--tempo_limite", type=float, default=None, help="Tempo limite do solver em segundos")
+    parser.add_argument("--salvar_base", action="store_true",
+                        help="Grava a base ótima (solutions/<instância>_base.npz) para o tReotimizacao")
     args = parser.parse_args()
 
     nome_csv = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_csv):
+    if args.densidade is not None:
+        nome_csv = nome_instancia_esparsa(args.i, args.j, args.densidade, args.min_val, args.max_val, args.seed)
+    if not instancia_existe(nome_csv):
         print(f"Arquivo {nome_csv} não encontrado.")
         return
 
-    i, j, Oi, Dj, Cost = ler_instancia_csv(nome_csv)
-    resolver_ampl(i, j, Oi, Dj, Cost, args.solver, nome_csv)
+    cronometro = Cronometro()
+    with cronometro.fase("leitura"):
+        i, j, Oi, Dj, Cost = ler_instancia_csv(nome_csv)
+    resolver_ampl(i, j, Oi, Dj, Cost, args.solver, nome_csv, modo=args.modo, threads=args.threads, cronometro=cronometro,
+                  entrada=args.entrada, salvar_base=args.salvar_base,
+                  tempo_limite=args.tempo_limite)
 
 if __name__ == "__main__":
     main()
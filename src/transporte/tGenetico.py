@@ -1,28 +1,14 @@
 import random
 import numpy as np
-import pandas as pd
 import argparse
-import time
 import os
-import csv
 from deap import base, creator, tools, algorithms
-
-# -----------------------------
-# LEITURA DO PROBLEMA A PARTIR DE ARQUIVO
-# -----------------------------
-def ler_instancia(filepath):
-    df = pd.read_csv(filepath, header=None)
-
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
-
-    supply = df.iloc[1, :num_ofertas].to_numpy(dtype=int)
-    demand = df.iloc[2, :num_demandas].to_numpy(dtype=int)
-    costs = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy(dtype=int)
-
-    assert costs.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
-
-    return supply, demand, costs
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from tGuloso import metodo_guloso, ordem_gulosa
+from helpf import obter_instancia, instancia_existe
+from resultados import gravar_resultado
+from cronometro import Cronometro
 
 # -----------------------------
 # VERIFICAÇÃO DE VIABILIDADE
@@ -78,22 +64,6 @@ def reparar_solucao(solucao_raw, a, b, c):
     oferta_rest = np.maximum(oferta_rest, 0)
     demanda_rest = np.maximum(demanda_rest, 0)
 
-    def metodo_guloso(supply, demand, costs):
-        n_rows, n_cols = len(supply), len(demand)
-        allocation = np.zeros((n_rows, n_cols), dtype=int)
-        supply = supply.copy()
-        demand = demand.copy()
-        positions = [(i, j) for i in range(n_rows) for j in range(n_cols)]
-        positions.sort(key=lambda pos: costs[pos[0]][pos[1]])
-        for i, j in positions:
-            if supply[i] == 0 or demand[j] == 0:
-                continue
-            qty = min(supply[i], demand[j])
-            allocation[i, j] = qty
-            supply[i] -= qty
-            demand[j] -= qty
-        return allocation
-
     complemento = metodo_guloso(oferta_rest, demanda_rest, c)
     return solucao + complemento
 
@@ -106,58 +76,262 @@ def avaliar(individuo):
     return (custo_total,)
 
 # -----------------------------
-# EXECUÇÃO GA
+# AVALIAÇÃO EM LOTE
+# -----------------------------
+# A população (P x m x n) é reparada de uma vez: em cada linha o laço de
+# reparar_solucao zera as células mais caras até a soma caber em a[i]; isso é
+# o prefixo, na ordem de custo decrescente, em que a soma restante ainda
+# excede a[i]. O mesmo vale para as colunas. A ordem das células só depende
+# de c, então é calculada uma vez por execução (ordens_reparo).
+TAM_LOTE = 16
+
+def ordens_reparo(c):
+    ordem_linhas = np.argsort(-c, axis=1, kind="stable")
+    ordem_colunas = np.argsort(-c, axis=0, kind="stable")
+    return ordem_linhas, ordem_colunas, ordem_gulosa(c)
+
+def _cortar_excesso(X, ordem, limite, eixo):
+    Xs = np.take_along_axis(X, ordem, axis=eixo)
+    antes = np.cumsum(Xs, axis=eixo) - Xs
+    total = Xs.sum(axis=eixo, keepdims=True)
+    Xs[total - antes > limite] = 0
+    np.put_along_axis(X, ordem, Xs, axis=eixo)
+
+def reparar_lote(X, a, b, c, ordens):
+    """Equivalente vetorizado de reparar_solucao para X com forma (P, m, n)."""
+    ordem_linhas, ordem_colunas, ordem_guloso = ordens
+    X = np.maximum(np.floor(X), 0).astype(np.int64)
+    _cortar_excesso(X, ordem_linhas[None], a[None, :, None], eixo=2)
+    _cortar_excesso(X, ordem_colunas[None], b[None, None, :], eixo=1)
+
+    oferta_rest = np.maximum(a[None, :] - X.sum(axis=2), 0)
+    demanda_rest = np.maximum(b[None, :] - X.sum(axis=1), 0)
+    for k in range(X.shape[0]):
+        X[k] += metodo_guloso(oferta_rest[k], demanda_rest[k], c, ordem=ordem_guloso)
+    return X
+
+def avaliar_lote(X, a, b, c, ordens, tam_lote=TAM_LOTE):
+    """Custos das soluções reparadas de X (P x m x n), em sublotes de tam_lote."""
+    custos = np.empty(X.shape[0], dtype=np.int64 if np.issubdtype(c.dtype, np.integer) else float)
+    for ini in range(0, X.shape[0], tam_lote):
+        solucoes = reparar_lote(X[ini:ini + tam_lote], a, b, c, ordens)
+        custos[ini:ini + tam_lote] = np.einsum("pij,ij->p", solucoes, c)
+    return custos
+
+# -----------------------------
+# CODIFICAÇÃO POR PRIORIDADE
 # -----------------------------
-def executar_ga(supply, demand, costs, pop_size=100, ngen=100, cxpb=0.8, mutpb=0.2):
-    global a, b, c, m, n, N
-    a, b, c = np.array(supply), np.array(demand), np.array(costs)
+# O indivíduo é um vetor de m+n prioridades (origens 0..m-1, destinos
+# m..m+n-1). A decodificação repete: pega o nó aberto de maior prioridade;
+# se for origem, liga-o ao destino aberto mais barato (se for destino, à
+# origem aberta mais barata) e aloca o máximo possível. Cada passo fecha ao
+# menos um nó, então são no máximo m+n passos e a solução é básica. Os passos
+# rodam para toda a população ao mesmo tempo, e só as alocações (i, j, q) são
+# guardadas, nunca a matriz m x n de cada indivíduo.
+def decodificar_lote(prioridades, a, b, c):
+    """
+    Decodifica prioridades (P x (m+n)). Retorna linhas, colunas e quantidades
+    (P x (m+n), com quantidade 0 nos passos não usados) e o custo de cada
+    indivíduo.
+    """
+    prioridades = np.asarray(prioridades, dtype=float)
+    P = prioridades.shape[0]
     m, n = len(a), len(b)
-    N = m * n
-
-    creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
-    creator.create("Individual", list, fitness=creator.FitnessMin)
-
-    toolbox = base.Toolbox()
-    toolbox.register("attr_int", random.randint, 0, max(max(a), max(b)))
-    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_int, N)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-    toolbox.register("evaluate", avaliar)
-    toolbox.register("mate", tools.cxTwoPoint)
-    toolbox.register("mutate", tools.mutGaussian, mu=0, sigma=5, indpb=0.2)
-    toolbox.register("select", tools.selTournament, tournsize=3)
-
-    pop = toolbox.population(n=pop_size)
-    hof = tools.HallOfFame(1)
-    stats = tools.Statistics(lambda ind: ind.fitness.values[0])
-    stats.register("min", np.min)
-    stats.register("avg", np.mean)
-
-    start = time.time()
-    pop, log = algorithms.eaSimple(pop, toolbox, cxpb=cxpb, mutpb=mutpb,
-                                   ngen=ngen, stats=stats, halloffame=hof,
-                                   verbose=True)
-    end = time.time()
-
-    melhor = reparar_solucao(hof[0], a, b, c)
-    custo_total = np.sum(melhor * c)
-    status = "aproximada" if verifica(a, b, melhor) else "falha"
-    return status, custo_total, end - start
+    ordem = np.argsort(-prioridades, axis=1, kind="stable")
+    ponteiro = np.zeros(P, dtype=np.int64)
+
+    oferta = np.tile(np.asarray(a, dtype=np.int64), (P, 1))
+    demanda = np.tile(np.asarray(b, dtype=np.int64), (P, 1))
+    oferta_total = oferta.sum(axis=1)
+    demanda_total = demanda.sum(axis=1)
+
+    linhas = np.zeros((P, m + n), dtype=np.int64)
+    colunas = np.zeros((P, m + n), dtype=np.int64)
+    quantidades = np.zeros((P, m + n), dtype=np.int64)
+    custos = np.zeros(P, dtype=np.int64 if np.issubdtype(c.dtype, np.integer) else float)
+
+    for passo in range(m + n):
+        k = np.nonzero((oferta_total > 0) & (demanda_total > 0))[0]
+        if k.size == 0:
+            break
+
+        # Avança cada ponteiro até o primeiro nó ainda aberto
+        while True:
+            no = ordem[k, ponteiro[k]]
+            origem = no < m
+            restante = np.where(origem, oferta[k, np.minimum(no, m - 1)], demanda[k, np.maximum(no - m, 0)])
+            fechado = restante == 0
+            if not fechado.any():
+                break
+            ponteiro[k[fechado]] += 1
+
+        i = np.where(origem, no, 0)
+        j = np.where(origem, 0, no - m)
+        ko, kd = k[origem], k[~origem]
+        if ko.size:
+            custos_linha = np.where(demanda[ko] > 0, c[no[origem]], np.inf)
+            j[origem] = np.argmin(custos_linha, axis=1)
+        if kd.size:
+            custos_coluna = np.where(oferta[kd] > 0, c[:, no[~origem] - m].T, np.inf)
+            i[~origem] = np.argmin(custos_coluna, axis=1)
+
+        q = np.minimum(oferta[k, i], demanda[k, j])
+        oferta[k, i] -= q
+        demanda[k, j] -= q
+        oferta_total[k] -= q
+        demanda_total[k] -= q
+        linhas[k, passo], colunas[k, passo], quantidades[k, passo] = i, j, q
+        custos[k] += q * c[i, j]
+
+    return linhas, colunas, quantidades, custos
+
+def decodificar(prioridade, a, b, c):
+    """Matriz de alocação (m x n) de um único vetor de prioridades."""
+    linhas, colunas, quantidades, _ = decodificar_lote(np.asarray(prioridade)[None], a, b, c)
+    solucao = np.zeros((len(a), len(b)), dtype=int)
+    np.add.at(solucao, (linhas[0], colunas[0]), quantidades[0])
+    return solucao
+
+def avaliar_prioridade(individuo):
+    return (decodificar_lote(np.asarray(individuo)[None], a, b, c)[3][0],)
+
+# Avaliação paralela: cada processo anexa a matriz de custos de um bloco de
+# memória compartilhada e recebe só a sua fatia da população
+_avaliador = {}
+pool = None
+processos_avaliacao = 1
+
+def _inicializar_avaliador(nome_memoria, forma, dtype, oferta, demanda, codificacao):
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    custos = np.ndarray(forma, dtype=dtype, buffer=memoria.buf)
+    ordens_trab = ordens_reparo(custos) if codificacao == "densa" else None
+    _avaliador.update(memoria=memoria, a=oferta, b=demanda, c=custos, ordens=ordens_trab)
+
+def _avaliar_fatia(X):
+    return _avaliar_populacao(X, _avaliador["a"], _avaliador["b"], _avaliador["c"], _avaliador["ordens"])
+
+def _avaliar_populacao(X, a, b, c, ordens):
+    # X é (P, m, n) na codificação densa e (P, m+n) na por prioridade
+    if X.ndim == 2:
+        return decodificar_lote(X, a, b, c)[3]
+    return avaliar_lote(X, a, b, c, ordens)
+
+def mapa_lote(func, individuos):
+    """
+    toolbox.map do genético: avalia todos os indivíduos pendentes de uma vez
+    (no processo atual ou dividindo a população entre os processos do pool).
+    Outras funções mapeadas seguem o map comum.
+    """
+    # toolbox.register embrulha a função num functools.partial
+    funcao = getattr(func, "func", func)
+    if funcao is not avaliar and funcao is not avaliar_prioridade:
+        return list(map(func, individuos))
+    individuos = list(individuos)
+    if not individuos:
+        return []
+
+    X = np.array(individuos, dtype=float)
+    if funcao is avaliar:
+        X = X.reshape(len(individuos), m, n)
+    if pool is None:
+        custos = _avaliar_populacao(X, a, b, c, ordens)
+    else:
+        fatias = np.array_split(X, min(processos_avaliacao, len(individuos)))
+        custos = np.concatenate(list(pool.map(_avaliar_fatia, fatias)))
+    return [(custo,) for custo in custos.tolist()]
+
+# -----------------------------
+# EXECUÇÃO GA
+# -----------------------------
+def executar_ga(supply, demand, costs, pop_size=100, ngen=100, cxpb=0.8, mutpb=0.2, cronometro=None,
+                avaliacao="lote", processos=1, codificacao="densa"):
+    """
+    avaliacao: "lote" (população reparada de uma vez, ver avaliar_lote) ou
+    "individual" (avaliar, um indivíduo por vez). processos > 1 distribui a
+    avaliação em lote num pool com os custos em memória compartilhada.
+    codificacao: "densa" (m*n quantidades, reparadas) ou "prioridade"
+    (m+n prioridades, ver decodificar_lote).
+    """
+    global a, b, c, m, n, N, ordens, pool, processos_avaliacao
+    cronometro = cronometro or Cronometro()
+    memoria = None
+    pool = None
+
+    with cronometro.fase("montagem"):
+        a, b, c = np.array(supply), np.array(demand), np.array(costs)
+        m, n = len(a), len(b)
+        N = m * n
+
+        creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMin)
+
+        toolbox = base.Toolbox()
+        if codificacao == "densa":
+            toolbox.register("attr_int", random.randint, 0, max(max(a), max(b)))
+            toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_int, N)
+            toolbox.register("evaluate", avaliar)
+            toolbox.register("mutate", tools.mutGaussian, mu=0, sigma=5, indpb=0.2)
+        elif codificacao == "prioridade":
+            toolbox.register("attr_float", random.random)
+            toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_float, m + n)
+            toolbox.register("evaluate", avaliar_prioridade)
+            toolbox.register("mutate", tools.mutGaussian, mu=0, sigma=0.2, indpb=0.2)
+        else:
+            raise ValueError(f"Codificação desconhecida: {codificacao}")
+        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+        toolbox.register("mate", tools.cxTwoPoint)
+        toolbox.register("select", tools.selTournament, tournsize=3)
+
+        if avaliacao == "lote":
+            ordens = ordens_reparo(c) if codificacao == "densa" else None
+            processos_avaliacao = processos
+            if processos > 1:
+                memoria = shared_memory.SharedMemory(create=True, size=max(c.nbytes, 1))
+                np.ndarray(c.shape, dtype=c.dtype, buffer=memoria.buf)[:] = c
+                pool = ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_avaliador,
+                                           initargs=(memoria.name, c.shape, c.dtype, a, b, codificacao))
+            toolbox.register("map", mapa_lote)
+        elif avaliacao != "individual":
+            raise ValueError(f"Avaliação desconhecida: {avaliacao}")
+
+        pop = toolbox.population(n=pop_size)
+        hof = tools.HallOfFame(1)
+        stats = tools.Statistics(lambda ind: ind.fitness.values[0])
+        stats.register("min", np.min)
+        stats.register("avg", np.mean)
+
+    try:
+        with cronometro.fase("solver"):
+            pop, log = algorithms.eaSimple(pop, toolbox, cxpb=cxpb, mutpb=mutpb,
+                                           ngen=ngen, stats=stats, halloffame=hof,
+                                           verbose=True)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            pool = None
+        if memoria is not None:
+            memoria.close()
+            memoria.unlink()
+
+    with cronometro.fase("extracao"):
+        if codificacao == "prioridade":
+            melhor = decodificar(hof[0], a, b, c)
+        else:
+            melhor = reparar_solucao(hof[0], a, b, c)
+        custo_total = np.sum(melhor * c)
+        status = "aproximada" if verifica(a, b, melhor) else "falha"
+    return status, custo_total, cronometro.segundos("solver")
 
 # -----------------------------
 # SALVAR RESULTADO
 # -----------------------------
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, fases=None, codificacao="densa"):
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/") + f"_resultado.csv"
-    escrever_cabecalho = not os.path.exists(csv_path)
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    if codificacao != "densa":
+        codigo += f"_{codificacao}"
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 # -----------------------------
 # MAIN
@@ -169,16 +343,26 @@ def main():
     parser.add_argument("--min_val", type=int, default=1)
     parser.add_argument("--max_val", type=int, default=100)
     parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--populacao", type=int, default=10, help="Tamanho da população (padrão: 10)")
+    parser.add_argument("--geracoes", type=int, default=5, help="Número de gerações (padrão: 5)")
+    parser.add_argument("--avaliacao", type=str, default="lote", choices=["lote", "individual"],
+                        help="Avaliação da população em lote (vetorizada) ou indivíduo a indivíduo (padrão: lote)")
+    parser.add_argument("--processos", type=int, default=1, help="Processos para a avaliação em lote (padrão: 1)")
+    parser.add_argument("--codificacao", type=str, default="densa", choices=["densa", "prioridade"],
+                        help="Cromossomo com m*n quantidades ou com m+n prioridades (padrão: densa)")
     args = parser.parse_args()
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    supply, demand, costs = ler_instancia(nome_arquivo)
-    status, custo, tempo = executar_ga(supply, demand, costs, pop_size=10,ngen=5)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    supply, demand, costs = obter_instancia(nome_arquivo, cronometro)
+    status, custo, tempo = executar_ga(supply, demand, costs, pop_size=args.populacao, ngen=args.geracoes,
+                                       cronometro=cronometro, avaliacao=args.avaliacao, processos=args.processos,
+                                       codificacao=args.codificacao)
+    salvar_resultado(nome_arquivo, status, custo, tempo, fases=cronometro.fases(), codificacao=args.codificacao)
 
     print("Problema resolvido.")
     print(f"Status: {status}")
@@ -1,9 +1,10 @@
 import numpy as np
-import pandas as pd
 import argparse
-import time
 import os
-import csv
+import scipy.sparse as sp
+from helpf import obter_instancia, instancia_existe, nome_instancia_esparsa, arcos
+from resultados import gravar_resultado
+from cronometro import Cronometro
 
 def verifica(supply, demand, allocation):
     """
@@ -13,14 +14,15 @@ def verifica(supply, demand, allocation):
     Parâmetros:
     - supply: lista ou array 1D de ofertas (comprimento m)
     - demand: lista ou array 1D de demandas (comprimento n)
-    - allocation: matriz (m x n) com alocações feitas
+    - allocation: matriz (m x n) com alocações feitas (densa ou CSR)
 
     Retorna:
     - True se a solução é válida, False caso contrário.
     """
     supply = np.array(supply)
     demand = np.array(demand)
-    allocation = np.array(allocation)
+    if not sp.issparse(allocation):
+        allocation = np.array(allocation)
 
     # Verifica dimensões
     if allocation.shape != (len(supply), len(demand)):
@@ -28,25 +30,25 @@ def verifica(supply, demand, allocation):
         return False
 
     # Verifica não-negatividade
-    if np.any(allocation < 0):
+    if np.any((allocation.data if sp.issparse(allocation) else allocation) < 0):
         print("A matriz de alocação contém valores negativos.")
         return False
 
     # Verifica se a oferta não foi ultrapassada
-    oferta_usada = allocation.sum(axis=1)
+    oferta_usada = np.asarray(allocation.sum(axis=1)).ravel()
     if not np.all(oferta_usada <= supply):
         print("Alguma oferta foi ultrapassada.")
         return False
 
     # Verifica se a demanda não foi ultrapassada
-    demanda_atendida = allocation.sum(axis=0)
+    demanda_atendida = np.asarray(allocation.sum(axis=0)).ravel()
     if not np.all(demanda_atendida <= demand):
         print("Alguma demanda foi ultrapassada.")
         return False
 
     return True
 
-def metodo_guloso(supply, demand, costs):
+def metodo_guloso_referencia(supply, demand, costs):
     n_rows = len(supply)
     n_cols = len(demand)
 
@@ -67,49 +69,172 @@ def metodo_guloso(supply, demand, costs):
 
     return allocation
 
-def calcular_custo_total(allocation, costs):
-    return int(np.sum(allocation * costs))
+def _ordem_candidatos(costs):
+    """
+    Gera, em blocos, os índices achatados de costs em ordem crescente de custo,
+    com empates resolvidos pela ordem linha-a-linha (igual ao sort estável da
+    referência). Para custos inteiros usa chaves únicas custo*m*n + índice, o
+    que permite argpartition sem perder a estabilidade; caso contrário recorre
+    a um argsort estável completo.
+    """
+    flat = costs.ravel()
+    total = flat.size
+    if total == 0:
+        return
 
-def solve_transport_greedy(filepath):
-    df = pd.read_csv(filepath, header=None)
+    if np.issubdtype(flat.dtype, np.integer):
+        cmin = int(flat.min())
+        cmax = int(flat.max())
+        if (cmax - cmin + 1) * total < np.iinfo(np.int64).max:
+            chaves = (flat.astype(np.int64) - cmin) * total + np.arange(total, dtype=np.int64)
+            bloco = min(total, max(1024, 2 * int(np.sqrt(total))))
+            while chaves.size > 0:
+                if chaves.size <= bloco:
+                    chaves.sort()
+                    yield chaves % total
+                    return
+                parte = np.argpartition(chaves, bloco)
+                menores = np.sort(chaves[parte[:bloco]])
+                chaves = chaves[parte[bloco:]]
+                yield menores % total
+                bloco *= 2
+            return
 
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
+    yield np.argsort(flat, kind="stable")
 
-    supply = df.iloc[1, :num_ofertas].to_numpy(dtype=int)
-    demand = df.iloc[2, :num_demandas].to_numpy(dtype=int)
-    costs = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy(dtype=int)
+def ordem_gulosa(costs):
+    """Ordem completa das células (índices achatados) usada pelo método guloso."""
+    costs = np.asarray(costs)
+    if costs.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(list(_ordem_candidatos(costs)))
 
-    assert costs.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
+def _blocos_ordem(ordem):
+    bloco = min(ordem.size, max(1024, 2 * int(np.sqrt(ordem.size))))
+    ini = 0
+    while ini < ordem.size:
+        yield ordem[ini:ini + bloco]
+        ini += bloco
+        bloco *= 2
 
-    start = time.time()
-    allocation = metodo_guloso(supply, demand, costs)
-    total_cost = calcular_custo_total(allocation, costs)
-    end = time.time()
+def metodo_guloso(supply, demand, costs, ordem=None):
+    """
+    Versão vetorizada do método guloso: percorre as células em ordem de custo,
+    bloco a bloco, descartando com NumPy as células cuja linha ou coluna já se
+    esgotou e parando assim que toda a oferta ou toda a demanda é consumida.
+    Retorna a mesma alocação que metodo_guloso_referencia.
+
+    ordem (opcional) é o resultado de ordem_gulosa(costs), para quem resolve
+    muitas vezes com a mesma matriz de custos (ex.: o reparo do genético).
+    """
+    costs = np.asarray(costs)
+    n_rows = len(supply)
+    n_cols = len(demand)
+
+    allocation = np.zeros((n_rows, n_cols), dtype=int)
+    supply = np.array(supply).copy()
+    demand = np.array(demand).copy()
+
+    linhas_abertas = int(np.count_nonzero(supply != 0))
+    colunas_abertas = int(np.count_nonzero(demand != 0))
+
+    for indices in (_ordem_candidatos(costs) if ordem is None else _blocos_ordem(ordem)):
+        if linhas_abertas == 0 or colunas_abertas == 0:
+            break
+
+        linhas = indices // n_cols
+        colunas = indices % n_cols
+        vivos = (supply[linhas] != 0) & (demand[colunas] != 0)
+
+        for i, j in zip(linhas[vivos].tolist(), colunas[vivos].tolist()):
+            if supply[i] == 0 or demand[j] == 0:
+                continue
+            qty = min(supply[i], demand[j])
+            allocation[i, j] = qty
+            supply[i] -= qty
+            demand[j] -= qty
+            if supply[i] == 0:
+                linhas_abertas -= 1
+            if demand[j] == 0:
+                colunas_abertas -= 1
+            if linhas_abertas == 0 or colunas_abertas == 0:
+                break
+
+    return allocation
+
+def metodo_guloso_esparso(supply, demand, custos):
+    """
+    Método guloso numa instância esparsa: só os arcos da CSR custos são
+    candidatos, percorridos em ordem de custo (empates pela ordem linha a
+    linha, como na versão densa). Retorna a alocação como CSR com a mesma
+    estrutura de custos.
+    """
+    linhas, colunas, valores = arcos(custos)
+    supply = np.array(supply).copy()
+    demand = np.array(demand).copy()
+    quantidades = np.zeros(custos.nnz, dtype=int)
+
+    linhas_abertas = int(np.count_nonzero(supply != 0))
+    colunas_abertas = int(np.count_nonzero(demand != 0))
+
+    for bloco in _blocos_ordem(np.argsort(valores, kind="stable")):
+        if linhas_abertas == 0 or colunas_abertas == 0:
+            break
+
+        vivos = bloco[(supply[linhas[bloco]] != 0) & (demand[colunas[bloco]] != 0)]
+        for k, i, j in zip(vivos.tolist(), linhas[vivos].tolist(), colunas[vivos].tolist()):
+            if supply[i] == 0 or demand[j] == 0:
+                continue
+            qty = min(supply[i], demand[j])
+            quantidades[k] = qty
+            supply[i] -= qty
+            demand[j] -= qty
+            if supply[i] == 0:
+                linhas_abertas -= 1
+            if demand[j] == 0:
+                colunas_abertas -= 1
+            if linhas_abertas == 0 or colunas_abertas == 0:
+                break
+
+    return sp.csr_matrix((quantidades, custos.indices, custos.indptr), shape=custos.shape)
+
+def demanda_atendida(allocation, demand):
+    return bool(np.all(np.asarray(allocation.sum(axis=0)).ravel() >= np.asarray(demand)))
+
+def calcular_custo_total(allocation, costs):
+    if sp.issparse(costs):
+        # Alocação com a mesma estrutura (arcos) de costs
+        return int(allocation.data @ costs.data)
+    return int(np.sum(allocation * costs))
+
+def solve_transport_greedy(instancia, cronometro=None):
+    cronometro = cronometro or Cronometro()
+    supply, demand, costs = obter_instancia(instancia, cronometro)
+
+    with cronometro.fase("solver"):
+        if sp.issparse(costs):
+            allocation = metodo_guloso_esparso(supply, demand, costs)
+        else:
+            allocation = metodo_guloso(supply, demand, costs)
+    with cronometro.fase("extracao"):
+        total_cost = calcular_custo_total(allocation, costs)
 
     status = "aproximada"
-    tempo_exec = end - start
+    if sp.issparse(costs) and not demanda_atendida(allocation, demand):
+        # Com rotas proibidas a heurística pode terminar sem atender toda a demanda
+        status = "falha"
+    tempo_exec = cronometro.segundos("solver", "extracao")
     
 
     print(f"SOLUÇÂO VALIDA {verifica(supply, demand, allocation)}")
     return status, total_cost, tempo_exec
 
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, fases=None):
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
 
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/")
-    csv_path = csv_path + f"_resultado.csv"
-
-    escrever_cabecalho = not os.path.exists(csv_path)
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de transporte por um método guloso.")
@@ -118,15 +243,20 @@ def main():
     parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo dos custos/ofertas (padrão: 1)")
     parser.add_argument("--max_val", type=int, default=100, help="Valor máximo dos custos/ofertas (padrão: 100)")
     parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--densidade", type=float, default=None,
+                        help="Usa a instância esparsa (rotas proibidas) com esta densidade")
     args = parser.parse_args()
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if args.densidade is not None:
+        nome_arquivo = nome_instancia_esparsa(args.i, args.j, args.densidade, args.min_val, args.max_val, args.seed)
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    status, custo, tempo = solve_transport_greedy(nome_arquivo)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    status, custo, tempo = solve_transport_greedy(nome_arquivo, cronometro=cronometro)
+    salvar_resultado(nome_arquivo, status, custo, tempo, fases=cronometro.fases())
 
     print("Problema resolvido.")
     print(f"Status: {status}")
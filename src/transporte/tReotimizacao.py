@@ -0,0 +1,415 @@
+import numpy as np
+import argparse
+import json
+import os
+import scipy.sparse as sp
+from collections import deque
+from helpf import obter_instancia, instancia_existe, hash_conteudo
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from tSimplex import simplex_transporte
+
+# -----------------------------
+# BASE ÓTIMA PERSISTIDA
+# -----------------------------
+# A base é a do problema balanceado do tSimplex: m origens e n + 1 destinos,
+# o último fictício (custo zero) com a sobra de oferta. Ela é gravada em
+# solutions/<instância>_base.npz, ao lado do CSV de resultados, com:
+# - linhas, colunas, fluxos: as m + n células básicas (árvore geradora)
+# - u, v: potenciais (c[i, j] - u[i] - v[j] >= 0 em todas as células)
+# - oferta, demanda: os dados para os quais a base é ótima
+# - alt_linhas, alt_colunas, alt_valores: custos alterados em relação ao
+#   arquivo da instância (reotimizações encadeadas)
+# - hash_custos: hash dos custos do arquivo, para não usar a base com outra instância
+# São O(m + n) números, mais as alterações de custo acumuladas.
+
+def caminho_base(filepath):
+    return filepath.replace("instancias/", "solutions/") + "_base.npz"
+
+def _custos_celulas(custos, linhas, colunas):
+    """Custos das células no problema estendido (coluna n = destino fictício, custo zero)."""
+    n = custos.shape[1]
+    reais = colunas < n
+    valores = np.zeros(len(linhas), dtype=custos.dtype)
+    valores[reais] = custos[linhas[reais], colunas[reais]]
+    return valores
+
+def _estender(custos):
+    return np.hstack([custos, np.zeros((custos.shape[0], 1), dtype=custos.dtype)])
+
+def base_otima(oferta, demanda, custos, alocacao):
+    """
+    Base ótima a partir da alocação (m x n) de um solver exato: a alocação é
+    estendida com a coluna de sobra, completada até uma árvore geradora e
+    certificada por pivôs MODI (em geral só degenerados). Se a alocação não
+    for básica (células positivas com ciclo) ou não for uma solução do
+    problema balanceado, a base é recalculada do zero pelo simplex de
+    transporte.
+    """
+    oferta, demanda, custos = np.asarray(oferta), np.asarray(demanda), np.asarray(custos)
+    m, n = custos.shape
+    inteiro = all(np.issubdtype(x.dtype, np.integer) for x in (oferta, demanda, custos))
+    alocacao = np.asarray(alocacao, dtype=float)
+    alocacao = np.rint(alocacao).astype(np.int64) if inteiro else np.where(np.abs(alocacao) < 1e-9, 0.0, alocacao)
+
+    demanda_ext = np.append(demanda, oferta.sum() - demanda.sum())
+    custos_ext = _estender(custos)
+    estendida = np.hstack([alocacao, (oferta - alocacao.sum(axis=1))[:, None]])
+
+    try:
+        if (estendida < 0).any() or not np.allclose(estendida.sum(axis=0), demanda_ext):
+            raise ValueError("Alocação não resolve o problema balanceado.")
+        estendida, celulas, u, v = simplex_transporte(oferta, demanda_ext, custos_ext, alocacao_inicial=estendida)
+    except ValueError as e:
+        print(f"[AVISO] {e} Recalculando a base pelo simplex de transporte.")
+        estendida, celulas, u, v = simplex_transporte(oferta, demanda_ext, custos_ext)
+
+    linhas, colunas = (np.array(x, dtype=np.int64) for x in zip(*celulas))
+    vazio = np.zeros(0, dtype=np.int64)
+    return {
+        "linhas": linhas, "colunas": colunas, "fluxos": estendida[linhas, colunas],
+        "u": u, "v": v, "oferta": oferta, "demanda": demanda,
+        "alt_linhas": vazio, "alt_colunas": vazio, "alt_valores": np.zeros(0, dtype=custos.dtype),
+    }
+
+def salvar_base(caminho, base, custos_instancia):
+    """Grava a base (escrita atômica); custos_instancia são os custos do arquivo da instância."""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(temporario, hash_custos=hash_conteudo(custos_instancia), **base)
+    os.replace(temporario, caminho)
+    return caminho
+
+def carregar_base(caminho):
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho) as dados:
+        return {chave: dados[chave] for chave in dados.files}
+
+def salvar_base_otima(instancia, Oi, Dj, Cost, alocacao):
+    """
+    Chamado pelos solvers exatos (opção --salvar_base) com a alocação ótima.
+    Só instâncias densas: a base de uma instância esparsa teria de tratar as
+    rotas proibidas.
+    """
+    if sp.issparse(Cost):
+        print("[AVISO] Base não gravada: instância esparsa.")
+        return None
+    caminho = salvar_base(caminho_base(instancia), base_otima(Oi, Dj, Cost, alocacao), Cost)
+    print(f"Base ótima gravada em {caminho}")
+    return caminho
+
+def aplicar_alteracoes(custos, base):
+    """Custos do arquivo com as alterações acumuladas na base (cópia só se houver alterações)."""
+    if base["alt_linhas"].size == 0:
+        return custos
+    custos = custos.copy()
+    custos[base["alt_linhas"], base["alt_colunas"]] = base["alt_valores"]
+    return custos
+
+# -----------------------------
+# OPERAÇÕES NA ÁRVORE DA BASE
+# -----------------------------
+# Nós 0..m-1 são as origens e m..m+n as colunas do problema estendido. Como
+# no tSimplex, a árvore fica enraizada na origem 0, com pai e profundidade por
+# nó; aqui cada nó guarda também a célula (índice em linhas/colunas) que o
+# liga ao pai, e a adjacência mapeia vizinho -> célula.
+
+# Elementos por bloco na busca da célula de entrada dos pivôs duais
+ELEMENTOS_BLOCO = 1 << 20
+
+def _adjacencia(m, n_ext, linhas, colunas):
+    adj = [{} for _ in range(m + n_ext)]
+    for e, (i, j) in enumerate(zip(linhas.tolist(), colunas.tolist())):
+        adj[i][m + j] = e
+        adj[m + j][i] = e
+    return adj
+
+def _enraizar(raiz, adj, pai, profundidade, celula_pai):
+    """
+    BFS a partir de raiz (sem voltar ao seu pai), atualizando pai,
+    profundidade e célula até o pai dos nós alcançados. Retorna esses nós
+    (a subárvore de raiz, incluindo ela).
+    """
+    nos = [raiz]
+    fila = deque([raiz])
+    while fila:
+        a = fila.popleft()
+        for b, e in adj[a].items():
+            if b == pai[a]:
+                continue
+            pai[b] = a
+            profundidade[b] = profundidade[a] + 1
+            celula_pai[b] = e
+            nos.append(b)
+            fila.append(b)
+    return nos
+
+def fluxos_da_base(linhas, colunas, oferta, demanda_ext):
+    """
+    Fluxos das células básicas para a oferta e a demanda dadas: numa árvore
+    eles são únicos e saem retirando folhas, em O(m + n).
+    """
+    m, n_ext = len(oferta), len(demanda_ext)
+    adj = _adjacencia(m, n_ext, linhas, colunas)
+    grau = [len(a) for a in adj]
+    resto = np.concatenate([oferta, -np.asarray(demanda_ext)]).tolist()
+    fluxos = np.zeros(len(linhas), dtype=np.result_type(oferta, demanda_ext))
+    usada = [False] * len(linhas)
+    linhas_l, colunas_l = linhas.tolist(), colunas.tolist()
+
+    folhas = [w for w in range(m + n_ext) if grau[w] == 1]
+    while folhas:
+        w = folhas.pop()
+        if grau[w] != 1:
+            continue
+        e = next(e for e in adj[w].values() if not usada[e])
+        usada[e] = True
+        i, j = linhas_l[e], m + colunas_l[e]
+        f = resto[w] if w == i else -resto[w]
+        fluxos[e] = f
+        resto[i] -= f
+        resto[j] += f
+        outro = j if w == i else i
+        grau[w] -= 1
+        grau[outro] -= 1
+        if grau[outro] == 1:
+            folhas.append(outro)
+    return fluxos
+
+def _menor_reduzido(custos, u, v, origens, destinos):
+    """
+    Célula (origem, destino) de menor custo reduzido entre origens x destinos
+    (o destino n é o fictício, de custo zero), percorrendo blocos de origens
+    com até ELEMENTOS_BLOCO células. Retorna i, j e o custo reduzido.
+    """
+    n = custos.shape[1]
+    reais = destinos[destinos < n]
+    tam_bloco = max(1, ELEMENTOS_BLOCO // destinos.size)
+    melhor = None
+    for ini in range(0, origens.size, tam_bloco):
+        bloco = origens[ini:ini + tam_bloco]
+        reduzidos = np.zeros((bloco.size, destinos.size), dtype=np.result_type(custos, u, v))
+        reduzidos[:, :reais.size] = custos[np.ix_(bloco, reais)]
+        reduzidos -= u[bloco][:, None] + v[destinos][None, :]
+        pos = int(np.argmin(reduzidos))
+        if melhor is None or reduzidos.flat[pos] < melhor[2]:
+            melhor = (int(bloco[pos // destinos.size]), int(destinos[pos % destinos.size]), reduzidos.flat[pos])
+    return melhor
+
+def pivos_duais(custos, linhas, colunas, u, v, oferta, demanda_ext, max_pivos=None):
+    """
+    Simplex dual na árvore: enquanto alguma célula básica tem fluxo negativo,
+    ela sai; a árvore sem ela se divide em A (com a origem da célula) e B, e
+    entra a célula de menor custo reduzido de uma origem de B para um destino
+    de A (a única direção que leva fluxo para A). Os potenciais de um dos
+    lados mudam de θ, mantendo todos os custos reduzidos não negativos.
+
+    Como no tSimplex, a árvore é mantida entre os pivôs: só a subárvore
+    separada pela célula de saída é percorrida (para achar os lados, mudar
+    seus potenciais e religá-la), e os fluxos mudam só no ciclo da célula de
+    entrada. A escolha da célula de entrada precisa do menor custo reduzido
+    de todo o corte B x A e é feita em blocos (ver _menor_reduzido).
+
+    Altera linhas, colunas, u e v. Retorna (pivôs, fluxos), ou (None, None)
+    se o problema é inviável ou o limite de pivôs foi atingido.
+    """
+    m, n_ext = len(oferta), len(demanda_ext)
+    max_pivos = max_pivos if max_pivos is not None else 5 * (m + n_ext) + 100
+    fluxos = fluxos_da_base(linhas, colunas, oferta, demanda_ext)
+
+    adj = _adjacencia(m, n_ext, linhas, colunas)
+    pai = [-1] * (m + n_ext)
+    profundidade = [0] * (m + n_ext)
+    celula_pai = [-1] * (m + n_ext)
+    _enraizar(0, adj, pai, profundidade, celula_pai)
+    pivos = 0
+
+    while True:
+        e = int(np.argmin(fluxos))
+        if fluxos[e] >= 0:
+            return pivos, fluxos
+        if pivos >= max_pivos:
+            return None, None
+
+        # Subárvore S separada pela célula e; A é S se ela contém a origem da célula
+        p, q = int(linhas[e]), m + int(colunas[e])
+        w = p if pai[p] == q else q
+        sub = np.array(_enraizar(w, adj, pai, profundidade, celula_pai))
+        em_sub = np.zeros(m + n_ext, dtype=bool)
+        em_sub[sub] = True
+        em_a = em_sub if w == p else ~em_sub
+
+        origens_b = np.flatnonzero(~em_a[:m])
+        destinos_a = np.flatnonzero(em_a[m:])
+        if origens_b.size == 0 or destinos_a.size == 0:
+            return None, None
+        i, j, theta = _menor_reduzido(custos, u, v, origens_b, destinos_a)
+
+        # Potenciais: B sobe θ em u e desce em v (ou, equivalentemente, A o contrário)
+        sinal = 1 if w == q else -1
+        u[sub[sub < m]] += sinal * theta
+        v[sub[sub >= m] - m] -= sinal * theta
+
+        # Ciclo da célula (i, j): caminhos de i e de m+j até o ancestral comum;
+        # como no tSimplex, as posições pares perdem o fluxo que a célula de entrada ganha
+        a, b = i, m + j
+        caminho_a, caminho_b = [], []
+        while a != b:
+            if profundidade[a] >= profundidade[b]:
+                caminho_a.append(a)
+                a = pai[a]
+            else:
+                caminho_b.append(b)
+                b = pai[b]
+        lado = caminho_a if w in caminho_a else caminho_b
+        delta = fluxos[e] if lado.index(w) % 2 == 0 else -fluxos[e]
+        for caminho in (caminho_a, caminho_b):
+            for k, no in enumerate(caminho):
+                fluxos[celula_pai[no]] += -delta if k % 2 == 0 else delta
+
+        # Troca de base: a célula e passa a ser (i, j) e a subárvore é religada por ela
+        del adj[w][pai[w]]
+        del adj[pai[w]][w]
+        linhas[e], colunas[e] = i, j
+        fluxos[e] = delta
+        adj[i][m + j] = e
+        adj[m + j][i] = e
+        x, y = (i, m + j) if em_sub[i] else (m + j, i)
+        pai[x] = y
+        profundidade[x] = profundidade[y] + 1
+        celula_pai[x] = e
+        _enraizar(x, adj, pai, profundidade, celula_pai)
+        pivos += 1
+
+# -----------------------------
+# REOTIMIZAÇÃO
+# -----------------------------
+def reotimizar(base, custos, delta):
+    """
+    Aplica o delta à base ótima e restaura a otimalidade.
+
+    delta: {"oferta": {i: O_i}, "demanda": {j: D_j}, "custos": [[i, j, c], ...]}
+    (todas as chaves opcionais; índices podem vir como texto, do JSON).
+    custos: custos atuais (arquivo com as alterações da base aplicadas).
+
+    Mudanças de oferta/demanda mantêm os potenciais viáveis: os fluxos da
+    árvore são recalculados e pivôs duais removem os negativos. Depois, as
+    mudanças de custo mantêm a base viável e os pivôs MODI do tSimplex
+    (partindo dela) restauram o ótimo. Se o simplex dual não termina, a
+    instância alterada é resolvida do zero.
+
+    Retorna status, nova base, custo total e número de pivôs duais.
+    """
+    custos = np.asarray(custos)
+    m, n = custos.shape
+    oferta, demanda = base["oferta"].copy(), base["demanda"].copy()
+    for i, valor in delta.get("oferta", {}).items():
+        oferta[int(i)] = valor
+    for j, valor in delta.get("demanda", {}).items():
+        demanda[int(j)] = valor
+
+    sobra = oferta.sum() - demanda.sum()
+    if sobra < 0:
+        return "Infeasible", None, None, 0
+    demanda_ext = np.append(demanda, sobra)
+
+    linhas, colunas = base["linhas"].copy(), base["colunas"].copy()
+    u, v = base["u"].copy(), base["v"].copy()
+    pivos, fluxos = pivos_duais(custos, linhas, colunas, u, v, oferta, demanda_ext)
+
+    alteracoes = {(int(i), int(j)): c for i, j, c in zip(base["alt_linhas"], base["alt_colunas"], base["alt_valores"])}
+    novos_custos = {(int(i), int(j)): c for i, j, c in delta.get("custos", [])}
+    alteracoes.update(novos_custos)
+    if novos_custos:
+        custos = custos.copy()
+        for (i, j), c in novos_custos.items():
+            custos[i, j] = c
+
+    if pivos is None or novos_custos:
+        if pivos is None:
+            print("[AVISO] Simplex dual sem solução; resolvendo a instância alterada do zero.")
+            inicial = None
+        else:
+            inicial = np.zeros((m, n + 1), dtype=fluxos.dtype)
+            inicial[linhas, colunas] = fluxos
+        estendida, celulas, u, v = simplex_transporte(oferta, demanda_ext, _estender(custos), alocacao_inicial=inicial)
+        linhas, colunas = (np.array(x, dtype=np.int64) for x in zip(*celulas))
+        fluxos = estendida[linhas, colunas]
+
+    nova = {
+        "linhas": linhas, "colunas": colunas, "fluxos": fluxos, "u": u, "v": v,
+        "oferta": oferta, "demanda": demanda,
+        "alt_linhas": np.array([i for i, _ in alteracoes], dtype=np.int64),
+        "alt_colunas": np.array([j for _, j in alteracoes], dtype=np.int64),
+        "alt_valores": np.array(list(alteracoes.values()), dtype=custos.dtype),
+    }
+    custo_total = (fluxos @ _custos_celulas(custos, linhas, colunas)).item()
+    return "Optimal", nova, custo_total, pivos or 0
+
+def reotimizar_instancia(instancia, caminho_delta, arquivo_base=None, saida=None, cronometro=None):
+    """
+    Parte da base gravada (padrão: a da própria instância), aplica o delta
+    (JSON) e registra o resultado da instância alterada em saida (padrão:
+    <instância>_delta), gravando também a nova base ao lado dele.
+    """
+    cronometro = cronometro or Cronometro()
+    arquivo_base = arquivo_base or caminho_base(instancia)
+    saida = saida or f"{instancia}_delta"
+
+    with cronometro.fase("leitura"):
+        Oi, Dj, Cost = obter_instancia(instancia)
+        base = carregar_base(arquivo_base)
+        with open(caminho_delta) as f:
+            delta = json.load(f)
+
+    if base is None:
+        raise FileNotFoundError(f"Base {arquivo_base} não encontrada (rode um solver exato com --salvar_base).")
+    if str(base["hash_custos"]) != hash_conteudo(Cost):
+        raise ValueError(f"A base {arquivo_base} não é desta instância.")
+
+    with cronometro.fase("montagem"):
+        custos = aplicar_alteracoes(Cost, base)
+
+    with cronometro.fase("solver"):
+        status, nova, custo_total, pivos = reotimizar(base, custos, delta)
+
+    if nova is not None:
+        with cronometro.fase("escrita"):
+            salvar_base(caminho_base(saida), nova, Cost)
+
+    tempo = cronometro.segundos("solver")
+    gravar_resultado(saida, "tReotimizacao", status, custo_total, tempo, cronometro.fases())
+    return status, custo_total, tempo, pivos
+
+def main():
+    parser = argparse.ArgumentParser(description="Reotimiza o problema de transporte a partir de uma base ótima gravada.")
+    parser.add_argument("i", type=int, help="Número de ofertas")
+    parser.add_argument("j", type=int, help="Número de demandas")
+    parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo dos custos/ofertas (padrão: 1)")
+    parser.add_argument("--max_val", type=int, default=100, help="Valor máximo dos custos/ofertas (padrão: 100)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--delta", type=str, required=True,
+                        help='JSON com as mudanças: {"oferta": {i: O_i}, "demanda": {j: D_j}, "custos": [[i, j, c], ...]}')
+    parser.add_argument("--base", type=str, default=None,
+                        help="Base de partida (padrão: solutions/<instância>_base.npz)")
+    parser.add_argument("--saida", type=str, default=None,
+                        help="Nome da instância alterada nos resultados (padrão: <instância>_delta)")
+    args = parser.parse_args()
+
+    nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
+    if not instancia_existe(nome_arquivo):
+        print(f"Arquivo {nome_arquivo} não encontrado.")
+        return
+
+    cronometro = Cronometro()
+    status, custo, tempo, pivos = reotimizar_instancia(nome_arquivo, args.delta, args.base, args.saida, cronometro)
+
+    print("Problema reotimizado.")
+    print(f"Status: {status}")
+    print(f"Custo total: {custo}")
+    print(f"Pivôs duais: {pivos}")
+    print(f"Tempo de execução: {tempo:.6f} segundos")
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,257 @@
 import numpy as np
-import pandas as pd
 import pulp
 import argparse
-import time
 import os
-import csv
+from helpf import obter_instancia, instancia_existe
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from tReotimizacao import salvar_base_otima
+from collections import deque
 
-def solve_flow_problem(filepath):
-    df = pd.read_csv(filepath, header=None)
+# -----------------------------
+# SIMPLEX DE REDES (FLUXO DE CUSTO MÍNIMO)
+# -----------------------------
+def montar_rede(Oi, Dj, Cost):
+    """
+    Monta o grafo S -> O -> D -> T do modelo restrito como vetores de arcos
+    indexados por inteiros. Nós: S = 0, O_i = 1+i, D_j = 1+m+j, T = 1+m+n.
 
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
+    O limite inferior D_j dos arcos D_j -> T vira balanço (-D_j em D_j e
+    +sum(D) em T) e o arco de retorno T -> S fecha a circulação, de modo que
+    S e T continuam livres como no modelo PuLP.
 
-    Oi = df.iloc[1, :num_ofertas].to_numpy()
-    Dj = df.iloc[2, :num_demandas].to_numpy()
-    Cost = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy()
+    Retorna: n_nos, cauda, cabeca, custo, capacidade, balanco
+    """
+    Oi = np.asarray(Oi, dtype=np.int64)
+    Dj = np.asarray(Dj, dtype=np.int64)
+    Cost = np.asarray(Cost, dtype=np.int64)
+    m, n = Cost.shape
 
-    O = [f"O{i}" for i in range(num_ofertas)]
-    D = [f"D{j}" for j in range(num_demandas)]
-    S = "S"
-    T = "T"
-    NODES = [S] + O + D + [T]
+    S, T = 0, 1 + m + n
+    origens = 1 + np.arange(m, dtype=np.int64)
+    destinos = 1 + m + np.arange(n, dtype=np.int64)
+    infinito = max(int(Oi.sum()), 1)
 
-    costs = {(O[i], D[j]): Cost[i][j] for i in range(num_ofertas) for j in range(num_demandas)}
-    ofertas = {O[i]: Oi[i] for i in range(num_ofertas)}
-    demandas = {D[j]: Dj[j] for j in range(num_demandas)}
+    cauda = np.concatenate([np.full(m, S), np.repeat(origens, n), destinos, [T]]).astype(np.int64)
+    cabeca = np.concatenate([origens, np.tile(destinos, m), np.full(n, T), [S]]).astype(np.int64)
+    custo = np.concatenate([np.zeros(m), Cost.ravel(), np.zeros(n), [0]]).astype(np.int64)
+    capacidade = np.concatenate([Oi, np.full(m * n + n + 1, infinito)]).astype(np.int64)
 
-    edges = [(S, o) for o in O] + [(o, d) for o in O for d in D] + [(d, T) for d in D]
+    balanco = np.zeros(m + n + 2, dtype=np.int64)
+    balanco[destinos] = -Dj
+    balanco[T] = Dj.sum()
 
-    x = pulp.LpVariable.dicts("x", edges, lowBound=0, cat=pulp.LpInteger)
+    return m + n + 2, cauda, cabeca, custo, capacidade, balanco
 
-    prob = pulp.LpProblem("Fluxo_em_Rede", pulp.LpMinimize)
+def simplex_rede(n_nos, cauda, cabeca, custo, capacidade, balanco):
+    """
+    Simplex de redes primal para fluxo de custo mínimo com dados inteiros.
 
-    prob += pulp.lpSum(x[(o, d)] * costs[(o, d)] for (o, d) in costs), "Custo_Total"
+    A base inicial liga cada nó a uma raiz artificial por arcos de custo M
+    (árvore fortemente viável); a precificação é feita em blocos de arcos com
+    NumPy e o arco que sai é o último bloqueante do ciclo a partir do ápice,
+    o que evita ciclagem. Após cada pivô só a subárvore religada é percorrida.
 
-    for n in O + D:
-        inflow = pulp.lpSum(x[(i, n)] for (i, j) in edges if j == n)
-        outflow = pulp.lpSum(x[(n, j)] for (i, j) in edges if i == n)
-        prob += (inflow - outflow == 0), f"Fluxo_Conservado_{n}"
+    Retorna: status ("Optimal" ou "Infeasible"), fluxo nos arcos e potenciais.
+    """
+    n_arcos = len(cauda)
+    raiz = n_nos
+    M = (n_nos + 1) * (int(np.abs(custo).max(initial=0)) + 1)
+    infinito = np.iinfo(np.int64).max >> 2
 
-    for o in O:
-        prob += x[(S, o)] <= ofertas[o], f"Capacidade_Oferta_{o}"
+    nos = np.arange(n_nos, dtype=np.int64)
+    positivo = balanco > 0
+    cauda = np.concatenate([cauda, np.where(positivo, nos, raiz)])
+    cabeca = np.concatenate([cabeca, np.where(positivo, raiz, nos)])
+    custo = np.concatenate([custo, np.full(n_nos, M, dtype=np.int64)])
+    capacidade = np.concatenate([capacidade, np.full(n_nos, infinito, dtype=np.int64)])
+    fluxo = np.concatenate([np.zeros(n_arcos, dtype=np.int64), np.abs(balanco)])
 
-    for d in D:
-        prob += x[(d, T)] >= demandas[d], f"Atende_Demanda_{d}"
+    # estado: 1 = não básico no limite inferior, -1 = no superior, 0 = básico
+    estado = np.ones(n_arcos + n_nos, dtype=np.int8)
+    estado[n_arcos:] = 0
 
-    start = time.time()
-    prob.solve()
-    end = time.time()
+    pai = [raiz] * n_nos + [-1]
+    arco_pai = list(range(n_arcos, n_arcos + n_nos)) + [-1]
+    profundidade = [1] * n_nos + [0]
+    adj = [{n_arcos + v} for v in range(n_nos)] + [set(range(n_arcos, n_arcos + n_nos))]
+    pi = np.concatenate([np.where(positivo, M, -M), [0]]).astype(np.int64)
 
-    status = pulp.LpStatus[prob.status]
-    custo_total = pulp.value(prob.objective)
-    tempo_exec = end - start
+    total = n_arcos + n_nos
+    tam_bloco = max(1, int(np.ceil(np.sqrt(total))))
+    n_blocos = (total + tam_bloco - 1) // tam_bloco
+    bloco_atual = 0
+
+    while True:
+        entrada = None
+        for k in range(n_blocos):
+            b = (bloco_atual + k) % n_blocos
+            ini, fim = b * tam_bloco, min((b + 1) * tam_bloco, total)
+            violacao = estado[ini:fim] * (custo[ini:fim] - pi[cauda[ini:fim]] + pi[cabeca[ini:fim]])
+            pos = int(np.argmin(violacao))
+            if violacao[pos] < 0:
+                entrada = ini + pos
+                bloco_atual = b
+                break
+        if entrada is None:
+            break
+
+        aumenta = estado[entrada] == 1
+        primeiro, ultimo = (int(cauda[entrada]), int(cabeca[entrada])) if aumenta \
+            else (int(cabeca[entrada]), int(cauda[entrada]))
+
+        a, b = primeiro, ultimo
+        caminho_primeiro, caminho_ultimo = [], []
+        while a != b:
+            if profundidade[a] >= profundidade[b]:
+                caminho_primeiro.append(a)
+                a = pai[a]
+            else:
+                caminho_ultimo.append(b)
+                b = pai[b]
+
+        # Ciclo no sentido do envio: ápice -> primeiro -> (entrada) -> ultimo -> ápice
+        ciclo = []
+        for w in reversed(caminho_primeiro):
+            e = arco_pai[w]
+            ciclo.append((e, int(cabeca[e]) == w, w))
+        ciclo.append((entrada, aumenta, None))
+        for w in caminho_ultimo:
+            e = arco_pai[w]
+            ciclo.append((e, int(cauda[e]) == w, w))
+
+        delta, saida = None, None
+        for pos, (e, direto, _) in enumerate(ciclo):
+            residual = int(capacidade[e] - fluxo[e]) if direto else int(fluxo[e])
+            if delta is None or residual <= delta:
+                delta, saida = residual, pos
+
+        if delta > 0:
+            for e, direto, _ in ciclo:
+                fluxo[e] += delta if direto else -delta
+
+        e_saida, direto_saida, w_saida = ciclo[saida]
+        if e_saida == entrada:
+            estado[entrada] = -estado[entrada]
+            continue
+
+        estado[entrada] = 0
+        estado[e_saida] = -1 if direto_saida else 1
+
+        # Troca de base: a subárvore de w_saida é religada pelo arco de entrada
+        pai_saida = pai[w_saida]
+        adj[w_saida].discard(e_saida)
+        adj[pai_saida].discard(e_saida)
+        adj[primeiro].add(entrada)
+        adj[ultimo].add(entrada)
+
+        x, y = (primeiro, ultimo) if saida < len(caminho_primeiro) else (ultimo, primeiro)
+        pai[x] = y
+        arco_pai[x] = entrada
+        profundidade[x] = profundidade[y] + 1
+        pi[x] = custo[entrada] + pi[y] if int(cauda[entrada]) == x else pi[y] - custo[entrada]
+
+        fila = deque([x])
+        while fila:
+            a = fila.popleft()
+            for e in adj[a]:
+                if e == arco_pai[a]:
+                    continue
+                t, h = int(cauda[e]), int(cabeca[e])
+                b = h if t == a else t
+                pai[b] = a
+                arco_pai[b] = e
+                profundidade[b] = profundidade[a] + 1
+                pi[b] = custo[e] + pi[a] if t == b else pi[a] - custo[e]
+                fila.append(b)
+
+    status = "Infeasible" if fluxo[n_arcos:].any() else "Optimal"
+    return status, fluxo[:n_arcos], pi[:n_nos]
+
+def solve_flow_netsimplex(Oi, Dj, Cost, cronometro=None, arquivo_base=None):
+    """Com arquivo_base (caminho da instância), grava a base ótima para o tReotimizacao."""
+    cronometro = cronometro or Cronometro()
+    with cronometro.fase("montagem"):
+        n_nos, cauda, cabeca, custo, capacidade, balanco = montar_rede(Oi, Dj, Cost)
+
+    with cronometro.fase("solver"):
+        status, fluxo, _ = simplex_rede(n_nos, cauda, cabeca, custo, capacidade, balanco)
+
+    with cronometro.fase("extracao"):
+        custo_total = int(fluxo @ custo) if status == "Optimal" else None
+
+    if arquivo_base is not None and status == "Optimal":
+        m, n = np.shape(Cost)
+        with cronometro.fase("escrita"):
+            salvar_base_otima(arquivo_base, Oi, Dj, Cost, fluxo[m:m + m * n].reshape(m, n))
+    return status, custo_total, cronometro.segundos("solver")
+
+def solve_flow_problem(instancia, backend="pulp", cronometro=None, salvar_base=False, tempo_limite=None):
+    """tempo_limite (segundos) vale para o CBC do backend pulp; o netsimplex não tem limite."""
+    cronometro = cronometro or Cronometro()
+    Oi, Dj, Cost = obter_instancia(instancia, cronometro)
+    num_ofertas, num_demandas = Cost.shape
+
+    if backend == "netsimplex":
+        return solve_flow_netsimplex(Oi, Dj, Cost, cronometro=cronometro,
+                                     arquivo_base=instancia if salvar_base else None)
+    if backend != "pulp":
+        raise ValueError(f"Backend desconhecido: {backend}")
+
+    with cronometro.fase("montagem"):
+        O = [f"O{i}" for i in range(num_ofertas)]
+        D = [f"D{j}" for j in range(num_demandas)]
+        S = "S"
+        T = "T"
+        NODES = [S] + O + D + [T]
+
+        costs = {(O[i], D[j]): Cost[i][j] for i in range(num_ofertas) for j in range(num_demandas)}
+        ofertas = {O[i]: Oi[i] for i in range(num_ofertas)}
+        demandas = {D[j]: Dj[j] for j in range(num_demandas)}
+
+        edges = [(S, o) for o in O] + [(o, d) for o in O for d in D] + [(d, T) for d in D]
+
+        x = pulp.LpVariable.dicts("x", edges, lowBound=0, cat=pulp.LpInteger)
+
+        prob = pulp.LpProblem("Fluxo_em_Rede", pulp.LpMinimize)
+
+        prob += pulp.lpSum(x[(o, d)] * costs[(o, d)] for (o, d) in costs), "Custo_Total"
+
+        for n in O + D:
+            inflow = pulp.lpSum(x[(i, n)] for (i, j) in edges if j == n)
+            outflow = pulp.lpSum(x[(n, j)] for (i, j) in edges if i == n)
+            prob += (inflow - outflow == 0), f"Fluxo_Conservado_{n}"
+
+        for o in O:
+            prob += x[(S, o)] <= ofertas[o], f"Capacidade_Oferta_{o}"
+
+        for d in D:
+            prob += x[(d, T)] >= demandas[d], f"Atende_Demanda_{d}"
+
+    with cronometro.fase("solver"):
+        prob.solve(pulp.PULP_CBC_CMD(timeLimit=tempo_limite))
+
+    with cronometro.fase("extracao"):
+        status = pulp.LpStatus[prob.status]
+        custo_total = pulp.value(prob.objective)
+    tempo_exec = cronometro.segundos("solver")
+
+    if salvar_base and status == "Optimal":
+        with cronometro.fase("escrita"):
+            alocacao = np.array([[x[(o, d)].varValue for d in D] for o in O], dtype=float)
+            salvar_base_otima(instancia, Oi, Dj, Cost, alocacao)
 
     return status, custo_total, tempo_exec
 
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, backend="pulp", fases=None):
 
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
+    if backend != "pulp":
+        codigo = f"{codigo}_{backend}"
 
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/")
-    csv_path = csv_path + f"_resultado.csv"
-
-    escrever_cabecalho = not os.path.exists(csv_path)
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de fluxo em rede equivalente ao problema de transporte.")
@@ -80,15 +260,22 @@ def main():
     parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo (padrão: 1)")
     parser.add_argument("--max_val", type=int, default=100, help="Valor máximo (padrão: 100)")
     parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--backend", type=str, default="pulp", choices=["pulp", "netsimplex"],
+                        help="Resolvedor do fluxo em rede (padrão: pulp)")
+    parser.add_argument("--tempo_limite", type=float, default=None, help="Tempo limite do CBC em segundos")
+    parser.add_argument("--salvar_base", action="store_true",
+                        help="Grava a base ótima (solutions/<instância>_base.npz) para o tReotimizacao")
     args = parser.parse_args()
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    status, custo, tempo = solve_flow_problem(nome_arquivo)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    status, custo, tempo = solve_flow_problem(nome_arquivo, backend=args.backend, cronometro=cronometro,
+                                              salvar_base=args.salvar_base, tempo_limite=args.tempo_limite)
+    salvar_resultado(nome_arquivo, status, custo, tempo, backend=args.backend, fases=cronometro.fases())
 
     print("Problema resolvido.")
     print(f"Status: {status}")
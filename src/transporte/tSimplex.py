@@ -0,0 +1,295 @@
+import numpy as np
+import argparse
+import os
+from helpf import obter_instancia, instancia_existe
+from resultados import gravar_resultado
+from cronometro import Cronometro
+from collections import deque
+
+from tCantoNoroeste import canto_noroeste
+from tVogel import vogel_method
+from tGuloso import metodo_guloso
+
+# Pivôs degenerados seguidos (por nó da árvore) antes de passar à regra de Bland
+LIMITE_DEGENERADOS = 1
+
+SOLUCOES_INICIAIS = {
+    "noroeste": canto_noroeste,
+    "vogel": lambda supply, demand, costs: vogel_method(supply, demand, costs, engine="incremental"),
+    "guloso": metodo_guloso,
+}
+
+# -----------------------------
+# BASE (ÁRVORE GERADORA)
+# -----------------------------
+# Nós 0..m-1 são as origens e m..m+n-1 os destinos. Cada célula básica (i, j)
+# é uma aresta entre o nó i e o nó m+j; a base é mantida como árvore enraizada
+# na origem 0, com pai/profundidade por nó e listas de adjacência.
+
+def completar_base(alocacao):
+    """
+    Transforma as células positivas de uma solução inicial (uma floresta) em
+    uma árvore geradora com m+n-1 células, acrescentando células degeneradas
+    (fluxo zero) que ligam as componentes.
+    """
+    m, n = alocacao.shape
+    pai_uf = list(range(m + n))
+
+    def achar(v):
+        while pai_uf[v] != v:
+            pai_uf[v] = pai_uf[pai_uf[v]]
+            v = pai_uf[v]
+        return v
+
+    base = []
+    for i, j in zip(*np.nonzero(alocacao)):
+        i, j = int(i), int(j)
+        ri, rj = achar(i), achar(m + j)
+        if ri == rj:
+            raise ValueError("Solução inicial contém ciclo; não é uma solução básica.")
+        pai_uf[ri] = rj
+        base.append((i, j))
+
+    # Garante que a componente da origem 0 tenha ao menos um destino
+    if all(achar(m + j) != achar(0) for j in range(n)):
+        pai_uf[achar(m)] = achar(0)
+        base.append((0, 0))
+
+    linha_ref = 0
+    coluna_ref = next(j for j in range(n) if achar(m + j) == achar(0))
+    for v in range(m + n):
+        if achar(v) == achar(0):
+            continue
+        if v < m:
+            base.append((v, coluna_ref))
+        else:
+            base.append((linha_ref, v - m))
+        pai_uf[achar(v)] = achar(0)
+
+    return base
+
+def _percorrer(raiz, adj, pai, profundidade, u, v, custos, m):
+    """
+    BFS a partir de raiz (sem voltar ao seu pai), atualizando pai,
+    profundidade e potenciais de todos os nós alcançados.
+    """
+    fila = deque([raiz])
+    while fila:
+        a = fila.popleft()
+        for b in adj[a]:
+            if b == pai[a]:
+                continue
+            pai[b] = a
+            profundidade[b] = profundidade[a] + 1
+            if a < m:
+                v[b - m] = custos[a, b - m] - u[a]
+            else:
+                u[b] = custos[b, a - m] - v[a - m]
+            fila.append(b)
+
+# -----------------------------
+# SIMPLEX DE TRANSPORTE (MODI)
+# -----------------------------
+def simplex_transporte(supply, demand, costs, inicial="vogel", max_iter=None, alocacao_inicial=None):
+    """
+    Resolve o problema de transporte balanceado pelo método u-v (MODI).
+
+    A precificação é parcial (blocos de linhas em rodízio). Contra ciclagem,
+    depois de LIMITE_DEGENERADOS * (m + n) pivôs degenerados seguidos vale a
+    regra de Bland (entra a primeira célula com custo reduzido negativo e,
+    nos empates da saída, sai a de menor índice) até o próximo pivô não
+    degenerado. Como Bland não cicla, a sequência degenerada termina e o
+    custo volta a cair; o número de bases é finito.
+
+    Parâmetros:
+    - supply, demand: vetores de oferta e demanda com mesma soma
+    - costs: matriz de custos (m x n)
+    - inicial: heurística da solução básica inicial ("noroeste", "vogel", "guloso")
+    - max_iter: limite opcional de pivoteamentos
+    - alocacao_inicial: solução viável (m x n) sem ciclos nas células positivas,
+      usada no lugar da heurística (ex.: base salva de uma execução anterior)
+
+    Retorna:
+    - alocacao: matriz (m x n) ótima
+    - base: lista de células básicas (i, j)
+    - u, v: potenciais duais das linhas e colunas
+    """
+    supply = np.asarray(supply)
+    demand = np.asarray(demand)
+    costs = np.asarray(costs)
+    m, n = costs.shape
+
+    inteiro = all(np.issubdtype(x.dtype, np.integer) for x in (supply, demand, costs))
+    dtype = np.int64 if inteiro else float
+    tol = 0 if inteiro else 1e-9
+    custos = costs.astype(dtype)
+
+    if alocacao_inicial is None:
+        alocacao = np.asarray(SOLUCOES_INICIAIS[inicial](supply.copy(), demand.copy(), costs))
+    else:
+        alocacao = np.asarray(alocacao_inicial)
+    if inteiro:
+        alocacao = np.rint(alocacao).astype(np.int64)
+
+    base = completar_base(alocacao)
+    fluxo = {(i, j): alocacao[i, j].item() for i, j in base}
+
+    adj = [set() for _ in range(m + n)]
+    for i, j in base:
+        adj[i].add(m + j)
+        adj[m + j].add(i)
+
+    pai = [-1] * (m + n)
+    profundidade = [0] * (m + n)
+    u = np.zeros(m, dtype=dtype)
+    v = np.zeros(n, dtype=dtype)
+    _percorrer(0, adj, pai, profundidade, u, v, custos, m)
+
+    # Precificação parcial: blocos de linhas percorridos de forma circular
+    tam_bloco = max(1, int(np.ceil(np.sqrt(m))))
+    blocos = [(ini, min(ini + tam_bloco, m)) for ini in range(0, m, tam_bloco)]
+    bloco_atual = 0
+    iteracoes = 0
+    degenerados = 0
+
+    while max_iter is None or iteracoes < max_iter:
+        bland = degenerados >= LIMITE_DEGENERADOS * (m + n)
+        entrada = None
+        for k in range(len(blocos)):
+            b = k if bland else (bloco_atual + k) % len(blocos)
+            ini, fim = blocos[b]
+            reduzidos = custos[ini:fim] - u[ini:fim, None] - v[None, :]
+            pos = int(np.argmax(reduzidos < -tol)) if bland else int(np.argmin(reduzidos))
+            if reduzidos.flat[pos] < -tol:
+                entrada = (ini + pos // n, pos % n)
+                bloco_atual = b
+                break
+        if entrada is None:
+            break
+
+        p, q = entrada
+        # Ciclo: caminhos de p e de m+q até o ancestral comum
+        a, b = p, m + q
+        caminho_p, caminho_q = [], []
+        while a != b:
+            if profundidade[a] >= profundidade[b]:
+                caminho_p.append(a)
+                a = pai[a]
+            else:
+                caminho_q.append(b)
+                b = pai[b]
+
+        def celula(w):
+            return (w, pai[w] - m) if w < m else (pai[w], w - m)
+
+        # Arestas em posições pares (a partir de cada ponta) perdem theta
+        saida, theta = None, None
+        for caminho in (caminho_p, caminho_q):
+            for w in caminho[0::2]:
+                x = fluxo[celula(w)]
+                if theta is None or x < theta or (bland and x == theta and celula(w) < celula(saida)):
+                    saida, theta = w, x
+        degenerados = degenerados + 1 if theta <= tol else 0
+
+        for caminho in (caminho_p, caminho_q):
+            for k, w in enumerate(caminho):
+                fluxo[celula(w)] += -theta if k % 2 == 0 else theta
+
+        # Troca de base: remove a aresta saida-pai[saida] e insere (p, q)
+        i_s, j_s = celula(saida)
+        del fluxo[(i_s, j_s)]
+        pai_saida = pai[saida]
+        adj[saida].discard(pai_saida)
+        adj[pai_saida].discard(saida)
+        fluxo[(p, q)] = theta
+        adj[p].add(m + q)
+        adj[m + q].add(p)
+
+        # A subárvore de 'saida' é religada pela aresta de entrada
+        x, y = (p, m + q) if saida in caminho_p else (m + q, p)
+        pai[x] = y
+        profundidade[x] = profundidade[y] + 1
+        if x < m:
+            u[x] = custos[x, y - m] - v[y - m]
+        else:
+            v[x - m] = custos[y, x - m] - u[y]
+        _percorrer(x, adj, pai, profundidade, u, v, custos, m)
+
+        iteracoes += 1
+
+    alocacao = np.zeros((m, n), dtype=dtype)
+    for (i, j), x in fluxo.items():
+        alocacao[i, j] = x
+
+    return alocacao, list(fluxo.keys()), u, v
+
+def resolver_transporte(supply, demand, costs, inicial="vogel", max_iter=None, cronometro=None):
+    """
+    Resolve o problema desbalanceado (oferta <= O_i, demanda >= D_j)
+    acrescentando um destino fictício de custo zero com a sobra de oferta.
+    Retorna status, alocacao (m x n, sem a coluna fictícia) e custo total.
+    """
+    cronometro = cronometro or Cronometro()
+    with cronometro.fase("montagem"):
+        supply = np.asarray(supply)
+        demand = np.asarray(demand)
+        costs = np.asarray(costs)
+
+        sobra = supply.sum() - demand.sum()
+        if sobra < 0:
+            return "Infeasible", None, None
+
+        demanda_ext = np.append(demand, sobra)
+        custos_ext = np.hstack([costs, np.zeros((costs.shape[0], 1), dtype=costs.dtype)])
+
+    with cronometro.fase("solver"):
+        alocacao, _, _, _ = simplex_transporte(supply, demanda_ext, custos_ext, inicial, max_iter)
+    with cronometro.fase("extracao"):
+        alocacao = alocacao[:, :-1]
+        custo_total = alocacao.ravel() @ costs.ravel()
+
+    return "Optimal", alocacao, custo_total.item()
+
+def solve_transport_simplex(instancia, inicial="vogel", cronometro=None):
+    cronometro = cronometro or Cronometro()
+    supply, demand, costs = obter_instancia(instancia, cronometro)
+
+    status, allocation, total_cost = resolver_transporte(supply, demand, costs, inicial, cronometro=cronometro)
+    tempo_exec = cronometro.segundos("montagem", "solver", "extracao")
+
+    return status, total_cost, tempo_exec
+
+def salvar_resultado(filepath, status, custo, tempo, inicial="vogel", fases=None):
+    script_path = __file__
+    script_name = os.path.basename(script_path)
+    codigo = f"{os.path.splitext(script_name)[0]}_{inicial}"
+
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve problema de transporte pelo simplex de transporte (método u-v).")
+    parser.add_argument("i", type=int, help="Número de ofertas")
+    parser.add_argument("j", type=int, help="Número de demandas")
+    parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo dos custos/ofertas (padrão: 1)")
+    parser.add_argument("--max_val", type=int, default=100, help="Valor máximo dos custos/ofertas (padrão: 100)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--inicial", type=str, default="vogel", choices=sorted(SOLUCOES_INICIAIS),
+                        help="Heurística da solução básica inicial (padrão: vogel)")
+    args = parser.parse_args()
+
+    nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
+    if not instancia_existe(nome_arquivo):
+        print(f"Arquivo {nome_arquivo} não encontrado.")
+        return
+
+    cronometro = Cronometro()
+    status, custo, tempo = solve_transport_simplex(nome_arquivo, inicial=args.inicial, cronometro=cronometro)
+    salvar_resultado(nome_arquivo, status, custo, tempo, inicial=args.inicial, fases=cronometro.fases())
+
+    print("Problema resolvido.")
+    print(f"Status: {status}")
+    print(f"Custo total: {custo}")
+    print(f"Tempo de execução: {tempo:.6f} segundos")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
 import numpy as np
-import pandas as pd
 import argparse
-import time
 import os
-import csv
+import scipy.sparse as sp
+from helpf import obter_instancia, instancia_existe, nome_instancia_esparsa, arcos
+from resultados import gravar_resultado
+from cronometro import Cronometro
 
 
-def vogel_method(supply, demand, costs):
+def vogel_method(supply, demand, costs, engine="referencia"):
+    """
+    Método de aproximação de Vogel (VAM).
+
+    Parâmetros:
+    - supply, demand: vetores de oferta e demanda
+    - costs: matriz de custos (m x n)
+    - engine: "referencia" recalcula todas as penalidades a cada iteração;
+      "incremental" mantém os dois menores custos vivos de cada linha/coluna
+      e atualiza apenas as linhas afetadas. Ambos retornam a mesma alocação.
+    """
+    if engine == "incremental":
+        return vogel_incremental(supply, demand, costs)
+    if engine != "referencia":
+        raise ValueError(f"Engine desconhecida para o método de Vogel: {engine}")
+
     supply = np.array(supply, dtype=float)
     demand = np.array(demand, dtype=float)
     costs = np.array(costs, dtype=float)
@@ -67,47 +83,277 @@ def vogel_method(supply, demand, costs):
 
     return allocation
 
-def calcular_custo_total(allocation, costs):
-    return int(np.sum(allocation * costs))
+def _proximo_vivo(ordem, k, vivo):
+    n = len(ordem)
+    while k < n and not vivo[ordem[k]]:
+        k += 1
+    return k
+
+def _atualizar_penalidade(idx, ordem, p1, p2, topo1, topo2, penalidade, vivo, custos):
+    """
+    Avança os ponteiros da linha (ou coluna) idx até as duas menores entradas
+    ainda vivas e recalcula sua penalidade.
+    """
+    n = ordem.shape[1]
+    k1 = _proximo_vivo(ordem[idx], p1[idx], vivo)
+    k2 = _proximo_vivo(ordem[idx], max(p2[idx], k1 + 1), vivo)
+    p1[idx], p2[idx] = k1, k2
+
+    if k1 >= n:
+        topo1[idx] = topo2[idx] = -1
+        penalidade[idx] = -np.inf
+    elif k2 >= n:
+        topo1[idx], topo2[idx] = ordem[idx, k1], -1
+        penalidade[idx] = custos[idx, topo1[idx]]
+    else:
+        topo1[idx], topo2[idx] = ordem[idx, k1], ordem[idx, k2]
+        penalidade[idx] = custos[idx, topo2[idx]] - custos[idx, topo1[idx]]
+
+def vogel_incremental(supply, demand, costs):
+    """
+    Vogel com penalidades incrementais.
+
+    Cada linha guarda a ordem de suas colunas por custo e dois ponteiros para
+    as duas colunas vivas mais baratas (idem para as colunas). Quando uma
+    linha ou coluna é fechada, só as linhas/colunas cujo par de menores custos
+    a continha são atualizadas. Os desempates seguem a implementação de
+    referência (menor índice), então a alocação é idêntica.
+    """
+    supply = np.array(supply, dtype=float)
+    demand = np.array(demand, dtype=float)
+    costs = np.array(costs, dtype=float)
+    m, n = costs.shape
+    costs_t = np.ascontiguousarray(costs.T)
+
+    allocation = np.zeros((m, n), dtype=float)
+
+    # Ordenação estável: empates de custo resolvidos pelo menor índice
+    ordem_linhas = np.argsort(costs, axis=1, kind="stable")
+    ordem_colunas = np.argsort(costs_t, axis=1, kind="stable")
+
+    # Vivas: ainda abertas e com oferta/demanda positiva
+    linha_viva = supply > 0
+    coluna_viva = demand > 0
+
+    lin_p1 = np.zeros(m, dtype=np.int64)
+    lin_p2 = np.zeros(m, dtype=np.int64)
+    lin_topo1 = np.full(m, -1, dtype=np.int64)
+    lin_topo2 = np.full(m, -1, dtype=np.int64)
+    pen_linhas = np.full(m, -np.inf)
+
+    col_p1 = np.zeros(n, dtype=np.int64)
+    col_p2 = np.zeros(n, dtype=np.int64)
+    col_topo1 = np.full(n, -1, dtype=np.int64)
+    col_topo2 = np.full(n, -1, dtype=np.int64)
+    pen_colunas = np.full(n, -np.inf)
+
+    for i in range(m):
+        _atualizar_penalidade(i, ordem_linhas, lin_p1, lin_p2, lin_topo1, lin_topo2,
+                              pen_linhas, coluna_viva, costs)
+    for j in range(n):
+        _atualizar_penalidade(j, ordem_colunas, col_p1, col_p2, col_topo1, col_topo2,
+                              pen_colunas, linha_viva, costs_t)
+
+    linhas_abertas = m
+    colunas_abertas = n
+
+    while linhas_abertas > 0 and colunas_abertas > 0:
+        max_linha = pen_linhas.max()
+        max_coluna = pen_colunas.max()
+        if max_linha == -np.inf and max_coluna == -np.inf:
+            break
+
+        if max_linha >= max_coluna:
+            i = int(np.argmax(pen_linhas))
+            j = int(lin_topo1[i])
+        else:
+            j = int(np.argmax(pen_colunas))
+            i = int(col_topo1[j])
+
+        qty = min(supply[i], demand[j])
+        allocation[i, j] = qty
+        supply[i] -= qty
+        demand[j] -= qty
+
+        if supply[i] <= 0:
+            linhas_abertas -= 1
+            linha_viva[i] = False
+            pen_linhas[i] = -np.inf
+            lin_topo1[i] = lin_topo2[i] = -1
+            afetadas = np.flatnonzero((col_topo1 == i) | (col_topo2 == i))
+            for jj in afetadas:
+                _atualizar_penalidade(jj, ordem_colunas, col_p1, col_p2, col_topo1, col_topo2,
+                                      pen_colunas, linha_viva, costs_t)
+
+        if demand[j] <= 0:
+            colunas_abertas -= 1
+            coluna_viva[j] = False
+            pen_colunas[j] = -np.inf
+            col_topo1[j] = col_topo2[j] = -1
+            afetadas = np.flatnonzero((lin_topo1 == j) | (lin_topo2 == j))
+            for ii in afetadas:
+                _atualizar_penalidade(ii, ordem_linhas, lin_p1, lin_p2, lin_topo1, lin_topo2,
+                                      pen_linhas, coluna_viva, costs)
 
-def solve_transport_vogel(filepath):
-    df = pd.read_csv(filepath, header=None)
+    return allocation
+
+def _atualizar_penalidade_esparsa(idx, ordem, inicio, outro, p1, p2, topo1, topo2, arco1, penalidade, vivo,
+                                  valores):
+    """
+    Como _atualizar_penalidade, mas a lista da linha (ou coluna) idx são só
+    os seus arcos: ordem[inicio[idx]:inicio[idx+1]], ordenados por custo.
+    """
+    fim = inicio[idx + 1]
+    k1 = p1[idx]
+    while k1 < fim and not vivo[outro[ordem[k1]]]:
+        k1 += 1
+    k2 = max(p2[idx], k1 + 1)
+    while k2 < fim and not vivo[outro[ordem[k2]]]:
+        k2 += 1
+    p1[idx], p2[idx] = k1, k2
+
+    if k1 >= fim:
+        topo1[idx] = topo2[idx] = arco1[idx] = -1
+        penalidade[idx] = -np.inf
+    elif k2 >= fim:
+        arco1[idx] = ordem[k1]
+        topo1[idx], topo2[idx] = outro[arco1[idx]], -1
+        penalidade[idx] = valores[arco1[idx]]
+    else:
+        arco1[idx] = ordem[k1]
+        topo1[idx], topo2[idx] = outro[arco1[idx]], outro[ordem[k2]]
+        penalidade[idx] = valores[ordem[k2]] - valores[arco1[idx]]
+
+def vogel_esparso(supply, demand, custos):
+    """
+    Vogel incremental numa instância esparsa (custos em CSR): as penalidades
+    consideram só os arcos permitidos de cada linha/coluna. Com todos os arcos
+    presentes a alocação é a mesma de vogel_incremental. Retorna a alocação
+    como CSR com a mesma estrutura de custos.
+    """
+    supply = np.array(supply, dtype=float)
+    demand = np.array(demand, dtype=float)
+    m, n = custos.shape
+    linhas, colunas, valores = arcos(custos)
+    valores = valores.astype(float)
+    quantidades = np.zeros(custos.nnz, dtype=float)
+
+    # Arcos de cada linha (e de cada coluna) por custo; empates pelo menor índice
+    ordem_linhas = np.lexsort((colunas, valores, linhas))
+    ordem_colunas = np.lexsort((linhas, valores, colunas))
+    inicio_linhas = custos.indptr
+    inicio_colunas = np.concatenate([[0], np.cumsum(np.bincount(colunas, minlength=n))])
+
+    linha_viva = supply > 0
+    coluna_viva = demand > 0
+
+    lin_p1 = inicio_linhas[:-1].astype(np.int64)
+    lin_p2 = lin_p1.copy()
+    lin_topo1 = np.full(m, -1, dtype=np.int64)
+    lin_topo2 = np.full(m, -1, dtype=np.int64)
+    lin_arco1 = np.full(m, -1, dtype=np.int64)
+    pen_linhas = np.full(m, -np.inf)
 
-    num_ofertas = int(df.iloc[0, 0])
-    num_demandas = int(df.iloc[0, 1])
+    col_p1 = inicio_colunas[:-1].astype(np.int64)
+    col_p2 = col_p1.copy()
+    col_topo1 = np.full(n, -1, dtype=np.int64)
+    col_topo2 = np.full(n, -1, dtype=np.int64)
+    col_arco1 = np.full(n, -1, dtype=np.int64)
+    pen_colunas = np.full(n, -np.inf)
 
-    supply = df.iloc[1, :num_ofertas].to_numpy(dtype=int)
-    demand = df.iloc[2, :num_demandas].to_numpy(dtype=int)
-    costs = df.iloc[3:3+num_ofertas, :num_demandas].to_numpy(dtype=int)
+    def atualizar_linha(i):
+        _atualizar_penalidade_esparsa(i, ordem_linhas, inicio_linhas, colunas, lin_p1, lin_p2, lin_topo1,
+                                      lin_topo2, lin_arco1, pen_linhas, coluna_viva, valores)
 
-    assert costs.shape == (num_ofertas, num_demandas), "Erro na dimensão da matriz de custos"
+    def atualizar_coluna(j):
+        _atualizar_penalidade_esparsa(j, ordem_colunas, inicio_colunas, linhas, col_p1, col_p2, col_topo1,
+                                      col_topo2, col_arco1, pen_colunas, linha_viva, valores)
 
-    start = time.time()
-    allocation = vogel_method(supply, demand, costs)
-    total_cost = calcular_custo_total(allocation, costs)
-    end = time.time()
+    for i in range(m):
+        atualizar_linha(i)
+    for j in range(n):
+        atualizar_coluna(j)
+
+    linhas_abertas = m
+    colunas_abertas = n
+
+    while linhas_abertas > 0 and colunas_abertas > 0:
+        max_linha = pen_linhas.max(initial=-np.inf)
+        max_coluna = pen_colunas.max(initial=-np.inf)
+        if max_linha == -np.inf and max_coluna == -np.inf:
+            break
+
+        if max_linha >= max_coluna:
+            i = int(np.argmax(pen_linhas))
+            k = int(lin_arco1[i])
+        else:
+            j = int(np.argmax(pen_colunas))
+            k = int(col_arco1[j])
+        i, j = int(linhas[k]), int(colunas[k])
+
+        qty = min(supply[i], demand[j])
+        quantidades[k] = qty
+        supply[i] -= qty
+        demand[j] -= qty
+
+        if supply[i] <= 0:
+            linhas_abertas -= 1
+            linha_viva[i] = False
+            pen_linhas[i] = -np.inf
+            lin_topo1[i] = lin_topo2[i] = lin_arco1[i] = -1
+            for jj in np.flatnonzero((col_topo1 == i) | (col_topo2 == i)):
+                atualizar_coluna(jj)
+
+        if demand[j] <= 0:
+            colunas_abertas -= 1
+            coluna_viva[j] = False
+            pen_colunas[j] = -np.inf
+            col_topo1[j] = col_topo2[j] = col_arco1[j] = -1
+            for ii in np.flatnonzero((lin_topo1 == j) | (lin_topo2 == j)):
+                atualizar_linha(ii)
+
+    return sp.csr_matrix((quantidades, custos.indices, custos.indptr), shape=custos.shape)
+
+def demanda_atendida(allocation, demand):
+    return bool(np.all(np.asarray(allocation.sum(axis=0)).ravel() >= np.asarray(demand)))
+
+def calcular_custo_total(allocation, costs):
+    if sp.issparse(costs):
+        return int(allocation.data @ costs.data)
+    return int(np.sum(allocation * costs))
+
+def solve_transport_vogel(instancia, engine="referencia", cronometro=None):
+    cronometro = cronometro or Cronometro()
+    supply, demand, costs = obter_instancia(instancia, cronometro)
+
+    if sp.issparse(costs) and engine != "incremental":
+        # O resultado é gravado com o código da engine: não dá para trocá-la em silêncio
+        raise ValueError(f"Instância esparsa: só a engine incremental tem variante esparsa (engine={engine})")
+
+    with cronometro.fase("solver"):
+        if sp.issparse(costs):
+            allocation = vogel_esparso(supply, demand, costs)
+        else:
+            allocation = vogel_method(supply, demand, costs, engine=engine)
+    with cronometro.fase("extracao"):
+        total_cost = calcular_custo_total(allocation, costs)
 
     status = "aproximada"
-    tempo_exec = end - start
+    if sp.issparse(costs) and not demanda_atendida(allocation, demand):
+        # Com rotas proibidas a heurística pode terminar sem atender toda a demanda
+        status = "falha"
+    tempo_exec = cronometro.segundos("solver", "extracao")
 
     return status, total_cost, tempo_exec
 
-def salvar_resultado(filepath, status, custo, tempo):
+def salvar_resultado(filepath, status, custo, tempo, engine="referencia", fases=None):
     script_path = __file__
     script_name = os.path.basename(script_path)
     codigo = os.path.splitext(script_name)[0]
+    if engine != "referencia":
+        codigo = f"{codigo}_{engine}"
 
-    os.makedirs("solutions", exist_ok=True)
-    csv_path = filepath.replace("instancias/", "solutions/")
-    csv_path = csv_path + f"_resultado.csv"
-
-    escrever_cabecalho = not os.path.exists(csv_path)
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if escrever_cabecalho:
-            writer.writerow(["status", "custo", "tempo_execucao", "codigo"])
-        writer.writerow([status, custo, f"{tempo:.6f}", codigo])
+    gravar_resultado(filepath, codigo, status, custo, tempo, fases)
 
 def main():
     parser = argparse.ArgumentParser(description="Resolve problema de transporte pelo método de Vogel.")
@@ -116,15 +362,24 @@ def main():
     parser.add_argument("--min_val", type=int, default=1, help="Valor mínimo dos custos/ofertas (padrão: 1)")
     parser.add_argument("--max_val", type=int, default=100, help="Valor máximo dos custos/ofertas (padrão: 100)")
     parser.add_argument("--seed", type=int, default=42, help="Semente aleatória (padrão: 42)")
+    parser.add_argument("--engine", type=str, default=None, choices=["referencia", "incremental"],
+                        help="Implementação do método de Vogel (padrão: referencia; incremental com --densidade)")
+    parser.add_argument("--densidade", type=float, default=None,
+                        help="Usa a instância esparsa (rotas proibidas) com esta densidade")
     args = parser.parse_args()
+    if args.engine is None:
+        args.engine = "incremental" if args.densidade is not None else "referencia"
 
     nome_arquivo = f"instancias/problema_{args.i}x{args.j}_[{args.min_val},{args.max_val}]_seed{args.seed}"
-    if not os.path.exists(nome_arquivo):
+    if args.densidade is not None:
+        nome_arquivo = nome_instancia_esparsa(args.i, args.j, args.densidade, args.min_val, args.max_val, args.seed)
+    if not instancia_existe(nome_arquivo):
         print(f"Arquivo {nome_arquivo} não encontrado.")
         return
 
-    status, custo, tempo = solve_transport_vogel(nome_arquivo)
-    salvar_resultado(nome_arquivo, status, custo, tempo)
+    cronometro = Cronometro()
+    status, custo, tempo = solve_transport_vogel(nome_arquivo, engine=args.engine, cronometro=cronometro)
+    salvar_resultado(nome_arquivo, status, custo, tempo, engine=args.engine, fases=cronometro.fases())
 
     print("Problema resolvido.")
     print(f"Status: {status}")
@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+from campanha import executar_campanha, VARIAVEIS_THREADS
+
+def ambiente_inicial(var):
+    """Valor da variável no ambiente com que o processo foi iniciado (antes de qualquer import)."""
+    with open("/proc/self/environ", "rb") as f:
+        for item in f.read().split(b"\0"):
+            nome, _, valor = item.partition(b"=")
+            if nome.decode() == var:
+                return valor.decode()
+    return None
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="usa /proc/self/environ")
+def test_trabalhador_inicia_com_limite_de_threads(monkeypatch):
+    for var in VARIAVEIS_THREADS:
+        monkeypatch.delenv(var, raising=False)
+    concluidas = executar_campanha([("OMP_NUM_THREADS",), ("OPENBLAS_NUM_THREADS",)], ambiente_inicial,
+                                   concorrencia=1, threads_solver=3)
+    assert sorted(resultado for _, resultado, _ in concluidas) == ["3", "3"]
+    # O ambiente do processo principal é restaurado
+    assert all(var not in os.environ for var in VARIAVEIS_THREADS)
@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+# src/ensalamento e src/transporte são pastas de scripts (sem pacote Python)
+# com módulos de mesmo nome (helpf, resultados, cronometro, ...). Os testes de
+# tests/<pasta> importam os módulos de src/<pasta>: antes de importar cada
+# arquivo de teste e antes de cada teste, a pasta vai para o início de
+# sys.path e os módulos já carregados da outra pasta saem de sys.modules
+# (guardados e devolvidos quando a pasta deles volta a ser a ativa, para que
+# cada teste veja os mesmos objetos de módulo que importou). Os módulos de
+# src/comum servem às duas pastas e ficam carregados; a pasta vai para sys.path
+# como nos resultados.py, para os testes que importam direto deles.
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+COMUM = os.path.join(SRC, "comum")
+if COMUM not in sys.path:
+    sys.path.append(COMUM)
+_guardados = {}
+
+def _ativar(pasta_testes):
+    pasta = os.path.join(SRC, os.path.basename(pasta_testes))
+    if not os.path.isdir(pasta):
+        return
+    if pasta in sys.path:
+        sys.path.remove(pasta)
+    sys.path.insert(0, pasta)
+    for nome, modulo in list(sys.modules.items()):
+        arquivo = os.path.abspath(getattr(modulo, "__file__", None) or "")
+        if (arquivo.startswith(SRC + os.sep) and not arquivo.startswith(pasta + os.sep)
+                and not arquivo.startswith(COMUM + os.sep)):
+            _guardados.setdefault(os.path.dirname(arquivo), {})[nome] = sys.modules.pop(nome)
+    for nome, modulo in _guardados.pop(pasta, {}).items():
+        sys.modules.setdefault(nome, modulo)
+
+def pytest_collectstart(collector):
+    if isinstance(collector, pytest.Module):
+        _ativar(os.path.dirname(collector.path))
+
+def pytest_runtest_setup(item):
+    _ativar(os.path.dirname(item.path))
+
+@pytest.fixture
+def pasta_trabalho(tmp_path, monkeypatch):
+    """Diretório de trabalho temporário (os scripts gravam em solutions/ e instancias/)."""
+    (tmp_path / "instancias").mkdir()
+    (tmp_path / "solutions").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
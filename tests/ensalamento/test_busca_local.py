@@ -0,0 +1,62 @@
+import numpy as np
+from gerador import gen_classrom_problem
+from helpf import salvar_instancia_csv
+from resultados import ler_tempos_custos
+from heuristica import (heuristica_gulosa_ensalamento, busca_local_indices, busca_local_ensalamento,
+                        verificar_solucao_valida)
+from guloso import resolver_com_gulosa
+
+def instancias():
+    rng = np.random.default_rng(0)
+    for t in range(60):
+        n = int(rng.integers(2, 40))
+        m = int(rng.integers(n, 50))
+        disciplinas, salas, N, C, D = gen_classrom_problem(n, m, min_alunos=10, max_alunos=60, min_cap=20, max_cap=80,
+                                                           max_d=10, seed=t)
+        alocacao, custo = heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D)
+        if alocacao is not None:
+            yield disciplinas, salas, N, C, D, alocacao, custo
+
+def test_busca_local_viavel_e_nao_piora():
+    for disciplinas, salas, N, C, D, alocacao, custo in instancias():
+        melhorada, custo_busca = busca_local_ensalamento(disciplinas, salas, N, C, D, alocacao)
+        assert verificar_solucao_valida(melhorada, disciplinas, salas, N, C)
+        assert custo_busca <= custo
+        indice_sala = {s: j for j, s in enumerate(salas)}
+        assert custo_busca == sum(D[i][indice_sala[melhorada[d]]] * N[i] for i, d in enumerate(disciplinas))
+
+def test_busca_local_em_blocos():
+    # Blocos menores que o número de disciplinas: mesma viabilidade e nenhuma piora
+    for disciplinas, salas, N, C, D, alocacao, custo in instancias():
+        indice_sala = {s: j for j, s in enumerate(salas)}
+        sala_de = np.array([indice_sala[alocacao[d]] for d in disciplinas])
+        for tam_bloco in (1, 3, len(disciplinas) - 1):
+            obtida, _, _ = busca_local_indices(N, C, D, sala_de, tam_bloco=max(tam_bloco, 1))
+            uso = np.bincount(obtida, weights=N, minlength=len(salas))
+            assert (uso <= np.asarray(C)).all()
+            assert np.sum(D[np.arange(len(disciplinas)), obtida] * N) <= custo
+
+def test_busca_local_sem_tempo_devolve_entrada():
+    for disciplinas, salas, N, C, D, alocacao, custo in instancias():
+        indice_sala = {s: j for j, s in enumerate(salas)}
+        sala_de = np.array([indice_sala[alocacao[d]] for d in disciplinas])
+        obtida, passadas, aplicados = busca_local_indices(N, C, D, sala_de, tempo_limite=0)
+        assert (obtida == sala_de).all() and obtida is not sala_de
+        assert passadas == aplicados == 0
+        assert busca_local_ensalamento(disciplinas, salas, N, C, D, alocacao, tempo_limite=0) == (alocacao, custo)
+
+def test_gulosa_registra_busca_local_separada(pasta_trabalho):
+    disciplinas, salas, N, C, D = gen_classrom_problem(30, 40, min_cap=60, max_cap=90, seed=3)
+    caminho = pasta_trabalho / "instancias" / "busca.csv"
+    salvar_instancia_csv(caminho, disciplinas, salas, N, C, D)
+    _, custo_gulosa = heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D)
+
+    resolver_com_gulosa(str(caminho), "busca", busca_local=True)
+    _, custos = ler_tempos_custos("busca", "gulosa", 10)
+    _, custos_busca = ler_tempos_custos("busca", "gulosa_busca_local", 10)
+    assert custos == [custo_gulosa]
+    assert len(custos_busca) == 1 and custos_busca[0] <= custo_gulosa
+
+    resolver_com_gulosa(str(caminho), "busca")
+    assert len(ler_tempos_custos("busca", "gulosa", 10)[1]) == 2
+    assert len(ler_tempos_custos("busca", "gulosa_busca_local", 10)[1]) == 1
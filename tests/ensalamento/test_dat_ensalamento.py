@@ -0,0 +1,27 @@
+from gerador import gen_classrom_problem
+from helpf import escrever_dados
+
+def escrever_dados_original(disciplinas, salas, N, C, D, path):
+    # Escritor anterior ao escrever_matriz_dat (uma chamada de str por célula)
+    with open(path, "w") as f:
+        f.write("set DISCIPLINAS := " + " ".join(disciplinas) + ";\n")
+        f.write("set SALAS := " + " ".join(salas) + ";\n\n")
+        f.write("param N :=\n")
+        for d, n in zip(disciplinas, N):
+            f.write(f"{d} {n}\n")
+        f.write(";\n\n")
+        f.write("param C :=\n")
+        for s, c in zip(salas, C):
+            f.write(f"{s} {c}\n")
+        f.write(";\n\n")
+        f.write("param D : " + " ".join(salas) + " :=\n")
+        for i, d in enumerate(disciplinas):
+            f.write(d + " " + " ".join(str(D[i][j]) for j in range(len(salas))) + "\n")
+        f.write(";\n")
+
+def test_dat_identico_ao_escritor_original(pasta_trabalho):
+    disciplinas, salas, N, C, D = gen_classrom_problem(1030, 1040, seed=1)
+    caminho = escrever_dados(disciplinas, salas, N, C, D, "teste")
+    escrever_dados_original(disciplinas, salas, N, C, D, "original.dat")
+    with open("original.dat", "rb") as a, open(caminho, "rb") as b:
+        assert a.read() == b.read()
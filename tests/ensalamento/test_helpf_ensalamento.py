@@ -0,0 +1,11 @@
+import numpy as np
+from helpf import solucao_inteira
+
+def test_solucao_inteira():
+    assert solucao_inteira([0, 1, 1, 0])
+    assert solucao_inteira(np.array([0.0, 1.0, 1 - 1e-9, 2e-7]))
+    assert solucao_inteira([])
+    assert not solucao_inteira([0, 0.5, 0.5, 1])
+    assert not solucao_inteira(np.array([1.0, 1e-3]))
+    assert not solucao_inteira([0.99999], tol=1e-6)
+    assert solucao_inteira([0.99999], tol=1e-4)
@@ -0,0 +1,36 @@
+import numpy as np
+from gerador import gen_classrom_problem
+from heuristica import heuristica_gulosa_ensalamento
+
+def heuristica_gulosa_original(disciplinas, salas, N, C, D):
+    # Versão anterior a heuristica_gulosa_indices: ordena as tuplas (distância, disciplina, sala)
+    capacidade_disponivel = {sala: capacidade for sala, capacidade in zip(salas, C)}
+    alocacao = {}
+    combinacoes = sorted((D[i][j], d, s) for i, d in enumerate(disciplinas) for j, s in enumerate(salas))
+    for dist, d, s in combinacoes:
+        demanda = N[disciplinas.index(d)]
+        if d not in alocacao and capacidade_disponivel[s] >= demanda:
+            alocacao[d] = s
+            capacidade_disponivel[s] -= demanda
+        if len(alocacao) == len(disciplinas):
+            break
+    if len(alocacao) < len(disciplinas):
+        return None, None
+    custo_total = sum(D[disciplinas.index(d)][salas.index(s)] * N[disciplinas.index(d)] for d, s in alocacao.items())
+    return alocacao, custo_total
+
+def test_gulosa_igual_a_original():
+    rng = np.random.default_rng(0)
+    for t in range(150):
+        n = int(rng.integers(1, 25))
+        m = int(rng.integers(n, 30))
+        # Salas apertadas para haver disputas e instâncias sem alocação completa
+        disciplinas, salas, N, C, D = gen_classrom_problem(n, m, min_alunos=10, max_alunos=60, min_cap=20, max_cap=60,
+                                                           max_d=4, seed=t)
+        esperado, custo_esperado = heuristica_gulosa_original(disciplinas, salas, N, C, D)
+        obtido, custo = heuristica_gulosa_ensalamento(disciplinas, salas, N, C, D)
+        if esperado is None:
+            assert obtido is None
+            continue
+        assert list(obtido.items()) == list(esperado.items())
+        assert custo == custo_esperado
@@ -0,0 +1,44 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from hungaro import arestas_viaveis, emparelhar_esparso, resolver_com_hungaro_esparso
+from helpf import salvar_instancia_csv
+from resultados import ler_tempos_custos
+
+def test_mais_disciplinas_que_salas_e_inviavel():
+    N = np.array([10, 20, 30])
+    C = np.array([90, 90])
+    D = np.ones((3, 2), dtype=np.int64)
+    assert emparelhar_esparso(arestas_viaveis(N, C, D)) is None
+
+def test_sem_emparelhamento_completo_e_inviavel():
+    # Duas disciplinas só cabem na mesma sala
+    N = np.array([80, 85, 10])
+    C = np.array([90, 30, 30])
+    D = np.ones((3, 3), dtype=np.int64)
+    assert emparelhar_esparso(arestas_viaveis(N, C, D)) is None
+
+def test_esparso_igual_ao_denso_em_instancia_retangular():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n, m = rng.integers(1, 8), rng.integers(1, 10)
+        N = rng.integers(10, 60, n)
+        C = rng.integers(30, 90, m)
+        D = rng.integers(1, 10, (n, m))
+        sala_de = emparelhar_esparso(arestas_viaveis(N, C, D))
+
+        custos = np.where(N[:, None] <= C[None, :], N[:, None] * D, 10**6)
+        linhas, colunas = linear_sum_assignment(custos)
+        viavel = n <= m and custos[linhas, colunas].max() < 10**6
+        assert (sala_de is not None) == viavel
+        if viavel:
+            assert len(set(sala_de.tolist())) == n
+            assert (N <= C[sala_de]).all()
+            assert (N * D[np.arange(n), sala_de]).sum() == custos[linhas, colunas].sum()
+
+def test_resolver_esparso_registra_inviavel(pasta_trabalho):
+    caminho = "instancias/retangular.csv"
+    salvar_instancia_csv(caminho, ["D1", "D2", "D3"], ["S1", "S2"], [10, 20, 30], [90, 90],
+                         np.ones((3, 2), dtype=np.int64))
+    resolver_com_hungaro_esparso(caminho, "retangular")
+    _, custos = ler_tempos_custos("retangular", "hungaro_esparso", 1)
+    assert custos == [-1]
@@ -0,0 +1,73 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from gerador import gen_classrom_problem
+from incremental import (PENALIDADE, estado_inicial, reotimizar, viavel, custo_estado, custos_linha,
+                         salvar_estado, carregar_estado)
+
+def otimo_do_zero(estado):
+    """Custo ótimo e viabilidade pelo linear_sum_assignment na matriz penalizada."""
+    nd = len(estado["disciplinas"])
+    custos = np.vstack([custos_linha(estado, i) for i in range(nd)]).reshape(nd, len(estado["salas"]))
+    linhas, colunas = linear_sum_assignment(custos)
+    viavel_ref = bool(np.all(custos[linhas, colunas] < PENALIDADE))
+    return viavel_ref, int(np.sum(estado["N"][linhas] * estado["D"][linhas, colunas]))
+
+def conferir(estado):
+    nd, ns = len(estado["disciplinas"]), len(estado["salas"])
+    sala_de, dono = estado["sala_de"], estado["dono"]
+    assert sala_de.size == ns and sorted(sala_de.tolist()) == list(range(ns))
+    assert np.array_equal(dono[sala_de], np.arange(ns))
+
+    # Duais viáveis e folga complementar em todo o problema quadrado (fictícias inclusive)
+    custos = np.vstack([custos_linha(estado, i) for i in range(ns)])
+    reduzidos = custos - estado["u"][:, None] - estado["v"][None, :]
+    assert reduzidos.min() >= -1e-6
+    assert np.abs(reduzidos[np.arange(ns), sala_de]).max() <= 1e-6
+
+    viavel_ref, custo_ref = otimo_do_zero(estado)
+    assert viavel(estado) == viavel_ref
+    if viavel_ref:
+        assert custo_estado(estado) == custo_ref
+
+def test_reotimizar_igual_a_resolver_do_zero():
+    rng = np.random.default_rng(0)
+    for t in range(40):
+        nd = int(rng.integers(1, 12))
+        ns = int(rng.integers(nd, nd + 5))
+        disciplinas, salas, N, C, D = gen_classrom_problem(nd, ns, min_cap=20, max_cap=70, seed=t)
+        estado = estado_inicial(disciplinas, salas, N, C, D)
+        conferir(estado)
+
+        for passo in range(6):
+            tipo = rng.integers(4)
+            delta = {}
+            if tipo == 0:
+                delta["N"] = {d: int(rng.integers(10, 70)) for d in rng.choice(disciplinas, rng.integers(1, nd + 1))}
+            elif tipo == 1:
+                n_salas = len(estado["salas"])
+                delta["D"] = {d: rng.integers(1, 10, n_salas).tolist() for d in rng.choice(disciplinas, 2)}
+            elif tipo == 2 and len(estado["salas"]) > nd:
+                delta["remover_salas"] = [str(rng.choice(estado["salas"]))]
+            else:
+                delta["adicionar_salas"] = {f"N{t}_{passo}": [int(rng.integers(20, 70)), rng.integers(1, 10, nd).tolist()]}
+            assert reotimizar(estado, delta) is not None
+            conferir(estado)
+
+def test_remover_sala_sem_sobra_e_inviavel():
+    disciplinas, salas, N, C, D = gen_classrom_problem(3, 3, seed=1)
+    estado = estado_inicial(disciplinas, salas, N, C, D)
+    assert reotimizar(estado, {"remover_salas": [salas[0]]}) is None
+
+def test_salvar_e_carregar_estado(pasta_trabalho):
+    disciplinas, salas, N, C, D = gen_classrom_problem(6, 8, seed=2)
+    estado = estado_inicial(disciplinas, salas, N, C, D)
+    salvar_estado(estado, "teste")
+    carregado = carregar_estado("teste")
+    assert carregado["disciplinas"] == disciplinas and carregado["salas"] == salas
+    for chave in ("N", "C", "D", "sala_de", "dono", "u", "v"):
+        assert np.array_equal(carregado[chave], estado[chave])
+
+    # O estado carregado continua reotimizável
+    reotimizar(carregado, {"N": {disciplinas[0]: 15}, "adicionar_salas": {"S99": [80, [1] * 6]}})
+    conferir(carregado)
+    assert carregar_estado("outra") is None
@@ -0,0 +1,40 @@
+import numpy as np
+from hungaro import arestas_viaveis, emparelhar_esparso
+from leilao import leilao, vizinhancas
+
+def custo(sala_de, N, D):
+    return int(np.sum(D[np.arange(len(N)), sala_de] * N))
+
+def test_leilao_igual_ao_hungaro_esparso():
+    # Quadradas, retangulares (mais salas) e inviáveis (inclusive mais disciplinas que salas)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        n, m = rng.integers(1, 12), rng.integers(1, 14)
+        N = rng.integers(10, 60, n)
+        C = rng.integers(30, 90, m)
+        D = rng.integers(1, 10, (n, m))
+        grafo = arestas_viaveis(N, C, D)
+        esperado = emparelhar_esparso(grafo)
+        obtido = leilao(grafo)
+        if esperado is None:
+            assert obtido is None
+            continue
+        assert len(set(obtido.tolist())) == n
+        assert np.all(N <= C[obtido])
+        assert custo(obtido, N, D) == custo(esperado, N, D)
+
+def test_leilao_em_lote_com_muitas_salas_sobrando():
+    # Acima de LIMITE_JACOBI pendentes os lances são em lote, inclusive os das fictícias
+    rng = np.random.default_rng(2)
+    N = rng.integers(10, 60, 1100)
+    C = rng.integers(30, 90, 1500)
+    D = rng.integers(1, 10, (1100, 1500))
+    grafo = arestas_viaveis(N, C, D)
+    assert custo(leilao(grafo), N, D) == custo(emparelhar_esparso(grafo), N, D)
+
+def test_vizinhancas_sem_linhas_ficticias():
+    N = np.array([10, 80])
+    C = np.array([90, 30, 30, 85])
+    colunas, beneficio, graus = vizinhancas(arestas_viaveis(N, C, np.ones((2, 4), dtype=np.int64)))
+    assert colunas.shape == (2, 4) and graus.tolist() == [4, 2]
+    assert colunas[1].tolist() == [0, 3, 4, 4]
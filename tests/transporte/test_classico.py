@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from gerador import gen_transport_problem, gen_transport_problem_esparso
+from helpf import arcos
+from tSimplex import resolver_transporte
+from tClassico import (montar_matriz_transporte, montar_matriz_transporte_esparsa, solve_transport_milp,
+                       solve_transport_problem)
+
+def matriz_densa(m, n):
+    A = np.zeros((m + n, m * n))
+    for i in range(m):
+        for j in range(n):
+            A[i, i * n + j] = 1
+            A[m + j, i * n + j] = 1
+    return A
+
+def test_matriz_csr_igual_a_densa():
+    for m in range(1, 7):
+        for n in range(1, 7):
+            A = montar_matriz_transporte(m, n)
+            A.check_format()
+            assert A.nnz == 2 * m * n
+            assert np.array_equal(A.toarray(), matriz_densa(m, n))
+
+def test_matriz_esparsa_igual_as_colunas_dos_arcos():
+    for t in range(20):
+        m, n = 3 + t % 5, 2 + t % 7
+        _, _, custos = gen_transport_problem_esparso(m, n, densidade=0.4, seed=t)
+        linhas, colunas, _ = arcos(custos)
+        A = montar_matriz_transporte_esparsa(custos)
+        assert A.nnz == 2 * custos.nnz
+        assert np.array_equal(A.toarray(), matriz_densa(m, n)[:, linhas * n + colunas])
+
+def test_milp_igual_a_pulp_e_ao_simplex():
+    rng = np.random.default_rng(0)
+    for t in range(15):
+        m, n = int(rng.integers(1, 8)), int(rng.integers(1, 8))
+        Oi, Dj, Cost = gen_transport_problem(m, n, seed=t, max_val=20)
+        if t % 2:
+            Dj[-1] += Oi.sum() - Dj.sum()
+        status, custo_milp, _, _ = solve_transport_milp(Oi, Dj, Cost)
+        assert status == "Optimal"
+        _, custo_pulp, _ = solve_transport_problem((Oi, Dj, Cost))
+        _, _, custo_simplex = resolver_transporte(Oi, Dj, Cost)
+        assert custo_milp == pytest.approx(custo_simplex)
+        assert custo_pulp == pytest.approx(custo_simplex)
+
+@pytest.mark.parametrize("backend", ["pulp", "milp"])
+def test_relaxacao_linear_igual_ao_mip(backend, capsys):
+    rng = np.random.default_rng(1)
+    for t in range(15):
+        m, n = int(rng.integers(1, 8)), int(rng.integers(1, 8))
+        Oi, Dj, Cost = gen_transport_problem(m, n, seed=t, max_val=20)
+        if t % 2:
+            Dj[-1] += Oi.sum() - Dj.sum()
+        status_lp, custo_lp, _ = solve_transport_problem((Oi, Dj, Cost), backend=backend, modo="lp-relaxation")
+        status_mip, custo_mip, _ = solve_transport_problem((Oi, Dj, Cost), backend=backend)
+        assert status_lp == status_mip == "Optimal"
+        assert custo_lp == pytest.approx(custo_mip)
+    # Matriz totalmente unimodular: o vértice da relaxação já é inteiro
+    assert "Relaxação linear não inteira" not in capsys.readouterr().out
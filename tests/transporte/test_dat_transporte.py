@@ -0,0 +1,29 @@
+from gerador import gen_transport_problem
+from helpf import salvar_dados_ampl_transport, gen_transport_problem_notint
+
+def escrever_dat_original(Oi, Dj, Cost, filename):
+    # Escritor anterior ao escrever_matriz_dat (uma chamada de str por célula)
+    m, n = len(Oi), len(Dj)
+    with open(filename, "w") as f:
+        f.write("set I := " + " ".join(f"i{i}" for i in range(m)) + ";\n")
+        f.write("set J := " + " ".join(f"j{j}" for j in range(n)) + ";\n\n")
+        f.write("param O :=\n")
+        for i in range(m):
+            f.write(f"i{i} {Oi[i]}\n")
+        f.write(";\n\n")
+        f.write("param D :=\n")
+        for j in range(n):
+            f.write(f"j{j} {Dj[j]}\n")
+        f.write(";\n\n")
+        f.write("param C : " + " ".join(f"j{j}" for j in range(n)) + " :=\n")
+        for i in range(m):
+            f.write(f"i{i} " + " ".join(str(Cost[i][j]) for j in range(n)) + "\n")
+        f.write(";\n")
+
+def test_dat_identico_ao_escritor_original(pasta_trabalho):
+    # Inteiros (tabela valor -> texto, mais de um bloco de linhas) e reais (np.savetxt)
+    for Oi, Dj, Cost in (gen_transport_problem(1030, 7, seed=1), gen_transport_problem_notint(9, 5, seed=2)):
+        escrever_dat_original(Oi, Dj, Cost, "original.dat")
+        salvar_dados_ampl_transport(Oi, Dj, Cost, "novo.dat", usar_cache=False)
+        with open("original.dat", "rb") as a, open("novo.dat", "rb") as b:
+            assert a.read() == b.read()
@@ -0,0 +1,58 @@
+import numpy as np
+import tGenetico
+from gerador import gen_transport_problem
+from tGenetico import (reparar_solucao, reparar_lote, avaliar, avaliar_lote, ordens_reparo, decodificar_lote,
+                       decodificar, avaliar_prioridade, verifica, executar_ga)
+from tSimplex import resolver_transporte
+
+def test_reparo_em_lote_igual_ao_individual(monkeypatch):
+    rng = np.random.default_rng(0)
+    for t in range(30):
+        m, n = int(rng.integers(1, 9)), int(rng.integers(1, 9))
+        a, b, c = gen_transport_problem(m, n, seed=t, max_val=10)
+        # Indivíduos como os do genético: floats, com excesso e negativos
+        X = rng.uniform(-5, 2 * max(a.max(), 1), size=(12, m, n))
+        ordens = ordens_reparo(c)
+
+        lote = reparar_lote(X.copy(), a, b, c, ordens)
+        for k in range(X.shape[0]):
+            assert np.array_equal(lote[k], reparar_solucao(X[k].ravel(), a, b, c))
+
+        monkeypatch.setattr(tGenetico, "a", a, raising=False)
+        monkeypatch.setattr(tGenetico, "b", b, raising=False)
+        monkeypatch.setattr(tGenetico, "c", c, raising=False)
+        custos = avaliar_lote(X, a, b, c, ordens, tam_lote=5)
+        assert custos.tolist() == [avaliar(X[k].ravel())[0] for k in range(X.shape[0])]
+
+def instancias_prioridade():
+    rng = np.random.default_rng(1)
+    for t in range(40):
+        m, n = int(rng.integers(1, 9)), int(rng.integers(1, 9))
+        a, b, c = gen_transport_problem(m, n, seed=t, max_val=10)
+        if t % 2:
+            # Balanceada: a última demanda absorve a sobra da oferta
+            b[-1] += a.sum() - b.sum()
+        yield rng, a, b, c
+
+def test_decodificacao_por_prioridade_viavel(monkeypatch):
+    for rng, a, b, c in instancias_prioridade():
+        m, n = len(a), len(b)
+        prioridades = rng.random((10, m + n))
+        # Empates: prioridades repetidas seguem a ordem estável dos nós
+        prioridades[0] = 0.5
+        _, _, _, custos = decodificar_lote(prioridades, a, b, c)
+
+        monkeypatch.setattr(tGenetico, "a", a, raising=False)
+        monkeypatch.setattr(tGenetico, "b", b, raising=False)
+        monkeypatch.setattr(tGenetico, "c", c, raising=False)
+        for k in range(prioridades.shape[0]):
+            solucao = decodificar(prioridades[k], a, b, c)
+            assert verifica(a, b, solucao)
+            assert np.sum(solucao * c) == custos[k]
+            assert avaliar_prioridade(list(prioridades[k]))[0] == custos[k]
+
+def test_genetico_por_prioridade():
+    a, b, c = gen_transport_problem(5, 7, seed=3, max_val=20)
+    status, custo, _ = executar_ga(a, b, c, pop_size=20, ngen=5, codificacao="prioridade")
+    assert status == "aproximada"
+    assert custo >= resolver_transporte(a, b, c)[2]
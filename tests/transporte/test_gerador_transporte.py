@@ -0,0 +1,32 @@
+import os
+import numpy as np
+from gerador import save_transport_problem_streaming, save_transport_problem_to_csv
+from helpf import ler_instancia_csv, ler_instancia_binaria, caminho_binario, nome_instancia_stream
+
+def test_nome_stream_difere_do_legado():
+    assert nome_instancia_stream(1001, 1001) == "instancias/problema_1001x1001_[1,100]_seed42_stream"
+
+def test_streaming_csv_e_binario_iguais(pasta_trabalho):
+    nome = os.path.join("instancias", "problema_5x7_stream")
+    A, B = save_transport_problem_streaming(nome, 5, 7, seed=1, tam_bloco=2)
+    for s, d, c in (ler_instancia_csv(nome), ler_instancia_binaria(nome)):
+        assert np.array_equal(s, A) and np.array_equal(d, B) and c.shape == (5, 7)
+    assert np.array_equal(ler_instancia_csv(nome)[2], ler_instancia_binaria(nome)[2])
+
+def test_formato_nao_gravado_e_removido(pasta_trabalho):
+    nome = os.path.join("instancias", "problema_3x4")
+    save_transport_problem_streaming(nome, 3, 4, seed=1)
+    save_transport_problem_streaming(nome, 3, 4, seed=2, formatos=("bin",))
+    assert not os.path.exists(nome) and os.path.exists(caminho_binario(nome))
+
+    save_transport_problem_to_csv(nome, 3, 4, seed=3)
+    assert os.path.exists(nome) and not os.path.exists(caminho_binario(nome))
+
+def test_streaming_reprodutivel(pasta_trabalho):
+    # Mesma seed e mesmo tam_bloco: arquivos idênticos bit a bit
+    conteudos = []
+    for nome in ("instancias/a", "instancias/b"):
+        save_transport_problem_streaming(nome, 6, 4, seed=7, tam_bloco=4)
+        with open(nome, "rb") as csv, open(caminho_binario(nome), "rb") as binario:
+            conteudos.append((csv.read(), binario.read()))
+    assert conteudos[0] == conteudos[1]
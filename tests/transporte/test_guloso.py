@@ -0,0 +1,19 @@
+import numpy as np
+from gerador import gen_transport_problem
+from helpf import custos_esparsos
+from tGuloso import metodo_guloso, metodo_guloso_referencia, metodo_guloso_esparso
+
+def test_vetorizado_igual_a_referencia():
+    rng = np.random.default_rng(0)
+    for t in range(200):
+        m, n = int(rng.integers(1, 15)), int(rng.integers(1, 15))
+        supply, demand, costs = gen_transport_problem(m, n, seed=t, max_val=10)
+        assert np.array_equal(metodo_guloso(supply, demand, costs), metodo_guloso_referencia(supply, demand, costs))
+
+def test_esparso_com_todas_as_rotas_igual_ao_denso():
+    rng = np.random.default_rng(1)
+    for t in range(100):
+        m, n = int(rng.integers(1, 15)), int(rng.integers(1, 15))
+        supply, demand, costs = gen_transport_problem(m, n, seed=t, max_val=10)
+        esparso = metodo_guloso_esparso(supply, demand, custos_esparsos(costs))
+        assert np.array_equal(esparso.toarray(), metodo_guloso(supply, demand, costs))
@@ -0,0 +1,41 @@
+import os
+import numpy as np
+from helpf import (ler_instancia, carregar_instancia, limpar_cache_instancias, salvar_instancia_binaria,
+                   arquivo_instancia, caminho_binario)
+
+def escrever_csv(filepath, supply, demand, costs):
+    m, n = costs.shape
+    largura = max(m, n, 2)
+    linhas = [[m, n], list(supply), list(demand)] + [list(c) for c in costs]
+    with open(filepath, "w") as f:
+        for linha in linhas:
+            linha = list(linha) + [""] * (largura - len(linha))
+            f.write(",".join(map(str, linha)) + "\n")
+
+def test_binario_mais_antigo_que_o_csv_e_ignorado(pasta_trabalho):
+    nome = os.path.join("instancias", "problema_2x2")
+    antigo = (np.array([5, 5]), np.array([4, 6]), np.array([[1, 2], [3, 4]]))
+    novo = (np.array([7, 3]), np.array([2, 8]), np.array([[9, 8], [7, 6]]))
+
+    escrever_csv(nome, *antigo)
+    salvar_instancia_binaria(nome, *antigo)
+    assert arquivo_instancia(nome) == caminho_binario(nome)
+    limpar_cache_instancias()
+    (s, d, c), _ = carregar_instancia(nome)
+    assert np.array_equal(c, antigo[2])
+
+    # CSV regravado depois do binário
+    escrever_csv(nome, *novo)
+    st = os.stat(caminho_binario(nome))
+    os.utime(nome, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert arquivo_instancia(nome) == nome
+    for s, d, c in (ler_instancia(nome), carregar_instancia(nome)[0]):
+        assert np.array_equal(s, novo[0]) and np.array_equal(d, novo[1]) and np.array_equal(c, novo[2])
+    limpar_cache_instancias()
+
+def test_binario_sem_csv(pasta_trabalho):
+    nome = os.path.join("instancias", "problema_2x2")
+    salvar_instancia_binaria(nome, np.array([5, 5]), np.array([4, 6]), np.array([[1, 2], [3, 4]]))
+    assert arquivo_instancia(nome) == caminho_binario(nome)
+    assert np.array_equal(ler_instancia(nome)[2], [[1, 2], [3, 4]])
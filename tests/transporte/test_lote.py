@@ -0,0 +1,37 @@
+import os
+from gerador import save_transport_problem_to_csv
+from lote import listar_instancias, executar_lote
+from metodos import executar_metodo
+from cronometro import Cronometro
+
+def test_lote_fora_de_instancias_grava_em_solutions(pasta_trabalho):
+    os.makedirs("outras")
+    nome = os.path.join("outras", "problema_4x5")
+    save_transport_problem_to_csv(nome, 4, 5, seed=1)
+
+    concluidas = executar_lote(listar_instancias("outras"), ["tGuloso"])
+    assert [(instancia, erro) for instancia, *_, erro in concluidas] == [(nome, None)]
+    assert os.path.exists(os.path.join("solutions", "problema_4x5_resultado.csv"))
+    # O CSV de resultados não vai para a pasta das instâncias
+    assert listar_instancias("outras") == [nome]
+
+    # Retoma: a execução já registrada não é repetida
+    assert executar_lote(listar_instancias("outras"), ["tGuloso"]) == []
+
+def test_leitura_medida_uma_vez(pasta_trabalho, monkeypatch):
+    # executar_metodo mede a carga; os métodos recebem a instância carregada e não abrem outra janela
+    fase_original = Cronometro.fase
+    leituras = []
+    def fase(self, nome):
+        if nome == "leitura":
+            leituras.append(nome)
+        return fase_original(self, nome)
+    monkeypatch.setattr(Cronometro, "fase", fase)
+
+    nome = os.path.join("instancias", "problema_4x5")
+    save_transport_problem_to_csv(nome, 4, 5, seed=1)
+    for codigo in ("tCantoNoroeste", "tVogel", "tGuloso", "tGenetico", "tSimplex_vogel", "tClassico_milp",
+                   "tRestrito_netsimplex"):
+        leituras.clear()
+        executar_metodo(codigo, nome)
+        assert len(leituras) == 1, codigo
@@ -0,0 +1,32 @@
+import numpy as np
+from gerador import gen_transport_problem
+from tSimplex import resolver_transporte
+from tReotimizacao import base_otima, reotimizar, fluxos_da_base, _estender
+
+def test_reotimizar_igual_a_resolver_do_zero():
+    rng = np.random.default_rng(0)
+    for t in range(60):
+        m, n = rng.integers(2, 12), rng.integers(2, 12)
+        A, B, C = gen_transport_problem(m, n, seed=t)
+        _, alocacao, _ = resolver_transporte(A, B, C)
+        base = base_otima(A, B, C, alocacao)
+        delta = {"oferta": {int(i): int(rng.integers(1, 100)) for i in rng.choice(m, rng.integers(1, m + 1), replace=False)},
+                 "demanda": {int(j): int(rng.integers(0, 60)) for j in rng.choice(n, rng.integers(1, n + 1), replace=False)}}
+
+        status, nova, custo, _ = reotimizar(base, C, delta)
+        oferta, demanda = A.copy(), B.copy()
+        for i, valor in delta["oferta"].items():
+            oferta[i] = valor
+        for j, valor in delta["demanda"].items():
+            demanda[j] = valor
+        status_ref, _, custo_ref = resolver_transporte(oferta, demanda, C)
+        assert status == status_ref
+        if status != "Optimal":
+            continue
+        assert custo == custo_ref
+
+        # A base devolvida é uma árvore com os fluxos certos e potenciais duais viáveis
+        demanda_ext = np.append(demanda, oferta.sum() - demanda.sum())
+        assert np.array_equal(nova["fluxos"], fluxos_da_base(nova["linhas"], nova["colunas"], oferta, demanda_ext))
+        reduzidos = _estender(C) - nova["u"][:, None] - nova["v"][None, :]
+        assert reduzidos.min() >= 0 and not reduzidos[nova["linhas"], nova["colunas"]].any()
@@ -0,0 +1,46 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from gerador import gen_transport_problem
+from tSimplex import resolver_transporte
+from tRestrito import montar_rede, simplex_rede, solve_flow_netsimplex
+
+def conferir_fluxo(Oi, Dj, Cost, fluxo):
+    # Arcos O_i -> D_j vêm logo depois dos m arcos S -> O_i (ver montar_rede)
+    m, n = Cost.shape
+    X = fluxo[m:m + m * n].reshape(m, n)
+    assert (fluxo >= 0).all()
+    assert (X.sum(axis=1) <= Oi).all()
+    assert (X.sum(axis=0) >= Dj).all()
+    return int((X * Cost).sum())
+
+def test_netsimplex_igual_ao_simplex_de_transporte():
+    rng = np.random.default_rng(0)
+    for t in range(60):
+        m, n = int(rng.integers(1, 12)), int(rng.integers(1, 12))
+        Oi, Dj, Cost = gen_transport_problem(m, n, seed=t, max_val=int(rng.choice([3, 50])))
+        if t % 2:
+            # Balanceada: toda a oferta é consumida
+            Dj[-1] += Oi.sum() - Dj.sum()
+        status, fluxo, _ = simplex_rede(*montar_rede(Oi, Dj, Cost))
+        assert status == "Optimal"
+        _, _, custo_simplex = resolver_transporte(Oi, Dj, Cost)
+        assert conferir_fluxo(Oi, Dj, Cost, fluxo) == custo_simplex
+        assert solve_flow_netsimplex(Oi, Dj, Cost)[1] == custo_simplex
+
+def test_netsimplex_em_designacoes_degeneradas():
+    # Ofertas e demandas unitárias e custos com muitos empates: quase todo pivô é degenerado
+    rng = np.random.default_rng(1)
+    for _ in range(40):
+        n = int(rng.integers(2, 20))
+        m = n + int(rng.integers(0, 3))
+        Cost = rng.integers(1, 4, (m, n))
+        Oi, Dj = np.ones(m, dtype=int), np.ones(n, dtype=int)
+        status, fluxo, _ = simplex_rede(*montar_rede(Oi, Dj, Cost))
+        assert status == "Optimal"
+        linhas, colunas = linear_sum_assignment(Cost)
+        assert conferir_fluxo(Oi, Dj, Cost, fluxo) == Cost[linhas, colunas].sum()
+
+def test_netsimplex_inviavel():
+    Oi, Dj, Cost = np.array([3, 2]), np.array([4, 4]), np.array([[1, 2], [3, 4]])
+    assert simplex_rede(*montar_rede(Oi, Dj, Cost))[0] == "Infeasible"
+    assert solve_flow_netsimplex(Oi, Dj, Cost)[1] is None
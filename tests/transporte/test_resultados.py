@@ -0,0 +1,24 @@
+import os
+import banco_resultados
+import resultados
+from resultados import gravar_resultado, contar_execucoes, ler_tempos_custos, instancia_do_csv
+
+def test_esquema_aplicado_uma_vez_por_banco(pasta_trabalho, monkeypatch):
+    chamadas = []
+    original = banco_resultados._inicializar
+    monkeypatch.setattr(banco_resultados, "_inicializar", lambda con: (chamadas.append(1), original(con)))
+
+    for k in range(3):
+        gravar_resultado("instancias/problema_2x2", "tGuloso", "aproximada", 10 + k, 0.5)
+    assert contar_execucoes("problema_2x2", "tGuloso") == 3
+    assert sorted(ler_tempos_custos("problema_2x2", "tGuloso", 5)[1]) == [10, 11, 12]
+    assert len(chamadas) == 1
+
+    # Banco apagado: a próxima conexão recria o esquema
+    os.remove(resultados.CAMINHO_BANCO)
+    assert contar_execucoes("problema_2x2", "tGuloso") == 0
+    assert len(chamadas) == 2
+
+def test_nomes_dos_csvs_das_duas_pastas():
+    assert instancia_do_csv("solutions/problema_2x2_resultado.csv") == "problema_2x2"
+    assert instancia_do_csv("solutions/resultado_D11_S11_seed42.csv") == "D11_S11_seed42"
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+import tSimplex
+from tSimplex import simplex_transporte
+
+@pytest.mark.parametrize("limite", [tSimplex.LIMITE_DEGENERADOS, 0])
+def test_designacao_degenerada_chega_ao_otimo(monkeypatch, limite):
+    # Problemas de designação são maximamente degenerados; com limite 0 todos os pivôs usam Bland
+    monkeypatch.setattr(tSimplex, "LIMITE_DEGENERADOS", limite)
+    rng = np.random.default_rng(0)
+    for inicial in ("noroeste", "vogel", "guloso"):
+        for _ in range(10):
+            n = int(rng.integers(2, 15))
+            custos = rng.integers(1, 5, (n, n))
+            alocacao, base, u, v = simplex_transporte(np.ones(n, dtype=int), np.ones(n, dtype=int), custos, inicial)
+            linhas, colunas = linear_sum_assignment(custos)
+            assert (alocacao * custos).sum() == custos[linhas, colunas].sum()
+            assert len(base) == 2 * n - 1
+            assert (custos - u[:, None] - v[None, :]).min() >= 0
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from gerador import gen_transport_problem, gen_transport_problem_esparso
+from helpf import custos_esparsos
+from tVogel import solve_transport_vogel, vogel_method, vogel_esparso
+
+def test_instancia_esparsa_exige_engine_incremental():
+    instancia = gen_transport_problem_esparso(20, 30, 0.2, seed=3)
+    with pytest.raises(ValueError):
+        solve_transport_vogel(instancia)
+    status, custo, _ = solve_transport_vogel(instancia, engine="incremental")
+    assert status in ("aproximada", "falha") and custo > 0
+
+def instancias_pequenas(quantas, seed=0, max_custo=20):
+    # Custos numa faixa estreita para haver muitos empates
+    rng = np.random.default_rng(seed)
+    for t in range(quantas):
+        m, n = int(rng.integers(1, 12)), int(rng.integers(1, 12))
+        yield gen_transport_problem(m, n, seed=t, max_val=max_custo)
+
+def test_incremental_igual_a_referencia():
+    for supply, demand, costs in instancias_pequenas(200):
+        referencia = vogel_method(supply, demand, costs)
+        incremental = vogel_method(supply, demand, costs, engine="incremental")
+        assert np.array_equal(np.asarray(referencia), np.asarray(incremental))
+
+def test_esparso_com_todas_as_rotas_igual_ao_incremental():
+    for supply, demand, costs in instancias_pequenas(100, seed=1):
+        esparso = vogel_esparso(supply, demand, custos_esparsos(costs))
+        assert np.array_equal(esparso.toarray(), np.asarray(vogel_method(supply, demand, costs, engine="incremental")))